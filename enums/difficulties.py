@@ -5,3 +5,4 @@ class Difficulties(Enum):
     EASY = 0
     MEDIUM = 1
     HARD = 2
+    EXPERT = 3
@@ -1,8 +1,57 @@
+import argparse
+
+from memoryGame.camera_structures.inferenceBackends import BACKENDS
 from memoryGame.game import MemoryGame
+from memoryGame.render_structures.frameScheduler import FrameScheduler
+from utils.tracing import Tracer
 import pygame
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory game played with Epson Scara robot')
+    parser.add_argument('--fps', type=int, default=30, help='frame cap while the screen is animating')
+    parser.add_argument('--busy-loop', action='store_true',
+                        help='always run at the frame cap instead of waiting for events when idle')
+    parser.add_argument('--eager-startup', action='store_true',
+                        help='load the camera and the CNN model before the menu is shown')
+    parser.add_argument('--backend', choices=list(BACKENDS), default='keras',
+                        help='runtime used for the CNN model, tools/convertModel.py creates the converted models')
+    parser.add_argument('--debug-frames', metavar='DIR', default=None,
+                        help='store captured ROI images in the directory for debugging')
+    parser.add_argument('--debug-archive', action='store_true',
+                        help='store the most recent captured images as one compressed archive on exit')
+    parser.add_argument('--adaptive-capture', type=float, metavar='CONFIDENCE', default=None,
+                        help='stop moving between camera points once images agree with this softmax confidence, '
+                             'the camera moves saved are printed on exit with --trace')
+    parser.add_argument('--adaptive-agreement', type=int, choices=(1, 2), default=2,
+                        help='number of images that must agree for adaptive capture')
+    parser.add_argument('--travel-model', metavar='FILE', nargs='?', const='grid', default=None,
+                        help='let the AI choose between equally good elements by the shortest arm travel, with '
+                             'positions from the JSON file or the default board positions without FILE')
+    parser.add_argument('--robot-host', default='192.168.1.2', help='address of the robot or of the simulator')
+    parser.add_argument('--robot-port', type=int, default=502, help='Modbus TCP port of the robot')
+    parser.add_argument('--record-modbus', metavar='FILE', default=None,
+                        help='record every coil write and status read with timestamps for tools/replayModbus.py')
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help='record turn phases and write them on exit, as Chrome trace JSON if FILE ends with .json '
+                             'and as a compact binary log otherwise; a p50/p95 summary is printed')
+    args = parser.parse_args()
+
+    if args.trace:
+        Tracer.enable()
     pygame.init()
-    memory_game = MemoryGame()
-    while True:
-        memory_game.game()
+    memory_game = MemoryGame(lazy_startup=not args.eager_startup, inference_backend=args.backend,
+                             debug_frames=args.debug_frames, debug_archive=args.debug_archive,
+                             robot_host=args.robot_host, robot_port=args.robot_port,
+                             record_modbus=args.record_modbus, adaptive_capture=args.adaptive_capture,
+                             adaptive_agreement=args.adaptive_agreement, travel_model=args.travel_model)
+    scheduler = FrameScheduler(fps=args.fps, event_driven=not args.busy_loop)
+    try:
+        while True:
+            memory_game.game(scheduler.wait_events(memory_game.is_animating()))
+    finally:
+        if args.trace:
+            Tracer.write(args.trace)
+            Tracer.summary()
+            if args.adaptive_capture is not None:
+                saved = memory_game.camera_moves_saved
+                print(f'adaptive capture saved {sum(saved)} camera moves in {len(saved)} reveals')
@@ -1,26 +1,56 @@
-import cv2
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.nn import softmax
+
+from memoryGame.camera_structures.debugFrameSink import DebugFrameSink
+from memoryGame.camera_structures.frameSources import FrameSource, VideoCaptureSource
+from memoryGame.camera_structures.inferenceBackends import create_backend
+from utils.tracing import Tracer
 
 
 class CameraProcess:
     """
-    Class that stores methods used for object classification, camera initialization, image process
+    Class that stores methods used for object classification, camera initialization, image process.
+    OpenCV, TensorFlow and the CNN model are loaded by load(), started in the background by start_loading() so the
+    menu can be shown right away; only the first method that needs them waits for the load to finish
 
     Attributes
     ----------
-    :arg camera: camera instance
+    :arg camera: FrameSource serving the newest camera frame
     :arg: image: table that stores 3 images captured to be classified
     :arg roi: predefined ROI
-    :arg model: CNN model for object classification
+    :arg model: inference backend running the CNN model for object classification
+    :arg model_path: path of the CNN model, the file extension depends on the backend
     :arg classes: all classes to be recognized
+    :arg load_progress: progress of loading from 0 to 1
+    :arg load_error: exception raised while loading, if any
+    :arg loaded: event set when the camera and the model are ready or loading failed
+    :arg pipelined: True if every captured image is classified on the worker right away, while the robot moves on
+    :arg worker: single thread that classifies captured images in pipelined mode
+    :arg pending: classifications of the captured images that were not voted on yet
+    :arg debug_sink: DebugFrameSink storing captured images, None disables storing them
+    :arg adaptive_confidence: softmax confidence at which images decide the symbol, None captures all three
+    :arg adaptive_agreement: number of images that must agree above the confidence
+
+    Parameters
+    ----------
+    :param backend: name of the inference backend: keras, tflite or onnx
+    :param model_path: path of the model, by default CNN/model_mobilenet_v7 with the backend's extension
+    :param pipelined: classify images while they are captured instead of all three at once in predict
+    :param debug_sink: sink for captured images, by default images are not stored at all
+    :param frame_source: source of frames, by default the camera with index 1
+    :param adaptive_confidence: stop capturing once images agree with this softmax confidence, needs pipelined
+    :param adaptive_agreement: number of agreeing images, 1 or 2
     """
-    def __init__(self):
-        self.camera = cv2.VideoCapture(1)
+    def __init__(self, backend: str = 'keras', model_path: str = None, pipelined: bool = True,
+                 debug_sink: DebugFrameSink = None, frame_source: FrameSource = None,
+                 adaptive_confidence: float = None, adaptive_agreement: int = 2):
+        self.camera = frame_source
         self.image = []
         self.roi = 380, 170, 224, 224
-        self.model = load_model('CNN/model_mobilenet_v7.h5')
+        self.model = create_backend(backend)
+        self.model_path = model_path or 'CNN/model_mobilenet_v7' + self.model.extension
         self.classes = ['bee', 'bird', 'cow', 'duck', 'elephant', 'fox', 'frog', 'groundhog', 'ladybug', 'monkey',
                         'octopus', 'owl', 'pig', 'seal']
 
@@ -28,47 +58,178 @@ class CameraProcess:
         self.width = 960
         self.height = 540
         self.roi_table = []
+        self.load_progress = 0.0
+        self.load_error = None
+        self.loaded = Event()
+        self.pipelined = pipelined
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='classification')
+        self.pending = []
+        self.debug_sink = debug_sink
+        self.adaptive_confidence = adaptive_confidence
+        self.adaptive_agreement = adaptive_agreement
+
+    def start_loading(self):
+        """Starts loading the camera and the model in a background thread"""
+        Thread(name='camera_loading', target=self.load, daemon=True).start()
+
+    def load(self):
+        """Opens the camera, loads the model and runs one warm-up inference"""
+        try:
+            if self.camera is None:
+                self.camera = VideoCaptureSource(1)
+            self.load_progress = 0.1
+            self.start_camera()
+            self.load_progress = 0.3
+            self.model.load(self.model_path)
+            self.load_progress = 0.9
+            # the first call builds the graph, it is much slower than the following ones
+            batch_size = 1 if self.pipelined else 3
+            self.model.predict(np.zeros((batch_size, self.roi[3], self.roi[2], 3), dtype='float32'))
+            self.load_progress = 1.0
+        except Exception as error:
+            self.load_error = error
+        finally:
+            self.loaded.set()
+
+    def is_loaded(self) -> bool:
+        """Checks if loading has finished"""
+        return self.loaded.is_set()
+
+    def wait_until_loaded(self):
+        """Blocks until the camera and the model are ready, raises the error if loading failed"""
+        self.loaded.wait()
+        if self.load_error is not None:
+            raise RuntimeError('camera or CNN model could not be loaded') from self.load_error
 
     def start_camera(self):
-        """Starts the camera with specific properties"""
+        """Starts the camera with specific properties and its frame grabbing thread"""
         self.camera.set(28, self.focus)
         self.camera.set(3, self.width)
         self.camera.set(4, self.height)
+        self.camera.start()
 
-    def capture_image(self):
-        """Captures image, crops it and appends to the images table"""
-        _, image = self.camera.read()
+    @Tracer.traced('camera.capture')
+    def capture_image(self, after: float = None):
+        """
+        Captures image, crops it and appends to the images table
+        :param after: time.monotonic() value, only a frame read after it is used; by default the newest frame
+        """
+        self.wait_until_loaded()
+        if after is None:
+            image, _ = self.camera.latest()
+        else:
+            image, _ = self.camera.frame_after(after)
         cropped = image[self.roi[1]:self.roi[1] + self.roi[3], self.roi[0]:self.roi[0] + self.roi[2]]
-        cv2.imwrite('captured.png', cropped)
-        self.image.append(cropped)
+        if self.debug_sink is not None:
+            self.debug_sink.push(cropped)
+        if self.pipelined:
+            self.pending.append(self.worker.submit(self.classify, cropped))
+        else:
+            self.image.append(cropped)
+
+    @Tracer.traced('camera.classify')
+    def classify(self, image: np.ndarray) -> np.ndarray:
+        """
+        Preprocesses and classifies a single image
+        :param image: cropped image from the camera
+        :raises RuntimeError: if the backend failed
+        :return: probabilities of all classes
+        """
+        batch = np.asarray(image, dtype='float32')[np.newaxis]
+        return self._classify_batch(batch)[0]
+
+    def _classify_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Runs the model on a batch of images
+        :raises RuntimeError: if the backend failed, whatever its own exception was
+        :return: probabilities of all classes for every image
+        """
+        try:
+            return self.softmax(self.model.predict(batch))
+        except Exception as error:
+            raise RuntimeError(f'{self.model.name} backend failed to classify the images') from error
+
+    def clear_images(self):
+        """Forgets images captured for a classification that was abandoned"""
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.image.clear()
 
     def stop_camera(self):
         """Stops the camera"""
-        self.camera.release()
+        self.worker.shutdown(wait=False)
+        if self.debug_sink is not None:
+            self.debug_sink.close()
+        if self.camera is not None:
+            self.camera.stop()
 
     def set_roi(self):
         """Sets the ROI"""
-        _, frame = self.camera.read()
+        self.wait_until_loaded()
+        import cv2
+        frame, _ = self.camera.latest()
         self.roi = cv2.selectROI('select ROI', frame)
         self.roi_table.append(self.roi)
 
+    @Tracer.traced('camera.confidence')
+    def is_confident(self) -> bool:
+        """
+        Checks if the images captured so far decide the symbol, so the robot does not have to go to the next camera
+        point. Images agree when they have the same most probable class with at least adaptive_confidence; ties
+        and low confidence ask for another image. Waits for the classification of the captured images
+        :raises RuntimeError: if the backend failed to classify an image
+        :return: False if adaptive capture is disabled
+        """
+        if self.adaptive_confidence is None or not self.pipelined:
+            return False
+        votes = np.zeros(len(self.classes), dtype=int)
+        for future in self.pending:
+            prediction = future.result()
+            best = np.argmax(prediction)
+            if prediction[best] >= self.adaptive_confidence:
+                votes[best] += 1
+        leaders = np.flatnonzero(votes == votes.max())
+        return len(leaders) == 1 and votes[leaders[0]] >= self.adaptive_agreement
+
+    @Tracer.traced('camera.predict')
     def predict(self) -> str:
-        """Makes a triple prediction and gets the most common one"""
-        image = self.image
-        image = np.array(image, dtype='float32')
-        image = image
-        predictions = self.model.predict(image)
-        predictions = softmax(predictions)
+        """
+        Makes a prediction from the captured images and gets the most common one, ties go to the most probable
+        :raises RuntimeError: if loading failed or the backend failed to classify an image
+        """
+        self.wait_until_loaded()
+        if self.pipelined:
+            # images were classified while the robot was moving, usually nothing is left to wait for
+            try:
+                predictions = [future.result() for future in self.pending]
+            finally:
+                self.pending.clear()
+        else:
+            image = self.image
+            image = np.array(image, dtype='float32')
+            self.image.clear()
+            predictions = self._classify_batch(image)
         best = np.zeros(len(self.classes))
-        self.image.clear()
         for prediction in predictions:
             best[np.argmax(prediction)] += 1
+        # summed probabilities are below the number of images, so they only decide between equal votes
+        best = best * (len(predictions) + 1) + np.sum(predictions, axis=0)
         return self.classes[np.argmax(best)]
 
+    @staticmethod
+    def softmax(predictions: np.ndarray) -> np.ndarray:
+        """Softmax over the last axis, computed with numpy so TensorFlow is not needed after the model is loaded"""
+        exp = np.exp(predictions - np.max(predictions, axis=-1, keepdims=True))
+        return exp / np.sum(exp, axis=-1, keepdims=True)
+
     def calibrate_camera(self):
         """Shows window with camera image to place the camera on the proper position"""
+        self.wait_until_loaded()
+        import cv2
+        timestamp = 0.0
         while 1:
-            _, image = self.camera.read()
+            image, timestamp = self.camera.frame_after(timestamp)
             cropped = image[self.roi[1]:self.roi[1] + self.roi[3], self.roi[0]:self.roi[0] + self.roi[2]]
             cv2.imshow('PRESS Q TO QUIT', cropped)
             if cv2.waitKey(1) & 0xFF == ord('q'):
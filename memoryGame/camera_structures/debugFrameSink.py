@@ -0,0 +1,76 @@
+import os
+import time
+from collections import deque
+from queue import Queue, Full
+from threading import Thread
+
+import numpy as np
+
+
+class DebugFrameSink:
+    """
+    Opt-in sink of captured ROI images for debugging. Images are written to disk by a background thread, either as
+    numbered PNG files or, with the most recent ones kept in a bounded in-memory ring, as one compressed archive when
+    the sink is closed, so the capture loop itself never encodes or writes anything
+
+    Attributes
+    ----------
+    :arg directory: directory the images are written to
+    :arg archive: True to write one compressed .npz archive on close instead of single PNG files
+    :arg frames: ring of the most recent (number, image) pairs, None when single files are written
+    :arg number: number of the next image
+    :arg dropped: number of images that were not written because the writer could not keep up
+    :arg queue: images waiting for the writer thread
+    :arg writer: background writer thread
+
+    Parameters
+    ----------
+    :param directory: directory for the images, created if it does not exist
+    :param capacity: number of images kept in memory and waiting for the writer
+    :param archive: write one archive on close instead of numbered files
+    """
+    def __init__(self, directory: str = 'captured', capacity: int = 64, archive: bool = False):
+        self.directory = directory
+        self.archive = archive
+        self.frames = deque(maxlen=capacity) if archive else None
+        self.number = 0
+        self.dropped = 0
+        self.queue = Queue(maxsize=capacity)
+        os.makedirs(directory, exist_ok=True)
+        self.writer = Thread(name='debug_frames', target=self._write_frames, daemon=True)
+        self.writer.start()
+
+    def push(self, image: np.ndarray):
+        """
+        Stores the image, never blocks the caller
+        :param image: captured image, it is copied so the camera frame can be released
+        """
+        image = np.ascontiguousarray(image).copy()
+        if self.archive:
+            self.frames.append((self.number, image))
+        else:
+            try:
+                self.queue.put_nowait((self.number, image))
+            except Full:
+                self.dropped += 1
+        self.number += 1
+
+    def close(self):
+        """Writes what is left and stops the writer thread"""
+        self.queue.put(None)
+        self.writer.join()
+
+    def _write_frames(self):
+        """Writes queued images to disk, in archive mode writes the ring when the sink is closed"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            import cv2
+            number, image = item
+            cv2.imwrite(os.path.join(self.directory, f'{number:06d}.png'), image)
+        if self.archive and self.frames:
+            frames = list(self.frames)
+            path = os.path.join(self.directory, time.strftime('frames_%Y%m%d_%H%M%S.npz'))
+            np.savez_compressed(path, numbers=np.array([number for number, _ in frames]),
+                                frames=np.array([image for _, image in frames]))
@@ -0,0 +1,56 @@
+import random
+
+from memoryGame.gameboard_structures.symbolsGenerator import SymbolsGenerator
+
+
+class FakeCamera:
+    """
+    Stand-in for CameraProcess used by the headless simulation. The board has a hidden layout made from a seed,
+    predict answers at once with the symbol of the element the robot was sent to
+
+    Attributes
+    ----------
+    :arg robot: connector whose actual_coord tells which element is in front of the camera
+    :arg layout: hidden symbol name of every element of the board
+    :arg captures: number of captured images
+    :arg predictions: number of predictions
+
+    Parameters
+    ----------
+    :param robot: FakeEpson or Epson
+    :param seed: seed of the layout
+    :param num_of_boxes: number of elements on the board
+    """
+    def __init__(self, robot, seed: int = 0, num_of_boxes: int = 28):
+        self.robot = robot
+        symbols = list(SymbolsGenerator.generate_symbols_dict().keys())
+        self.layout = (symbols + symbols)[:num_of_boxes]
+        random.Random(seed).shuffle(self.layout)
+        self.captures = 0
+        self.predictions = 0
+
+    def is_loaded(self) -> bool:
+        """Nothing has to be loaded"""
+        return True
+
+    def wait_until_loaded(self):
+        """Nothing has to be loaded"""
+
+    def capture_image(self, after: float = None):
+        """Counts the captures, the image is not needed"""
+        self.captures += 1
+
+    def clear_images(self):
+        """No images are kept"""
+
+    def is_confident(self) -> bool:
+        """Adaptive capture is not simulated, the robot goes to all camera points"""
+        return False
+
+    def predict(self) -> str:
+        """Returns the hidden symbol of the element the robot brought to the camera"""
+        self.predictions += 1
+        return self.layout[self.robot.actual_coord - 511]
+
+    def stop_camera(self):
+        """There is no camera to stop"""
@@ -0,0 +1,181 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from threading import Condition, Thread
+
+import numpy as np
+
+
+class FrameSource(ABC):
+    """
+    Source of camera frames that reads continuously on a dedicated thread and always serves the newest frame with
+    the time it was read, so the driver's buffer never hands out stale frames. Subclasses implement read_frame, a
+    source without it cannot be created
+
+    Attributes
+    ----------
+    :arg frame: the newest frame
+    :arg timestamp: time.monotonic() of the moment the newest frame was read
+    :arg condition: notified whenever a new frame arrives
+    :arg running: True while the grabbing thread runs
+    :arg thread: the grabbing thread
+    """
+    def __init__(self):
+        self.frame = None
+        self.timestamp = 0.0
+        self.condition = Condition()
+        self.running = False
+        self.thread = None
+
+    @abstractmethod
+    def read_frame(self):
+        """
+        Reads a single frame, blocks until it is available
+        :return: (success, frame) like cv2.VideoCapture.read
+        """
+
+    def set(self, prop: int, value):
+        """Sets a property of the camera, see cv2.VideoCapture.set; sources without a camera ignore it"""
+        return False
+
+    def release(self):
+        """Releases resources of the source"""
+
+    def start(self):
+        """Starts the grabbing thread"""
+        self.running = True
+        self.thread = Thread(name='frame_grabber', target=self._grab, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the grabbing thread and releases the source"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        self.release()
+
+    def latest(self, timeout: float = 1.0) -> tuple:
+        """
+        Returns the newest frame
+        :param timeout: time in seconds to wait if no frame was read yet
+        :return: (frame, timestamp)
+        """
+        return self.frame_after(0.0, timeout)
+
+    def frame_after(self, after: float, timeout: float = 1.0) -> tuple:
+        """
+        Returns the first frame read after the given time
+        :param after: time.monotonic() value, older frames are skipped
+        :param timeout: time in seconds to wait for such a frame
+        :return: (frame, timestamp)
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.timestamp > after, timeout):
+                raise TimeoutError(f'no camera frame within {timeout} s')
+            return self.frame, self.timestamp
+
+    def _grab(self):
+        """Reads frames as long as the source runs"""
+        while self.running:
+            success, frame = self.read_frame()
+            timestamp = time.monotonic()
+            if not success:
+                time.sleep(0.01)
+                continue
+            with self.condition:
+                self.frame = frame
+                self.timestamp = timestamp
+                self.condition.notify_all()
+
+
+class VideoCaptureSource(FrameSource):
+    """
+    Frames from a camera opened with OpenCV
+
+    Parameters
+    ----------
+    :param index: index of the camera
+    """
+    def __init__(self, index: int = 1):
+        super().__init__()
+        import cv2
+        self.capture = cv2.VideoCapture(index)
+
+    def read_frame(self):
+        return self.capture.read()
+
+    def set(self, prop: int, value):
+        return self.capture.set(prop, value)
+
+    def release(self):
+        self.capture.release()
+
+
+class FileSource(FrameSource):
+    """
+    Frames from a video file or a directory of images, played in a loop at the given rate
+
+    Parameters
+    ----------
+    :param path: video file or directory with images
+    :param fps: number of frames per second
+    """
+    def __init__(self, path: str, fps: float = 30.0):
+        super().__init__()
+        import cv2
+        self.period = 1.0 / fps
+        self.images = []
+        self.index = 0
+        self.capture = None
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                image = cv2.imread(os.path.join(path, filename))
+                if image is not None:
+                    self.images.append(image)
+        else:
+            self.capture = cv2.VideoCapture(path)
+
+    def read_frame(self):
+        time.sleep(self.period)
+        if self.capture is None:
+            if not self.images:
+                return False, None
+            image = self.images[self.index % len(self.images)]
+            self.index += 1
+            return True, image
+        success, image = self.capture.read()
+        if not success:
+            # start the video from the beginning
+            import cv2
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, image = self.capture.read()
+        return success, image
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames of seeded noise with the frame number in the first pixel, for runs without a camera
+
+    Parameters
+    ----------
+    :param width: width of frames
+    :param height: height of frames
+    :param fps: number of frames per second
+    :param seed: seed of the noise
+    """
+    def __init__(self, width: int = 960, height: int = 540, fps: float = 30.0, seed: int = 0):
+        super().__init__()
+        self.period = 1.0 / fps
+        self.noise = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.number = 0
+
+    def read_frame(self):
+        time.sleep(self.period)
+        frame = self.noise.copy()
+        frame[0, 0] = self.number % 256
+        self.number += 1
+        return True, frame
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class InferenceBackend(ABC):
+    """
+    Interface of the runtimes that classify the captured images, CameraProcess only talks to the model through it.
+    A backend missing load or predict cannot be created
+
+    Attributes
+    ----------
+    :arg name: name of the backend used in the configuration
+    :arg extension: extension of the model file used by the backend
+    """
+    name = ''
+    extension = ''
+
+    @abstractmethod
+    def load(self, model_path: str):
+        """
+        Loads the model
+        :param model_path: path of the model file
+        """
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Classifies a batch of images
+        :param batch: float32 array of shape (n, height, width, 3)
+        :return: raw outputs of the model of shape (n, number of classes)
+        """
+
+
+class KerasBackend(InferenceBackend):
+    """Runs the original .h5 model with TensorFlow Keras"""
+    name = 'keras'
+    extension = '.h5'
+
+    def __init__(self):
+        self.model = None
+
+    def load(self, model_path: str):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        # calling the model directly skips the per call data pipeline of model.predict, much faster for small batches
+        return np.asarray(self.model(batch, training=False))
+
+
+class TFLiteBackend(InferenceBackend):
+    """Runs a converted .tflite model, with the tflite_runtime package if installed or with TensorFlow otherwise"""
+    name = 'tflite'
+    extension = '.tflite'
+
+    def __init__(self):
+        self.interpreter = None
+        self.input_index = None
+        self.output_index = None
+        self.input_shape = None
+
+    def load(self, model_path: str):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.interpreter = Interpreter(model_path=model_path)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.interpreter.allocate_tensors()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        # tensors are reallocated only when the batch size changes
+        if batch.shape != self.input_shape:
+            self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+            self.interpreter.allocate_tensors()
+            self.input_shape = batch.shape
+        self.interpreter.set_tensor(self.input_index, batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+
+
+class OnnxBackend(InferenceBackend):
+    """Runs a converted .onnx model with ONNX Runtime on the CPU"""
+    name = 'onnx'
+    extension = '.onnx'
+
+    def __init__(self):
+        self.session = None
+        self.input_name = None
+
+    def load(self, model_path: str):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+BACKENDS = {backend.name: backend for backend in (KerasBackend, TFLiteBackend, OnnxBackend)}
+
+
+def create_backend(name: str) -> InferenceBackend:
+    """
+    Creates the inference backend of the given name
+    :param name: one of the BACKENDS keys
+    """
+    if name not in BACKENDS:
+        raise ValueError(f'unknown inference backend {name}, choose one of {", ".join(BACKENDS)}')
+    return BACKENDS[name]()
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.statusPoller import StatusPoller, RobotTimeoutError
+
+
+class AsyncEpson:
+    """
+    Asyncio variant of the Epson connector. Its operations are coroutines that go through one serialized command
+    queue, so UI redraws, camera capture and robot I/O can share a single event loop. Blocking Modbus requests run
+    on one worker thread, status waits are woken by the status poller the moment a bit flips
+
+    Attributes
+    ----------
+    :arg robot: synchronous Epson connector doing the Modbus requests
+    :arg executor: single thread running the blocking requests in order
+    :arg loop: event loop the connector runs on
+    :arg queue: queue of (function, arguments, future) commands
+    :arg worker: task executing the queued commands one by one
+    :arg waiters: list of (input index, state, since, future) of coroutines waiting for a status bit
+
+    Parameters
+    ----------
+    :param robot: connector to wrap, a new one by default
+    """
+    def __init__(self, robot: Epson = None):
+        self.robot = robot if robot is not None else Epson()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='epson_commands')
+        self.loop = None
+        self.queue = None
+        self.worker = None
+        self.waiters = []
+
+    async def start_connection(self) -> bool:
+        """Starts the command queue and connects to the robot, a robot that is connected already is only attached"""
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run_commands())
+        connected = self.robot.online or await self._submit(self.robot.start_connection)
+        if connected:
+            self.robot.poller.listeners.append(self._on_status)
+        return bool(connected)
+
+    async def close_connection(self):
+        """Closes the connection after all queued commands are sent"""
+        await self._submit(self.robot.close_connection)
+        self.worker.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def write_coordinates(self, coordinates: int, go_camera: bool = False) -> bool:
+        """Sends the point selected by the player/ai to follow by robot"""
+        return await self._submit(self.robot.write_coordinates, coordinates, go_camera)
+
+    async def place_back(self) -> bool:
+        """Gives an instruction to place an item back on place"""
+        return await self._submit(self.robot.place_back)
+
+    async def reset_all(self) -> bool:
+        """Resets all robot's coils"""
+        return await self._submit(self.robot.reset_all)
+
+    async def write_coils(self, changes: dict) -> bool:
+        """Writes several coils as one transaction, see Epson.write_coils"""
+        return await self._submit(self.robot.write_coils, changes)
+
+    async def next_camera(self):
+        """Gives instruction to go to the next camera point"""
+        await self._submit(self.robot.next_camera)
+
+    async def test_camera(self, start: bool = False):
+        """Starts or stops testing the camera position"""
+        await self._submit(self.robot.test_camera, start)
+
+    async def wait_for(self, instruction: Instructions, timeout: float = None, state: bool = True,
+                       since: float = 0.0) -> float:
+        """
+        Waits until the robot sets a status bit
+        :param instruction: CAMERA_POINT, HOME_POSITION or ELECTROMAGNET
+        :param timeout: time in seconds, by default the robot's response_timeout
+        :param state: awaited state of the bit
+        :param since: only status read after this time.monotonic() value is taken into account
+        :raises RobotTimeoutError: if the bit does not get the state in time
+        :return: time waited in seconds, as Epson.wait_for
+        """
+        if timeout is None:
+            timeout = self.robot.response_timeout
+        index = StatusPoller.INPUTS[instruction]
+        poller = self.robot.poller
+        start = time.monotonic()
+        inputs, timestamp = poller.inputs, poller.timestamp
+        if inputs is not None and timestamp > since and inputs[index] == state:
+            return 0.0
+        waiter = (index, state, since, self.loop.create_future())
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[3], timeout)
+            return time.monotonic() - start
+        except asyncio.TimeoutError:
+            raise RobotTimeoutError(f'robot did not set {instruction.name} to {state} within {timeout} s') from None
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    async def _submit(self, function, *args):
+        """Puts a command in the queue and waits for its result"""
+        future = self.loop.create_future()
+        await self.queue.put((function, args, future))
+        return await future
+
+    async def _run_commands(self):
+        """Executes queued commands in order"""
+        while True:
+            function, args, future = await self.queue.get()
+            try:
+                result = await self.loop.run_in_executor(self.executor, function, *args)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def _on_status(self, inputs: tuple, timestamp: float):
+        """Called by the status poller thread after every read"""
+        self.loop.call_soon_threadsafe(self._wake_waiters, inputs, timestamp)
+
+    def _wake_waiters(self, inputs: tuple, timestamp: float):
+        """Resolves waits whose status bit has the awaited state"""
+        for index, state, since, future in list(self.waiters):
+            if not future.done() and timestamp > since and inputs[index] == state:
+                future.set_result(timestamp)
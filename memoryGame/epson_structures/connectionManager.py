@@ -0,0 +1,85 @@
+from threading import Event, Thread
+
+from memoryGame.epson_structures.epsonConnector import Epson
+
+
+class ConnectionManager:
+    """
+    Keeps one persistent session with the robot without blocking the game. Connects in the background, detects
+    a dropped connection through the status poller and reconnects with exponential backoff; after a reconnect the
+    robot gets the coil state from the connector's shadow image again
+
+    Attributes
+    ----------
+    :arg robot: Epson connector
+    :arg min_backoff: time in seconds before the first retry
+    :arg max_backoff: longest time in seconds between two retries
+    :arg state: DISCONNECTED before the start, CONNECTING from the first attempt or a drop until a connect
+    succeeds, CONNECTED
+    :arg failed_attempts: number of failed attempts since the robot was last connected
+    :arg reconnects: number of successful reconnects after a drop
+    :arg stopped: set when the manager should stop
+    :arg thread: background thread managing the connection
+
+    Parameters
+    ----------
+    :param robot: Epson connector to manage
+    :param min_backoff: time in seconds before the first retry
+    :param max_backoff: longest time in seconds between two retries
+    """
+    DISCONNECTED = 'disconnected'
+    CONNECTING = 'connecting'
+    CONNECTED = 'connected'
+
+    def __init__(self, robot: Epson, min_backoff: float = 0.5, max_backoff: float = 8.0):
+        self.robot = robot
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.state = self.DISCONNECTED
+        self.failed_attempts = 0
+        self.reconnects = 0
+        self.stopped = Event()
+        self.thread = None
+
+    def start(self):
+        """Starts connecting in the background"""
+        self.thread = Thread(name='robot_connection', target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops managing the connection, the connection itself is closed by Epson.close_connection"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def is_connected(self) -> bool:
+        """Checks if the robot can be used"""
+        return self.state == self.CONNECTED
+
+    def _run(self):
+        """Connects, watches the connection and reconnects as long as the manager runs"""
+        backoff = self.min_backoff
+        while not self.stopped.is_set():
+            if self.state == self.CONNECTED:
+                if self.robot.connection_lost():
+                    self.state = self.CONNECTING
+                    continue
+                self.stopped.wait(0.1)
+                continue
+
+            self.state = self.CONNECTING
+            if self.robot.c is None:
+                connected = self.robot.start_connection()
+            else:
+                connected = self.robot.reconnect()
+                if connected:
+                    self.reconnects += 1
+            if connected:
+                self.state = self.CONNECTED
+                self.failed_attempts = 0
+                backoff = self.min_backoff
+            else:
+                # the state stays CONNECTING while retrying, so the menu does not flicker during the backoff
+                self.failed_attempts += 1
+                self.stopped.wait(backoff)
+                backoff = min(2 * backoff, self.max_backoff)
@@ -1,12 +1,19 @@
 import time
+from threading import RLock, local
 
 from pyModbusTCP.client import ModbusClient
 from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.statusPoller import StatusPoller
+from utils.tracing import Tracer
 
 
 class Epson:
     """
-    Class that manages connection with epson scara via ModbusTCP
+    Class that manages connection with epson scara via ModbusTCP.
+    A shadow image of the robot's coils is kept locally, only coils whose value changes are sent and neighbouring
+    changes go as one write_multiple_coils request. Writes made between begin() and commit() are sent together, in
+    the order they were made and with no other request of another thread in between.
+    Status inputs are read by one StatusPoller thread, wait_for blocks until a status bit is set or the timeout passes
 
     Attributes
     ----------
@@ -15,54 +22,216 @@ class Epson:
     :arg c: connection class of ModbusClient
     :arg actual_coord: coordinate selected by player
     :arg second_camera: should go to the last camera
+    :arg coils: shadow image of the robot's coils, address -> value as last written
+    :arg transaction: per-thread state, its steps are the coil writes collected by that thread since begin(), None
+    if the thread has no open transaction
+    :arg io_lock: serializes requests of the game threads and the status poller on one connection
+    :arg poller: StatusPoller reading the status inputs while connected
+    :arg poll_rate: number of status reads per second
+    :arg response_timeout: default time in seconds to wait for a status bit
+    :arg client_factory: function creating the Modbus client from the ip and the port
+    :arg online: False while the connection is down, coil writes fail at once instead of waiting for timeouts
+    :arg max_failures: number of failed status reads in a row after which the connection counts as lost
+    :arg timeout: time in seconds a Modbus request may take
+    :arg degraded_timeout: time in seconds a Modbus request may take after a failed status read, so a dropped
+    connection is detected in a few seconds and does not hold io_lock for max_failures full timeouts
+
+    Parameters
+    ----------
+    :param ip: ip of the robot
+    :param port: port of the Modbus TCP server
+    :param poll_rate: number of status reads per second
+    :param response_timeout: default time in seconds to wait for a status bit
+    :param client_factory: function creating the Modbus client, e.g. RecordingClient.factory or
+    ReplayClient.factory from modbusTrace; a ModbusClient by default
     """
-    def __init__(self):
-        self.ip = '192.168.1.2'
-        self.port = 502
+    def __init__(self, ip: str = '192.168.1.2', port: int = 502, poll_rate: float = 100.0,
+                 response_timeout: float = 30.0, client_factory=None):
+        self.ip = ip
+        self.port = port
         self.c = None
         self.actual_coord = 0
         self.second_camera = False
+        self.coils = {}
+        self.transaction = local()
+        self.io_lock = RLock()
+        self.poller = None
+        self.poll_rate = poll_rate
+        self.response_timeout = response_timeout
+        self.client_factory = client_factory if client_factory is not None else self._modbus_client
+        self.online = False
+        self.max_failures = 5
+        self.timeout = 3.0
+        self.degraded_timeout = 0.3
 
     def start_connection(self):
         """
         starts the connection
         """
-        self.c = ModbusClient(host=self.ip, port=self.port, auto_open=True, timeout=3.0)
-        if self.c.write_single_coil(Instructions.START_GAME.value, 1):
-            self.reset_all()
+        self.c = self.client_factory(self.ip, self.port)
+        self.online = True
+        if self.write_coils({Instructions.START_GAME.value: 1}, force=True):
+            self.reset_all(force=True)
+            self.poller = StatusPoller(self.read_status, self.poll_rate)
+            self.poller.start()
             return 1
         else:
             self.c = None
+            self.online = False
             return 0
 
+    @staticmethod
+    def _modbus_client(host: str, port: int) -> ModbusClient:
+        """Creates the client of a real robot"""
+        return ModbusClient(host=host, port=port, auto_open=True, timeout=3.0)
+
+    def connection_lost(self) -> bool:
+        """Checks if the status poller failed to read the robot's status several times in a row"""
+        return self.poller is not None and self.poller.failures >= self.max_failures
+
+    def reconnect(self) -> bool:
+        """
+        Opens the connection again and restores the robot's coils from the shadow image
+        :return: True if connected
+        """
+        self.online = False
+        self.poller.paused = True
+        with self.io_lock:
+            self.c.close()
+            if not self.c.open():
+                return False
+            self.online = True
+            if not self.write_coils(dict(self.coils), force=True):
+                self.online = False
+                return False
+        self.poller.failures = 0
+        self.poller.paused = False
+        return True
+
     def close_connection(self):
         """
         closes the connection
         """
-        self.c.write_single_coil(Instructions.START_GAME.value, 0)
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+        if not self.online:
+            return
+        self.begin()
+        self.write_coils({Instructions.START_GAME.value: 0})
         self.reset_all()
+        self.commit()
         self.c.close()
+        self.online = False
+
+    def begin(self):
+        """Starts collecting coil writes of the calling thread, they are sent by commit()"""
+        if getattr(self.transaction, 'steps', None) is None:
+            self.transaction.steps = []
+
+    def commit(self) -> bool:
+        """
+        Sends the coil writes the calling thread collected since begin(), every write keeps its own requests so
+        e.g. a reset still reaches the robot before the command that follows it
+        :return: True if no error
+        """
+        steps, self.transaction.steps = getattr(self.transaction, 'steps', None), None
+        with self.io_lock:
+            for changes in steps or ():
+                if not self.write_coils(changes):
+                    return False
+        return True
+
+    @Tracer.traced('robot.write_coils')
+    def write_coils(self, changes: dict, force: bool = False) -> bool:
+        """
+        Writes coils that differ from the shadow image, neighbouring coils with one request.
+        Inside a transaction of the calling thread the changes are only collected
+        :param changes: address -> value
+        :param force: send all given coils even if the shadow image says they are set already
+        :return: True if no error
+        """
+        steps = getattr(self.transaction, 'steps', None)
+        if steps is not None:
+            steps.append(dict(changes))
+            return True
+        # do not wait for network timeouts while the connection is being restored
+        if not self.online:
+            return False
+        with self.io_lock:
+            changed = {address: bool(value) for address, value in changes.items()
+                       if force or self.coils.get(address) != bool(value)}
+            for start, values in self._coil_runs(changed):
+                if len(values) == 1:
+                    response = self.c.write_single_coil(start, values[0])
+                else:
+                    response = self.c.write_multiple_coils(start, values)
+                if not response:
+                    return False
+                for i, value in enumerate(values):
+                    self.coils[start + i] = value
+        return True
+
+    @staticmethod
+    def _coil_runs(changes: dict) -> list:
+        """
+        Groups changes into runs of neighbouring addresses
+        :param changes: address -> value, in order the changes were made
+        :return: list of (first address, values), in order of the earliest change of every run
+        """
+        order = {address: i for i, address in enumerate(changes)}
+        runs = []
+        for address in sorted(changes):
+            if runs and address == runs[-1][0] + len(runs[-1][1]):
+                runs[-1][1].append(changes[address])
+            else:
+                runs.append((address, [changes[address]]))
+        runs.sort(key=lambda run: min(order[run[0] + i] for i in range(len(run[1]))))
+        return runs
 
     def write_coordinates(self, coordinates: int, go_camera: bool = False) -> bool:
         """
         Sends the point selected by the player/ai to follow by robot
         """
-        self.c.write_single_coil(Instructions.PLACE_BACK.value, 0)
-
-        if go_camera:
-            response = self.c.write_single_coil(Instructions.NEW_COMMAND.value, 1)
-            if not response:
-                return False
-        else:
-            response = self.c.write_single_coil(Instructions.WITHOUT_CAMERA.value, 1)
-            if not response:
-                return False
         coordinates += 511
         self.actual_coord = coordinates
-        response = self.c.write_single_coil(coordinates, 1)
-        if not response:
-            return False
-        return True
+        if go_camera:
+            # every reveal starts with the first camera point, whatever the previous one skipped
+            self.second_camera = False
+            command = Instructions.NEW_COMMAND.value
+        else:
+            command = Instructions.WITHOUT_CAMERA.value
+        return self.write_coils({Instructions.PLACE_BACK.value: 0, command: 1, coordinates: 1})
+
+    @Tracer.traced('robot.read_status')
+    def read_status(self):
+        """
+        Reads all status inputs of the robot
+        :return: list of CAMERA_POINT, HOME_POSITION and ELECTROMAGNET states, None if the read failed
+        """
+        degraded = self.poller is not None and self.poller.failures > 0
+        timeout = self.degraded_timeout if degraded else self.timeout
+        with self.io_lock:
+            # clients without a timeout, like ReplayClient, are left alone
+            if getattr(self.c, 'timeout', timeout) != timeout:
+                self.c.timeout = timeout
+            return self.c.read_discrete_inputs(511, 3)
+
+    def wait_for(self, instruction: Instructions, timeout: float = None, state: bool = True,
+                 since: float = 0.0) -> float:
+        """
+        Waits until the robot sets a status bit, see StatusPoller.wait_for
+        :param instruction: CAMERA_POINT, HOME_POSITION or ELECTROMAGNET
+        :param timeout: time in seconds, by default response_timeout
+        :param state: awaited state of the bit
+        :param since: only status read after this time.monotonic() value is taken into account
+        :raises RobotTimeoutError: if the bit does not get the state in time
+        :return: time waited in seconds
+        """
+        if timeout is None:
+            timeout = self.response_timeout
+        with Tracer.span('robot.wait_' + instruction.name.lower()):
+            return self.poller.wait_for(instruction, timeout, state, since)
 
     def get_response(self, instruction: Instructions) -> bool:
         """
@@ -70,7 +239,9 @@ class Epson:
         :param instruction: which response to get
         :return: state of specific output bit
         """
-        response = self.c.read_discrete_inputs(511, 3)
+        if self.poller is not None and self.poller.inputs is not None:
+            return self.poller.get(instruction)
+        response = self.read_status()
         if instruction == Instructions.CAMERA_POINT:
             return response[0]
         elif instruction == Instructions.HOME_POSITION:
@@ -85,32 +256,25 @@ class Epson:
         True if no error
         False if error
         """
-        response = self.c.write_single_coil(Instructions.PLACE_BACK.value, 1)
-        if not response:
-            return False
-        response = self.c.write_single_coil(Instructions.NEW_COMMAND.value, 0)
-        if not response:
-            return False
-        response = self.c.write_single_coil(Instructions.WITHOUT_CAMERA.value, 0)
-        if not response:
-            return False
-        response = self.c.write_single_coil(self.actual_coord, 0)
-        if not response:
-            return False
-        return True
+        return self.write_coils({Instructions.PLACE_BACK.value: 1,
+                                 Instructions.NEW_COMMAND.value: 0,
+                                 Instructions.WITHOUT_CAMERA.value: 0,
+                                 self.actual_coord: 0})
 
-    def reset_all(self):
-        """Resets all robot's coils"""
-        for i in range(511, 544):
-            self.c.write_single_coil(i, 0)
+    def reset_all(self, force: bool = False) -> bool:
+        """
+        Resets all robot's coils
+        :param force: write all coils even if the shadow image says they are reset already
+        """
+        return self.write_coils({i: 0 for i in range(511, 544)}, force=force)
 
     def next_camera(self):
         """Gives instruction to go to the next camera point"""
         if not self.second_camera:
-            self.c.write_single_coil(Instructions.GO_CAM_2.value, 1)
+            self.write_coils({Instructions.GO_CAM_2.value: 1})
             self.second_camera = True
         else:
-            self.c.write_single_coil(Instructions.GO_CAM_3.value, 1)
+            self.write_coils({Instructions.GO_CAM_3.value: 1})
             self.second_camera = False
 
     def test_camera(self, start=False):
@@ -119,6 +283,6 @@ class Epson:
         :param start: True if it is start of the process
         """
         if start:
-            self.c.write_single_coil(Instructions.TEST_CAMERA.value, 1)
+            self.write_coils({Instructions.TEST_CAMERA.value: 1})
         else:
-            self.c.write_single_coil(Instructions.TEST_CAMERA.value, 0)
+            self.write_coils({Instructions.TEST_CAMERA.value: 0})
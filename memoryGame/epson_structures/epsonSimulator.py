@@ -0,0 +1,196 @@
+import heapq
+import random
+import time
+from threading import Condition, Thread
+
+from pyModbusTCP.server import DataBank, ModbusServer
+
+from enums.epsonInstructions import Instructions
+from memoryGame.gameboard_structures.symbolsGenerator import SymbolsGenerator
+
+
+class SimulatorDataBank(DataBank):
+    """Data bank of the simulated robot, passes every coil change to the simulator"""
+    def __init__(self, simulator):
+        super().__init__()
+        self.simulator = simulator
+
+    def on_coils_change(self, address, from_value, to_value, srv_info):
+        self.simulator.coil_changed(address, to_value)
+
+
+class EpsonSimulator:
+    """
+    Local Modbus TCP server emulating the Epson Scara program the game talks to: the Instructions coils 539-545, the
+    coordinate coils 511 + N and the CAMERA_POINT, HOME_POSITION and ELECTROMAGNET inputs 511-513.
+    Motion times are jittered, the hidden layout of the board and all random decisions come from one seed and faults
+    (a robot stalling on its way, a dropped connection) can be injected with a given probability
+
+    Attributes
+    ----------
+    :arg CAMERA_POINT: address of the camera point input
+    :arg num_of_boxes: number of elements on the board
+    :arg motion_time: mean time in seconds of a move between the board and the camera point or home
+    :arg camera_time: mean time in seconds of a move between two camera points
+    :arg jitter: relative spread of the times, 0.2 means +-20 %
+    :arg stall_rate: probability that the robot never reaches the point of a command
+    :arg disconnect_rate: probability that the server drops all connections when a command comes
+    :arg disconnect_time: time in seconds the server stays unreachable after a drop
+    :arg random: seeded random generator
+    :arg layout: hidden symbol name of every element of the board
+    :arg server: Modbus TCP server
+    :arg mode: what the robot does: None at home, 'camera', 'show', 'test'
+    :arg commands: number of received move commands
+    :arg stalls: number of injected stalls
+    :arg disconnects: number of injected connection drops
+    :arg actions: heap of (time, number, function) planned input changes
+    :arg condition: guards the state of the simulator and wakes the action thread
+
+    Parameters
+    ----------
+    :param host: address the server listens on
+    :param port: port of the server
+    :param motion_time: mean time of a move to the board or home in seconds
+    :param camera_time: mean time of a move between camera points in seconds
+    :param jitter: relative spread of the times
+    :param seed: seed of the layout, the jitter and the faults
+    :param stall_rate: probability of a stalled move
+    :param disconnect_rate: probability of a dropped connection per command
+    :param disconnect_time: time in seconds the server is unreachable after a drop
+    """
+    CAMERA_POINT = 511
+    num_of_boxes = 28
+
+    def __init__(self, host: str = 'localhost', port: int = 5020, motion_time: float = 1.5, camera_time: float = 0.4,
+                 jitter: float = 0.2, seed: int = 0, stall_rate: float = 0.0, disconnect_rate: float = 0.0,
+                 disconnect_time: float = 2.0):
+        self.motion_time = motion_time
+        self.camera_time = camera_time
+        self.jitter = jitter
+        self.stall_rate = stall_rate
+        self.disconnect_rate = disconnect_rate
+        self.disconnect_time = disconnect_time
+        self.random = random.Random(seed)
+        symbols = list(SymbolsGenerator.generate_symbols_dict().keys())
+        self.layout = symbols + symbols
+        self.random.shuffle(self.layout)
+        self.data_bank = SimulatorDataBank(self)
+        self.server = ModbusServer(host, port, no_block=True, data_bank=self.data_bank)
+        self.mode = None
+        self.commands = 0
+        self.stalls = 0
+        self.disconnects = 0
+        self.actions = []
+        self.action_number = 0
+        self.condition = Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Starts the server at home position"""
+        self.set_inputs(camera_point=False, home=True, magnet=False)
+        self.running = True
+        self.thread = Thread(name='epson_simulator', target=self._run_actions, daemon=True)
+        self.thread.start()
+        self.server.start()
+
+    def stop(self):
+        """Stops the server"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join()
+        self.server.stop()
+
+    def symbol_at(self, coordinate: int) -> str:
+        """Returns the hidden symbol of an element of the board"""
+        return self.layout[coordinate]
+
+    def set_inputs(self, camera_point: bool = None, home: bool = None, magnet: bool = None):
+        """Sets status inputs, None leaves the input as it is"""
+        for offset, value in enumerate((camera_point, home, magnet)):
+            if value is not None:
+                self.data_bank.set_discrete_inputs(self.CAMERA_POINT + offset, [value])
+
+    def coil_changed(self, address: int, value: bool):
+        """Reacts to a coil written by the game, called by the server thread"""
+        with self.condition:
+            coils = self.data_bank.get_coils(511, 35)
+            coordinate = next((i for i in range(self.num_of_boxes) if coils[i]), None)
+            command = coils[Instructions.NEW_COMMAND.value - 511] or coils[Instructions.WITHOUT_CAMERA.value - 511]
+
+            # a new move starts when both the command and the coordinate are set
+            if self.mode is None and value and command and coordinate is not None:
+                self._start_move(camera=coils[Instructions.NEW_COMMAND.value - 511])
+            elif self.mode == 'camera' and value and \
+                    address in (Instructions.GO_CAM_2.value, Instructions.GO_CAM_3.value):
+                self.set_inputs(camera_point=False)
+                self._plan(self._duration(self.camera_time), lambda: self.set_inputs(camera_point=True))
+            elif self.mode == 'camera' and value and address == Instructions.PLACE_BACK.value:
+                self._return_home()
+            elif self.mode in ('camera', 'show') and not value and \
+                    address in (Instructions.NEW_COMMAND.value, Instructions.WITHOUT_CAMERA.value):
+                # the element was shown or the game gave up waiting for the robot
+                self._return_home()
+            elif address == Instructions.TEST_CAMERA.value:
+                if value and self.mode is None:
+                    self.mode = 'test'
+                    self.set_inputs(home=False, magnet=True)
+                    self._plan(self._duration(self.motion_time), lambda: self.set_inputs(camera_point=True))
+                elif not value and self.mode == 'test':
+                    self._return_home()
+
+    def _start_move(self, camera: bool):
+        """Goes to the element and then to the camera point or shows the element"""
+        self.commands += 1
+        self.mode = 'camera' if camera else 'show'
+        self.set_inputs(home=False)
+        if self.random.random() < self.disconnect_rate:
+            self.disconnects += 1
+            self._plan(0.0, Thread(name='epson_disconnect', target=self._disconnect, daemon=True).start)
+        if self.random.random() < self.stall_rate:
+            # the robot never gets there, the game has to time out
+            self.stalls += 1
+            return
+        self._plan(self._duration(self.motion_time), lambda: self.set_inputs(camera_point=True, magnet=True))
+
+    def _return_home(self):
+        """Places the element back and goes home"""
+        self.set_inputs(camera_point=False)
+        self.actions.clear()
+        self._plan(self._duration(self.motion_time), self._at_home)
+
+    def _at_home(self):
+        self.mode = None
+        self.set_inputs(camera_point=False, home=True, magnet=False)
+
+    def _disconnect(self):
+        """Drops the connections and makes the server unreachable for a while"""
+        self.server.stop()
+        time.sleep(self.disconnect_time)
+        self.server.start()
+
+    def _duration(self, mean: float) -> float:
+        """Jittered duration"""
+        return mean * (1 + self.random.uniform(-self.jitter, self.jitter))
+
+    def _plan(self, delay: float, action):
+        """Plans an action after the delay in seconds, must be called with the condition held"""
+        self.action_number += 1
+        heapq.heappush(self.actions, (time.monotonic() + delay, self.action_number, action))
+        self.condition.notify_all()
+
+    def _run_actions(self):
+        """Executes planned actions on time"""
+        with self.condition:
+            while self.running:
+                if not self.actions:
+                    self.condition.wait()
+                    continue
+                due, _, action = self.actions[0]
+                now = time.monotonic()
+                if due > now:
+                    self.condition.wait(due - now)
+                    continue
+                heapq.heappop(self.actions)
+                action()
@@ -0,0 +1,55 @@
+class FakeEpson:
+    """
+    Stand-in for the Epson connector used by the headless simulation. Every command succeeds and every status bit is
+    reached at once, the only kept state is the coordinate the robot was sent to, FakeCamera reads it
+
+    Attributes
+    ----------
+    :arg actual_coord: coil of the coordinate selected by the game, as in Epson
+    :arg poller: always None, no status is read
+    :arg response_timeout: kept for the move scheduler
+    :arg moves: number of move commands
+    """
+    def __init__(self):
+        self.actual_coord = 0
+        self.poller = None
+        self.response_timeout = 0.0
+        self.moves = 0
+
+    def start_connection(self):
+        """Connects at once"""
+        return 1
+
+    def close_connection(self):
+        """Nothing to close"""
+
+    def begin(self):
+        """Coil transactions are not needed"""
+
+    def commit(self) -> bool:
+        """Coil transactions are not needed"""
+        return True
+
+    def write_coordinates(self, coordinates: int, go_camera: bool = False) -> bool:
+        """Remembers the coordinate like the real connector"""
+        self.actual_coord = coordinates + 511
+        self.moves += 1
+        return True
+
+    def wait_for(self, instruction, timeout: float = None, state: bool = True, since: float = 0.0) -> float:
+        """The robot is always there already"""
+        return 0.0
+
+    def place_back(self) -> bool:
+        """The element is placed back at once"""
+        return True
+
+    def reset_all(self, force: bool = False) -> bool:
+        """Nothing to reset"""
+        return True
+
+    def next_camera(self):
+        """The robot is at every camera point at once"""
+
+    def test_camera(self, start=False):
+        """Nothing to test"""
@@ -0,0 +1,207 @@
+import json
+import time
+from threading import Lock
+
+from pyModbusTCP.client import ModbusClient
+
+
+class RecordingClient:
+    """
+    ModbusClient that records every coil write and discrete input read with its time and result. Every record is
+    appended to a JSON lines file as it is made, so memory does not grow over a session and a crash loses at most the
+    last line. A session appended to an existing recording continues its times, so they keep increasing
+
+    Attributes
+    ----------
+    :arg client: ModbusClient doing the requests
+    :arg path: file the records are appended to
+    :arg origin: time.monotonic() of the creation of the client, record times are relative to it
+    :arg offset: time of the last record already in the file, added to the times of this session
+    :arg file: line buffered file the records are written to
+    :arg lock: guards the file, the game threads and the status poller use one client
+
+    Parameters
+    ----------
+    :param host: address of the robot
+    :param port: Modbus TCP port of the robot
+    :param path: file for the records
+    """
+    def __init__(self, host: str, port: int, path: str):
+        self.client = ModbusClient(host=host, port=port, auto_open=True, timeout=3.0)
+        self.path = path
+        self.offset = self.last_time(path)
+        self.file = open(path, 'a', buffering=1)
+        self.origin = time.monotonic()
+        self.lock = Lock()
+
+    @classmethod
+    def factory(cls, path: str):
+        """Returns a client factory for Epson that records to the file"""
+        return lambda host, port: cls(host, port, path)
+
+    @property
+    def timeout(self) -> float:
+        """Time in seconds a request may take"""
+        return self.client.timeout
+
+    @timeout.setter
+    def timeout(self, value: float):
+        self.client.timeout = value
+
+    @staticmethod
+    def last_time(path: str) -> float:
+        """Returns the time of the last record of the file, 0 if there is no such file or it is empty"""
+        try:
+            with open(path, 'rb') as file:
+                file.seek(0, 2)
+                file.seek(max(0, file.tell() - 4096))
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return 0.0
+        for line in reversed(lines):
+            try:
+                return json.loads(line)['t']
+            except ValueError:
+                # an incomplete line of a crashed session
+                continue
+        return 0.0
+
+    def open(self) -> bool:
+        """Opens the connection"""
+        return self.client.open()
+
+    def close(self):
+        """Closes the connection, the file stays open for a reconnect"""
+        self.client.close()
+        with self.lock:
+            self.file.flush()
+
+    def write_single_coil(self, address: int, value: bool) -> bool:
+        """Writes a coil and records it"""
+        result = self.client.write_single_coil(address, value)
+        self._record('write', address, [bool(value)], bool(result))
+        return result
+
+    def write_multiple_coils(self, address: int, values: list) -> bool:
+        """Writes neighbouring coils and records them"""
+        result = self.client.write_multiple_coils(address, values)
+        self._record('write', address, [bool(value) for value in values], bool(result))
+        return result
+
+    def read_discrete_inputs(self, address: int, count: int = 1):
+        """Reads discrete inputs and records the result"""
+        result = self.client.read_discrete_inputs(address, count)
+        self._record('read', address, count, result)
+        return result
+
+    def _record(self, operation: str, address: int, values, result):
+        """Adds a record, values are the written values or the number of read inputs"""
+        record = {'t': round(self.offset + time.monotonic() - self.origin, 6), 'op': operation, 'address': address,
+                  'values': values, 'result': result}
+        with self.lock:
+            self.file.write(json.dumps(record) + '\n')
+
+
+class ReplayClient:
+    """
+    ModbusClient stand-in that replays a recorded session. The reads recorded after a coil write are served after
+    the replayed connector makes the same write, either at the recorded pace or, in fast mode, one change of the
+    inputs per read. Writes that do not match the recording are counted as divergences, reads of such a session
+    continue from the last matched write
+
+    Attributes
+    ----------
+    :arg writes: recorded writes as (address, values)
+    :arg segments: reads after every recorded write as lists of (time after the write, result), index 0 holds the
+    reads before the first write
+    :arg realtime: True to serve reads at the recorded pace
+    :arg window: how many recorded writes may be skipped to find a match
+    :arg position: index of the last matched write, -1 before the first one
+    :arg segment_start: time.monotonic() of the last matched write
+    :arg read_index: index of the next read of the segment in fast mode
+    :arg last_result: last served read result
+    :arg divergences: number of writes that were not found in the recording
+    :arg lock: guards the replay position
+
+    Parameters
+    ----------
+    :param path: JSON lines file written by RecordingClient
+    :param realtime: serve reads at the recorded pace instead of as fast as possible
+    :param window: how many recorded writes may be skipped to find a match
+    """
+    def __init__(self, path: str, realtime: bool = True, window: int = 8):
+        self.writes = []
+        self.segments = [[]]
+        segment_time = 0.0
+        with open(path) as file:
+            for line in file:
+                record = json.loads(line)
+                if record['op'] == 'write':
+                    self.writes.append((record['address'], record['values']))
+                    self.segments.append([])
+                    segment_time = record['t']
+                else:
+                    self.segments[-1].append((record['t'] - segment_time, record['result']))
+        if not realtime:
+            # only changes of the inputs matter when time is not replayed
+            self.segments = [[read for i, read in enumerate(segment) if i == 0 or read[1] != segment[i - 1][1]]
+                             for segment in self.segments]
+        self.realtime = realtime
+        self.window = window
+        self.position = -1
+        self.segment_start = time.monotonic()
+        self.read_index = 0
+        self.last_result = None
+        self.divergences = 0
+        self.lock = Lock()
+
+    @classmethod
+    def factory(cls, path: str, realtime: bool = True):
+        """Returns a client factory for Epson that replays the file"""
+        return lambda host, port: cls(path, realtime)
+
+    def open(self) -> bool:
+        """There is no connection to open"""
+        return True
+
+    def close(self):
+        """There is no connection to close"""
+
+    def write_single_coil(self, address: int, value: bool) -> bool:
+        """Replays a coil write"""
+        return self._write(address, [bool(value)])
+
+    def write_multiple_coils(self, address: int, values: list) -> bool:
+        """Replays a write of neighbouring coils"""
+        return self._write(address, [bool(value) for value in values])
+
+    def read_discrete_inputs(self, address: int, count: int = 1):
+        """Returns the recorded inputs for the current point of the replay"""
+        with self.lock:
+            segment = self.segments[self.position + 1]
+            if self.realtime:
+                elapsed = time.monotonic() - self.segment_start
+                while self.read_index < len(segment) and segment[self.read_index][0] <= elapsed:
+                    self.last_result = segment[self.read_index][1]
+                    self.read_index += 1
+            elif self.read_index < len(segment):
+                self.last_result = segment[self.read_index][1]
+                self.read_index += 1
+            return self.last_result
+
+    def finished(self) -> bool:
+        """Checks if all recorded writes were replayed"""
+        return self.position == len(self.writes) - 1
+
+    def _write(self, address: int, values: list) -> bool:
+        """Moves the replay to the matching recorded write"""
+        with self.lock:
+            end = min(len(self.writes), self.position + 1 + self.window)
+            for position in range(self.position + 1, end):
+                if self.writes[position] == (address, values):
+                    self.position = position
+                    self.segment_start = time.monotonic()
+                    self.read_index = 0
+                    return True
+            self.divergences += 1
+            return True
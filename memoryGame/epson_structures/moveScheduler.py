@@ -0,0 +1,105 @@
+import time
+from threading import Condition
+
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.statusPoller import StatusPoller, RobotTimeoutError
+from utils.tracing import Tracer
+
+
+class MoveScheduler:
+    """
+    Lets the game commit the next move of the robot while the arm is still returning home. The move is sent by the
+    status poller thread in the same poll that sees the arm at home, so the robot does not wait for the game thread
+    to wake up and the game does not wait for the robot before it decides
+
+    Attributes
+    ----------
+    :arg robot: Epson connector
+    :arg returning_since: time.monotonic() of the command that sent the arm home, None if it is at home
+    :arg next_move: (coordinate, go_camera) committed while the arm is returning, None if there is none
+    :arg result: result of the write of the last dispatched move
+    :arg condition: guards the state and wakes the thread waiting in submit
+    :arg poller: status poller the scheduler listens to
+    :arg dispatch_stats: [count, total time, max time] from the arm reaching home to the move being sent
+
+    Parameters
+    ----------
+    :param robot: connector sending the moves
+    """
+    HOME = StatusPoller.INPUTS[Instructions.HOME_POSITION]
+
+    def __init__(self, robot: Epson):
+        self.robot = robot
+        self.returning_since = None
+        self.next_move = None
+        self.result = None
+        self.condition = Condition()
+        self.poller = None
+        self.dispatch_stats = [0, 0.0, 0.0]
+
+    def arm_returning(self):
+        """Notes that the arm was just sent home, called after place_back or reset_all"""
+        with self.condition:
+            self.returning_since = time.monotonic()
+
+    @Tracer.traced('robot.queued_move')
+    def submit(self, coordinate: int, go_camera: bool = False, timeout: float = None) -> bool:
+        """
+        Sends a move to the robot as soon as the arm is at home, blocks until the move is sent
+        :param coordinate: element of the board the robot goes to
+        :param go_camera: if the robot should go with the element to the camera
+        :param timeout: time in seconds to wait for the arm, by default the robot's response_timeout
+        :raises RobotTimeoutError: if the arm does not get home in time
+        :return: True if the move was written
+        """
+        if timeout is None:
+            timeout = self.robot.response_timeout
+        self._attach()
+        with self.condition:
+            poller = self.poller
+            if self.returning_since is None or poller is None or self._at_home(poller.inputs, poller.timestamp):
+                self.returning_since = None
+            else:
+                self.next_move = (coordinate, go_camera)
+                self.result = None
+                if not self.condition.wait_for(lambda: self.next_move is None, timeout):
+                    self.next_move = None
+                    raise RobotTimeoutError(f'robot did not set HOME_POSITION to True within {timeout} s')
+                return self.result
+        return self.robot.write_coordinates(coordinate, go_camera)
+
+    def stats(self) -> tuple:
+        """
+        Returns how fast committed moves were sent
+        :return: (count, mean time in ms, max time in ms) from the arm reaching home to the move being written
+        """
+        count, total, longest = self.dispatch_stats
+        return count, 1000 * total / count if count else 0.0, 1000 * longest
+
+    def _attach(self):
+        """Listens to the current status poller, the poller is created when the robot connects"""
+        if self.robot.poller is not None and self.poller is not self.robot.poller:
+            self.poller = self.robot.poller
+            self.poller.listeners.append(self._on_status)
+
+    def _at_home(self, inputs: tuple, timestamp: float) -> bool:
+        """Checks if a status snapshot shows the arm at home after it was sent there"""
+        return inputs is not None and timestamp > self.returning_since and inputs[self.HOME]
+
+    def _on_status(self, inputs: tuple, timestamp: float):
+        """Called by the status poller thread after every read, dispatches the committed move"""
+        with self.condition:
+            if self.returning_since is None or not self._at_home(inputs, timestamp):
+                return
+            self.returning_since = None
+            if self.next_move is None:
+                return
+            coordinate, go_camera = self.next_move
+            self.result = self.robot.write_coordinates(coordinate, go_camera)
+            delay = time.monotonic() - timestamp
+            self.dispatch_stats[0] += 1
+            self.dispatch_stats[1] += delay
+            self.dispatch_stats[2] = max(self.dispatch_stats[2], delay)
+            self.next_move = None
+            self.condition.notify_all()
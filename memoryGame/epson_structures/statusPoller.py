@@ -0,0 +1,135 @@
+import time
+from threading import Condition, Thread
+
+from enums.epsonInstructions import Instructions
+
+
+class RobotTimeoutError(Exception):
+    """Raised when the robot does not reach the awaited state in time"""
+
+
+class StatusPoller:
+    """
+    Single background thread that reads all status inputs of the robot at a fixed rate and publishes a timestamped
+    snapshot. Other threads wait for a status bit with wait_for instead of polling the robot themselves
+
+    Attributes
+    ----------
+    :arg INPUTS: index of every status instruction in the inputs read from the robot
+    :arg read_inputs: function reading the status inputs, returns None if the read failed
+    :arg period: time in seconds between two reads
+    :arg inputs: tuple of the last read status inputs, None before the first successful read
+    :arg timestamp: time.monotonic() of the last successful read
+    :arg failures: number of failed reads in a row
+    :arg condition: notified after every read
+    :arg listeners: functions called with (inputs, timestamp) after every successful read
+    :arg paused: True while the connection is being restored, nothing is read then
+    :arg poll_stats: [count, total time, max time] of the reads
+    :arg wait_stats: instruction name -> [count, total time, max time] of waits for that instruction
+
+    Parameters
+    ----------
+    :param read_inputs: function reading the status inputs
+    :param rate: number of reads per second
+    """
+    INPUTS = {Instructions.CAMERA_POINT: 0, Instructions.HOME_POSITION: 1, Instructions.ELECTROMAGNET: 2}
+
+    def __init__(self, read_inputs, rate: float = 100.0):
+        self.read_inputs = read_inputs
+        self.period = 1.0 / rate
+        self.inputs = None
+        self.timestamp = 0.0
+        self.failures = 0
+        self.condition = Condition()
+        self.listeners = []
+        self.paused = False
+        self.running = False
+        self.thread = None
+        self.poll_stats = [0, 0.0, 0.0]
+        self.wait_stats = {}
+
+    def start(self):
+        """Starts the polling thread"""
+        self.running = True
+        self.thread = Thread(name='status_poller', target=self._poll, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the polling thread"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def get(self, instruction: Instructions) -> bool:
+        """
+        Gets the state of a status bit from the last snapshot
+        :param instruction: CAMERA_POINT, HOME_POSITION or ELECTROMAGNET
+        :return: state of the bit, None if nothing was read yet
+        """
+        inputs = self.inputs
+        if inputs is None:
+            return None
+        return inputs[self.INPUTS[instruction]]
+
+    def wait_for(self, instruction: Instructions, timeout: float, state: bool = True, since: float = 0.0) -> float:
+        """
+        Waits until a status bit has the given state
+        :param instruction: CAMERA_POINT, HOME_POSITION or ELECTROMAGNET
+        :param timeout: time in seconds after which RobotTimeoutError is raised
+        :param state: awaited state of the bit
+        :param since: time.monotonic() value, only snapshots read after it are taken into account
+        :return: time waited in seconds
+        """
+        index = self.INPUTS[instruction]
+        start = time.monotonic()
+        with self.condition:
+            reached = self.condition.wait_for(
+                lambda: self.inputs is not None and self.timestamp > since and self.inputs[index] == state, timeout)
+        waited = time.monotonic() - start
+        if not reached:
+            raise RobotTimeoutError(f'robot did not set {instruction.name} to {state} within {timeout} s')
+        self._add_stat(self.wait_stats.setdefault(instruction.name, [0, 0.0, 0.0]), waited)
+        return waited
+
+    def stats(self) -> dict:
+        """
+        Returns latency statistics
+        :return: name -> (count, mean time in ms, max time in ms), 'poll' for the reads and instruction names for waits
+        """
+        stats = {'poll': self.poll_stats}
+        stats.update(self.wait_stats)
+        return {name: (count, 1000 * total / count if count else 0.0, 1000 * longest)
+                for name, (count, total, longest) in stats.items()}
+
+    @staticmethod
+    def _add_stat(stat: list, value: float):
+        """Adds a value to [count, total, max] statistics"""
+        stat[0] += 1
+        stat[1] += value
+        stat[2] = max(stat[2], value)
+
+    def _poll(self):
+        """Reads the status inputs as long as the poller runs"""
+        while self.running:
+            if self.paused:
+                time.sleep(self.period)
+                continue
+            start = time.monotonic()
+            try:
+                response = self.read_inputs()
+            except Exception:
+                response = None
+            duration = time.monotonic() - start
+            with self.condition:
+                if response is None:
+                    self.failures += 1
+                else:
+                    self.inputs = tuple(bool(bit) for bit in response[:len(self.INPUTS)])
+                    self.timestamp = time.monotonic()
+                    self.failures = 0
+                    self._add_stat(self.poll_stats, duration)
+                self.condition.notify_all()
+            if response is not None:
+                for listener in self.listeners:
+                    listener(self.inputs, self.timestamp)
+            time.sleep(max(0.0, self.period - duration))
@@ -7,11 +7,19 @@ from enums.colors import Colors
 from enums.screens import Screens
 from enums.difficulties import Difficulties
 from memoryGame.camera_structures.cameraProcess import CameraProcess
+from memoryGame.camera_structures.debugFrameSink import DebugFrameSink
 from memoryGame.gameboard_structures.gameBoardGenerator import GameBoard
+from memoryGame.gameboard_structures.travelModel import TravelModel
 from memoryGame.windows.menuWindows import MenuWindows
 from memoryGame.windows.inputWindow import InputWindow
 from memoryGame.windows.settingsWindow import SettingsWindow
 from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.connectionManager import ConnectionManager
+from memoryGame.epson_structures.moveScheduler import MoveScheduler
+from memoryGame.epson_structures.modbusTrace import RecordingClient
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.symbolsCache import SymbolsCache
+from utils.tracing import Tracer
 from threading import Thread
 
 
@@ -23,6 +31,9 @@ class MemoryGame:
     ----------
     :arg camera: instance of camera class
     :arg robot: instance of robot class
+    :arg connection: connects to the robot in the background and reconnects after a drop
+    :arg moves: queues the next robot move while the arm is returning home
+    :arg travel: arm travel model of the AI, None if it chooses at random
     :arg player_name: basic nick of a player
     :arg width: main window width
     :arg height: main window height
@@ -38,20 +49,53 @@ class MemoryGame:
     :arg difficulty: enum Difficulty, predefined as medium
     :arg is_game_over: boolean, True if game is finished
     :arg board_screen: window for a game board
+    :arg camera_moves_saved: robot moves between camera points saved by adaptive capture per reveal, over all games
+
+    Parameters
+    ----------
+    :param lazy_startup: True to show the menu right away and load the camera and the CNN model in the background
+    :param inference_backend: runtime used for the CNN model: keras, tflite or onnx
+    :param debug_frames: directory for captured images, None disables storing them
+    :param debug_archive: store captured images as one archive on exit instead of numbered files
+    :param robot_host: address of the robot, e.g. localhost for tools/simulateRobot.py
+    :param robot_port: Modbus TCP port of the robot
+    :param record_modbus: file recording all Modbus traffic for tools/replayModbus.py, None disables recording
+    :param adaptive_capture: softmax confidence at which fewer camera points are used, None always uses three
+    :param adaptive_agreement: number of images that must agree above the confidence
+    :param travel_model: JSON file with the positions for TravelModel, 'grid' for the default board, None lets the AI
+    choose between equally good elements at random
     """
-    def __init__(self):
-        self.camera = CameraProcess()
-        self.camera.start_camera()
-        self.robot = Epson()
+    def __init__(self, lazy_startup: bool = True, inference_backend: str = 'keras', debug_frames: str = None,
+                 debug_archive: bool = False, robot_host: str = '192.168.1.2', robot_port: int = 502,
+                 record_modbus: str = None, adaptive_capture: float = None, adaptive_agreement: int = 2,
+                 travel_model: str = None):
+        debug_sink = DebugFrameSink(debug_frames, archive=debug_archive) if debug_frames else None
+        self.camera = CameraProcess(backend=inference_backend, debug_sink=debug_sink,
+                                    adaptive_confidence=adaptive_capture, adaptive_agreement=adaptive_agreement)
+        if lazy_startup:
+            self.camera.start_loading()
+        else:
+            self.camera.load()
+        client_factory = RecordingClient.factory(record_modbus) if record_modbus else None
+        self.robot = Epson(robot_host, robot_port, client_factory=client_factory)
+        self.connection = ConnectionManager(self.robot)
+        self.connection.start()
+        self.moves = MoveScheduler(self.robot)
+        if travel_model == 'grid':
+            self.travel = TravelModel.grid()
+        else:
+            self.travel = TravelModel.from_file(travel_model) if travel_model else None
         self.player_name = "Gracz"
         self.width = 1020
         self.height = 1020
         self.screen_pygame = pygame.display.set_mode((self.height, self.width))
+        # textures loaded before the display mode was set are not in its pixel format
+        SymbolsCache.invalidate()
         pygame.display.set_caption("MemoryGame")
         self.menu_screen = MenuWindows(self.screen_pygame, self.width, self.height)
         self.input_screen = InputWindow(self.screen_pygame, self.width, self.height)
         self.settings_screen = SettingsWindow(self.screen_pygame, self.width, self.height)
-        self.mouse_pos = ()
+        self.mouse_pos = (0, 0)
         pygame.init()
         self.is_screen_initialized = False
         self.screen = None
@@ -60,62 +104,81 @@ class MemoryGame:
         self.difficulty = Difficulties.MEDIUM
         self.is_game_over = False
         self.board_screen = None
+        self.camera_moves_saved = []
+
+    def is_animating(self) -> bool:
+        """
+        Checks if the screen may change without user input, then the main loop must not block waiting for events
+        """
+        if self.screen is None or not self.is_screen_initialized or self.is_game_over:
+            return True
+        if self.board_screen is not None and not self.board_screen.turn_finished:
+            return True
+        if self.screen == Screens.MENU and self.menu_screen.progress is not None:
+            return True
+        return FrameCompositor.is_dirty()
 
-    def game(self):
+    def track_mouse(self, event):
+        """Stores mouse position carried by mouse events"""
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            self.mouse_pos = event.pos
+
+    @Tracer.traced('game.frame')
+    def game(self, events: list):
         """
         Manages switching between screens and changing players turn
+        :param events: pygame events that came since the previous frame
         """
         # Menu screen
         if self.screen is None:
             self.menu_screen.menu_init()
             self.screen = Screens.MENU
 
-        self.mouse_pos = pygame.mouse.get_pos()
-
         if self.screen == Screens.MENU:
             if not self.is_screen_initialized:
                 self.menu_screen.menu_init()
-                if self.robot.c is None:
-                    if not self.robot.start_connection():
-                        font = pygame.font.SysFont('consolas', int(self.width / 20))
-                        surface_info = font.render("SPRAWDŹ POŁĄCZENIE Z ROBOTEM", True, Colors.RED.value)
-                        text_rect_info = surface_info.get_rect()
-                        text_rect_info.center = (self.width / 2, self.height / 2)
-                        self.screen_pygame.blit(surface_info, text_rect_info)
-                        pygame.display.update()
-                        pygame.time.delay(3000)
-                        sys.exit()
-
                 self.is_screen_initialized = True
-            for event in pygame.event.get():
+            for event in events:
+                self.track_mouse(event)
                 if event.type == pygame.QUIT:
                     self.quit_game()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.menu_screen.button_start.on_focus(self.mouse_pos):
+                    # without the robot or the camera a game cannot be played
+                    if self.menu_screen.button_start.on_focus(self.mouse_pos) and self.connection.is_connected() \
+                            and self.camera.load_error is None:
                         self.screen = Screens.INPUT
                         self.is_screen_initialized = False
                     elif self.menu_screen.button_options.on_focus(self.mouse_pos):
                         self.screen = Screens.OPTIONS
                         self.is_screen_initialized = False
             self.menu_screen.update_buttons(self.mouse_pos)
+            if self.connection.is_connected():
+                self.menu_screen.update_connection(None)
+            elif self.connection.state == ConnectionManager.CONNECTING and not self.connection.failed_attempts:
+                self.menu_screen.update_connection("ŁĄCZENIE Z ROBOTEM...")
+            else:
+                self.menu_screen.update_connection("SPRAWDŹ POŁĄCZENIE Z ROBOTEM", Colors.RED.value)
+            self.menu_screen.update_progress(None if self.camera.is_loaded() else self.camera.load_progress)
+            if self.camera.load_error is not None:
+                self.menu_screen.update_load_error("BŁĄD ŁADOWANIA KAMERY")
 
         # Game screen
         elif self.screen == Screens.GAME:
             if not self.is_screen_initialized:
                 self.board_screen = GameBoard(self.robot, self.camera, self.screen_pygame,
-                                              self.height, self.width, self.player_name)
+                                              self.height, self.width, self.player_name, moves=self.moves,
+                                              travel=self.travel)
                 self.board_screen.draw_game_board()
                 self.is_screen_initialized = True
                 self.board_screen.player_gamer.update_turn(True)
                 self.board_screen.player_ai.change_difficulty(self.difficulty)
 
             else:
-                for event in pygame.event.get():
+                for event in events:
+                    self.track_mouse(event)
                     if event.type == pygame.QUIT:
                         self.quit_game()
                     elif event.type == pygame.MOUSEBUTTONDOWN:
-                        # clicked
-                        self.mouse_pos = pygame.mouse.get_pos()
                         # is player turn
                         if self.state_of_turn < 2 and not self.is_game_over:
                             if self.board_screen.turn_finished:
@@ -135,6 +198,8 @@ class MemoryGame:
                     self.board_screen.show_winner(False, 'ROBOT')
                 else:
                     self.board_screen.show_winner(True)
+                self.camera_moves_saved.extend(self.board_screen.camera_moves_saved)
+                FrameCompositor.flush()
                 pygame.time.delay(5000)
                 self.board_screen = None
                 self.screen = Screens.MENU
@@ -145,7 +210,8 @@ class MemoryGame:
             if not self.is_screen_initialized:
                 self.input_screen.input_init()
                 self.is_screen_initialized = True
-            for event in pygame.event.get():
+            for event in events:
+                self.track_mouse(event)
                 if event.type == pygame.QUIT:
                     self.quit_game()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -180,7 +246,8 @@ class MemoryGame:
             if not self.is_screen_initialized:
                 self.settings_screen.settings_init()
                 self.is_screen_initialized = True
-            for event in pygame.event.get():
+            for event in events:
+                self.track_mouse(event)
                 if event.type == pygame.QUIT:
                     self.quit_game()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -197,6 +264,10 @@ class MemoryGame:
                         self.difficulty = Difficulties.HARD
                         self.is_screen_initialized = False
                         self.screen = Screens.MENU
+                    elif self.settings_screen.button_expert.on_focus(mouse=self.mouse_pos):
+                        self.difficulty = Difficulties.EXPERT
+                        self.is_screen_initialized = False
+                        self.screen = Screens.MENU
                     # camera calibration
                     elif self.settings_screen.button_camera_position.on_focus(mouse=self.mouse_pos):
                         self.robot.test_camera(True)
@@ -206,6 +277,10 @@ class MemoryGame:
                         self.screen = Screens.MENU
             self.settings_screen.update_buttons(mouse=self.mouse_pos)
 
+        # push everything that was drawn in this frame to the display at once
+        FrameCompositor.flush()
+
+    @Tracer.traced('turn.ai')
     def ai_turn(self):
         """
          The turn of AI
@@ -215,13 +290,18 @@ class MemoryGame:
         if not self.board_screen.check_game_over():
             # the ai turn twice
             pygame.time.delay(10)
-            self.board_screen.element_focus_update((0, 0))
+            self.board_screen.refresh_elements()
             self.board_screen.player_gamer.update_turn(False)
             self.board_screen.player_ai.update_turn(True)
             pygame.time.delay(10)
             for i in range(2):
                 self.board_screen.get_coordinate(is_player_turn=False)
-                self.board_screen.get_symbol()
+                if not self.board_screen.get_symbol():
+                    # the robot did not respond, the turn goes back to the player
+                    self.board_screen.abort_turn()
+                    self.board_screen.player_ai.state_of_turn = 0
+                    self.board_screen.player_ai.previous_symbol = None
+                    break
                 self.board_screen.reveal_symbol()
         if not self.board_screen.check_game_over():
             self.board_screen.player_gamer.update_turn(True)
@@ -229,6 +309,7 @@ class MemoryGame:
         else:
             self.is_game_over = True
 
+    @Tracer.traced('turn.player')
     def player_turn(self):
         """The turn of a player"""
         # if previous turn has finished
@@ -241,12 +322,13 @@ class MemoryGame:
                     self.board_screen.reveal_symbol()
                     self.state_of_turn += 1
                 else:
-                    self.board_screen.element_focus_update((0, 0))
+                    self.board_screen.cancel_selection()
                 if self.state_of_turn == 2:
                     self.ai_turn()
 
     def quit_game(self):
         """Quits the game"""
+        self.connection.stop()
         self.robot.close_connection()
         self.camera.stop_camera()
         sys.exit()
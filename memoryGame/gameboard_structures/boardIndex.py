@@ -0,0 +1,61 @@
+class BoardIndex:
+    """
+    Hit-test index of the game board, maps a mouse position straight to the index of a board element with grid
+    arithmetic instead of checking every element
+
+    Attributes
+    ----------
+    :arg x: x coordinate of the first element of the grid
+    :arg y: y coordinate of the first element of the grid
+    :arg pitch: distance between the beginnings of two neighbouring elements
+    :arg element_size: size of a single element
+    :arg columns: number of columns of the grid
+    :arg rows: number of rows of the grid
+    :arg cells: cells[column][row] is the index of the element or None for grid places without an element
+    :arg num_of_cells: number of elements on the grid
+
+    Parameters
+    ----------
+    :param origin: top left coordinates of the first element
+    :param pitch: distance between neighbouring elements
+    :param element_size: size of an element
+    :param columns: number of columns
+    :param rows: number of rows
+    :param pass_coordinates: [column, row] places of the grid without an element
+    """
+    def __init__(self, origin: tuple, pitch: float, element_size: float, columns: int, rows: int,
+                 pass_coordinates: list):
+        self.x, self.y = origin
+        self.pitch = pitch
+        self.element_size = element_size
+        self.columns = columns
+        self.rows = rows
+        self.cells = [[None] * rows for _ in range(columns)]
+        self.num_of_cells = 0
+        # elements are numbered column by column, the same way the board is drawn
+        for i in range(columns):
+            for j in range(rows):
+                if [i, j] in pass_coordinates:
+                    continue
+                self.cells[i][j] = self.num_of_cells
+                self.num_of_cells += 1
+
+    def cell_at(self, mouse: tuple):
+        """
+        Finds the element under the mouse
+        :param mouse: position of the mouse
+        :return: index of the element or None if the mouse is not above any element
+        """
+        # small tolerance so a mouse exactly on an element's edge is not lost to float rounding
+        d_x = mouse[0] - self.x + 1e-6
+        d_y = mouse[1] - self.y + 1e-6
+        if d_x < 0 or d_y < 0:
+            return None
+        column = int(d_x // self.pitch)
+        row = int(d_y // self.pitch)
+        if column >= self.columns or row >= self.rows:
+            return None
+        # the mouse is in the gap between elements
+        if d_x - column * self.pitch > self.element_size + 2e-6 or d_y - row * self.pitch > self.element_size + 2e-6:
+            return None
+        return self.cells[column][row]
@@ -0,0 +1,130 @@
+from array import array
+
+
+class BoardState:
+    """
+    Compact state of the game board. Symbols are numbered by their position in symbols, what is known about the
+    elements is kept in fixed size integer arrays and the state of the elements and symbols in bitmasks, so element
+    -> symbol and symbol -> elements are looked up in O(1) and a copy for simulation or AI search is cheap
+
+    Attributes
+    ----------
+    :arg UNKNOWN: value of an element or a symbol slot that is not known yet
+    :arg symbols: names of the symbols, the index is the symbol id
+    :arg symbol_ids: name -> symbol id
+    :arg num_of_boxes: number of elements on the board
+    :arg cell_symbol: element -> symbol id, UNKNOWN until the element was classified
+    :arg symbol_cells: two slots per symbol, symbol id * 2 + slot -> element, UNKNOWN until the element is known
+    :arg seen: bitmask of the elements that were shown to the players
+    :arg revealed: bitmask of the elements lying face up: found pairs and the first element of a turn
+    :arg matched: bitmask of the symbol ids whose pair was found
+
+    Parameters
+    ----------
+    :param symbols: names of the symbols
+    :param num_of_boxes: number of elements on the board
+    """
+    __slots__ = ('symbols', 'symbol_ids', 'num_of_boxes', 'cell_symbol', 'symbol_cells', 'seen', 'revealed',
+                 'matched')
+    UNKNOWN = -1
+
+    def __init__(self, symbols, num_of_boxes: int = 28):
+        self.symbols = tuple(symbols)
+        self.symbol_ids = {name: i for i, name in enumerate(self.symbols)}
+        self.num_of_boxes = num_of_boxes
+        self.cell_symbol = array('b', [self.UNKNOWN]) * num_of_boxes
+        self.symbol_cells = array('b', [self.UNKNOWN]) * (2 * len(self.symbols))
+        self.seen = 0
+        self.revealed = 0
+        self.matched = 0
+
+    def copy(self):
+        """Returns an independent copy, the arrays are copied and the name tables are shared"""
+        state = BoardState.__new__(BoardState)
+        state.symbols = self.symbols
+        state.symbol_ids = self.symbol_ids
+        state.num_of_boxes = self.num_of_boxes
+        state.cell_symbol = self.cell_symbol[:]
+        state.symbol_cells = self.symbol_cells[:]
+        state.seen = self.seen
+        state.revealed = self.revealed
+        state.matched = self.matched
+        return state
+
+    def symbol_id(self, name: str) -> int:
+        """Returns the id of the symbol name"""
+        return self.symbol_ids[name]
+
+    def symbol_at(self, cell: int) -> int:
+        """Returns the id of the symbol of the element, UNKNOWN if it was not classified yet"""
+        return self.cell_symbol[cell]
+
+    def cells_of(self, symbol: int) -> tuple:
+        """Returns the known elements of the symbol"""
+        first, second = self.symbol_cells[2 * symbol], self.symbol_cells[2 * symbol + 1]
+        if second != self.UNKNOWN:
+            return first, second
+        if first != self.UNKNOWN:
+            return first,
+        return ()
+
+    def learn(self, cell: int, symbol: int) -> bool:
+        """
+        Stores the symbol of a classified element, an element classified again is moved from its previous symbol
+        :return: False if the symbol has two other elements already, e.g. after a misclassification; the element
+        keeps the symbol but is not one of the symbol's elements
+        """
+        previous = self.cell_symbol[cell]
+        if previous == symbol:
+            return cell in self.cells_of(symbol)
+        if previous != self.UNKNOWN:
+            self._forget(cell, previous)
+        self.cell_symbol[cell] = symbol
+        slot = 2 * symbol
+        if self.symbol_cells[slot] != self.UNKNOWN:
+            slot += 1
+            if self.symbol_cells[slot] != self.UNKNOWN:
+                return False
+        self.symbol_cells[slot] = cell
+        return True
+
+    def _forget(self, cell: int, symbol: int):
+        """Removes the element from the slots of the symbol, the other element moves to the first slot"""
+        slot = 2 * symbol
+        if self.symbol_cells[slot] == cell:
+            self.symbol_cells[slot] = self.symbol_cells[slot + 1]
+            self.symbol_cells[slot + 1] = self.UNKNOWN
+        elif self.symbol_cells[slot + 1] == cell:
+            self.symbol_cells[slot + 1] = self.UNKNOWN
+
+    def see(self, cell: int):
+        """Marks the element as shown to the players"""
+        self.seen |= 1 << cell
+
+    def is_seen(self, cell: int) -> bool:
+        """Checks if the element was shown to the players"""
+        return bool(self.seen >> cell & 1)
+
+    def reveal(self, cell: int):
+        """Marks the element as lying face up"""
+        self.revealed |= 1 << cell
+
+    def hide(self, cell: int):
+        """Marks the element as lying face down"""
+        self.revealed &= ~(1 << cell)
+
+    def is_revealed(self, cell: int) -> bool:
+        """Checks if the element lies face up"""
+        return bool(self.revealed >> cell & 1)
+
+    def match(self, symbol: int):
+        """Marks the pair of the symbol as found"""
+        self.matched |= 1 << symbol
+
+    def is_matched(self, symbol: int) -> bool:
+        """Checks if the pair of the symbol was found"""
+        return bool(self.matched >> symbol & 1)
+
+    def hidden_cells(self) -> list:
+        """Returns the elements lying face down"""
+        return [cell for cell in range(self.num_of_boxes) if not self.revealed >> cell & 1]
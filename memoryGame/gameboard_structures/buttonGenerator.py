@@ -1,6 +1,8 @@
 import pygame
 
 from enums.colors import Colors
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.textCache import TextCache
 from utils.mouseDetection import mouse_detection
 
 
@@ -11,28 +13,34 @@ class ButtonGenerator:
         self.text = text
         self.text_color = text_color
         self.text_color_focus = focus_color
-        self.font = pygame.font.SysFont(text_font, text_size)
-        self.surface = self.font.render(text, True, text_color)
+        self.text_font = text_font
+        self.text_size = text_size
+        self.surface = TextCache.render(text, text_font, text_size, text_color)
         self.text_rect = self.surface.get_rect()
         self.text_rect.center = (self.location[0], self.location[1])
         self.screen = screen
         self.color = focus_color
+        self.is_focused = False
 
     def draw_button(self):
-
-        self.screen.blit(self.surface, self.text_rect)
-        pygame.display.update()
+        self.is_focused = False
+        self.surface = TextCache.render(self.text, self.text_font, self.text_size, self.text_color)
+        FrameCompositor.mark(self.screen.blit(self.surface, self.text_rect))
 
     def update_button(self, mouse: tuple):
-        if mouse_detection((self.text_rect.x, self.text_rect.y),
-                           self.text_rect.size, mouse):
-
-            self.surface = self.font.render(self.text, True, self.text_color_focus)
+        is_focused = mouse_detection((self.text_rect.x, self.text_rect.y),
+                                     self.text_rect.size, mouse)
+        # nothing changed since the last frame
+        if is_focused == self.is_focused:
+            return
+        self.is_focused = is_focused
+        if is_focused:
+            self.surface = TextCache.render(self.text, self.text_font, self.text_size, self.text_color_focus)
 
         else:
-            self.surface = self.font.render(self.text, True, self.text_color)
+            self.surface = TextCache.render(self.text, self.text_font, self.text_size, self.text_color)
         self.screen.blit(self.surface, self.text_rect)
-        pygame.display.update()
+        FrameCompositor.mark(self.text_rect)
 
     def on_focus(self, mouse: tuple) -> bool:
         return mouse_detection((self.text_rect.x, self.text_rect.y), self.text_rect.size, mouse)
@@ -0,0 +1,150 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class SearchTimeout(Exception):
+    """Raised when a search does not finish within its time budget"""
+
+
+class ExpectimaxSolver:
+    """
+    Expected score search for the EXPERT AI. Both players are assumed to remember every shown element, so what
+    matters of the board is (u, k, p): u elements never shown, k symbols with one element shown and the other one
+    not, p symbols with both elements shown and not found. The value of a state is the expected difference between
+    the points of the player on turn and of the opponent over the hidden layout. A turn is two reveals, a found pair
+    does not give another turn. Values are kept in a class-level transposition table shared by all games, keyed by
+    the state packed into one integer and evicted in least recently used order
+
+    Attributes
+    ----------
+    :arg capacity: maximum number of values in the table
+    :arg budget: time in seconds one decision may spend searching
+    :arg _table: packed state -> value, in order of use
+    :arg _deadline: time.perf_counter() at which the running search gives up
+    """
+    capacity = 4096
+    budget = 0.005
+    _table = OrderedDict()
+    _deadline = 0.0
+
+    # actions of the first reveal
+    PAIR = 'pair'
+    UNSEEN = 'unseen'
+    SINGLE = 'single'
+    PASS = 'pass'
+
+    @classmethod
+    def first_action(cls, unseen: int, singles: int, pairs: int) -> str:
+        """
+        Chooses what the first reveal of a turn should be
+        :param unseen: number of elements never shown
+        :param singles: number of symbols with one element shown
+        :param pairs: number of symbols with both elements shown and not found
+        :raises SearchTimeout: if the search takes longer than the budget
+        :return: PAIR to take a known pair, UNSEEN to reveal a new element, SINGLE to reveal a shown element of a
+        single first and a new one second, PASS to reveal two shown elements that are not a pair
+        """
+        cls._deadline = time.perf_counter() + cls.budget
+        actions = cls._first_actions(unseen, singles, pairs)
+        return max(actions, key=actions.get)
+
+    @classmethod
+    def second_action(cls, unseen: int, singles: int, pairs: int) -> str:
+        """
+        Chooses the second reveal after the first one showed a single whose other element was never shown
+        :param unseen: number of elements never shown, after the first reveal
+        :param singles: number of symbols with one element shown, including the one of the first reveal
+        :param pairs: number of symbols with both elements shown and not found
+        :raises SearchTimeout: if the search takes longer than the budget
+        :return: UNSEEN to reveal a new element, PASS to reveal a shown one
+        """
+        cls._deadline = time.perf_counter() + cls.budget
+        explore = cls._explore(unseen, singles, pairs)
+        if singles + 2 * pairs > 1 and -cls.value(unseen, singles, pairs) > explore:
+            return cls.PASS
+        return cls.UNSEEN
+
+    @staticmethod
+    def is_consistent(unseen: int, singles: int, pairs: int) -> bool:
+        """
+        Checks if the counts can come from a real board: the other element of every single and both elements of the
+        remaining symbols are among the unseen ones. A misclassified element breaks this and the search would divide
+        by zero unseen elements
+        """
+        return 0 <= singles <= unseen and (unseen - singles) % 2 == 0 and pairs >= 0
+
+    @classmethod
+    def value(cls, unseen: int, singles: int, pairs: int) -> float:
+        """Expected point difference for the player on turn"""
+        key = unseen << 10 | singles << 5 | pairs
+        value = cls._table.get(key)
+        if value is not None:
+            cls._table.move_to_end(key)
+            return value
+        if time.perf_counter() > cls._deadline:
+            raise SearchTimeout(f'search of ({unseen}, {singles}, {pairs}) ran out of time')
+        if unseen == 0 and pairs == 0:
+            value = 0.0
+        else:
+            actions = cls._first_actions(unseen, singles, pairs)
+            value = max(actions.values())
+        cls._table[key] = value
+        if len(cls._table) > cls.capacity:
+            cls._table.popitem(last=False)
+        return value
+
+    @classmethod
+    def warm(cls, unseen: int):
+        """
+        Fills the table with the values of the whole game without a time budget, so the decisions of the game are
+        table lookups and do not run out of time on a cold table
+        :param unseen: number of elements of the board
+        """
+        cls._deadline = math.inf
+        cls.value(unseen, 0, 0)
+
+    @classmethod
+    def clear(cls):
+        """Drops all stored values"""
+        cls._table.clear()
+
+    @classmethod
+    def _first_actions(cls, unseen: int, singles: int, pairs: int) -> dict:
+        """Values of all possible first reveals"""
+        actions = {}
+        if pairs:
+            actions[cls.PAIR] = 1 - cls.value(unseen, singles, pairs - 1)
+        if unseen:
+            # the new element either belongs to a single or starts a new one
+            value = 0.0
+            if singles:
+                value += singles / unseen * (1 - cls.value(unseen - 1, singles - 1, pairs))
+            if unseen > singles:
+                value += (unseen - singles) / unseen * cls._second(unseen - 1, singles + 1, pairs)
+            actions[cls.UNSEEN] = value
+        if singles:
+            actions[cls.SINGLE] = cls._explore(unseen, singles, pairs)
+        if singles + 2 * pairs >= 2:
+            # passing to the opponent who may pass back is worth max(other actions, 0), see value()
+            actions[cls.PASS] = 0.0
+        return actions
+
+    @classmethod
+    def _second(cls, unseen: int, singles: int, pairs: int) -> float:
+        """Value of the second reveal after the first one showed a single whose other element is not shown"""
+        value = cls._explore(unseen, singles, pairs)
+        if singles + 2 * pairs > 1:
+            value = max(value, -cls.value(unseen, singles, pairs))
+        return value
+
+    @classmethod
+    def _explore(cls, unseen: int, singles: int, pairs: int) -> float:
+        """Value of revealing a new element as the second reveal, the first one showed one of the singles"""
+        # the other element of the first one, the other element of another single or a new symbol
+        value = (1 - cls.value(unseen - 1, singles - 1, pairs)) / unseen
+        if singles > 1:
+            value -= (singles - 1) / unseen * cls.value(unseen - 1, singles - 1, pairs + 1)
+        if unseen > singles:
+            value -= (unseen - singles) / unseen * cls.value(unseen - 1, singles + 1, pairs)
+        return value
@@ -1,17 +1,26 @@
+import time
+
 import pygame
 
 from memoryGame.camera_structures.cameraProcess import CameraProcess
 from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.moveScheduler import MoveScheduler
+from memoryGame.gameboard_structures.boardIndex import BoardIndex
+from memoryGame.gameboard_structures.boardState import BoardState
 from memoryGame.gameboard_structures.buttonGenerator import ButtonGenerator
-from time import sleep
-from utils.mouseDetection import mouse_detection
 from memoryGame.gameboard_structures.symbolsGenerator import SymbolsGenerator
+from memoryGame.gameboard_structures.travelModel import TravelModel
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.symbolsCache import SymbolsCache
+from memoryGame.render_structures.textCache import TextCache
 from enums.colors import Colors
 from enums.difficulties import Difficulties
 from memoryGame.gameboard_structures.playerGenerator import PlayerGenerator, AIGenerator
 from memoryGame.windows.Windows import Windows
 from random import shuffle
 from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.statusPoller import RobotTimeoutError
+from utils.tracing import Tracer
 
 
 class GameBoard(Windows):
@@ -20,24 +29,31 @@ class GameBoard(Windows):
     Attributes
     ----------
     :arg _colors: colors of particular elements of the game board
-    :arg coordinates: gets the dictionary where keys are symbols names and then to values will be added coordinates of
-    those symbols on game board by methode shuffle_board
+    :arg state: BoardState with the symbols of the elements known from the camera and what was revealed and found
     :arg _size: stores sizes of particular elements
     :arg game_board_x/y: stores the top left coordinates of game board
     :arg elements_coordinates: stores the coordinates of blank places on the game board where symbols are revealed
-    :arg coordinates_revealed: stores the position (as index of elements_coordinates table) of symbols that were revealed
-    :arg num_of_symbols_revealed: stores coordinates of symbols that were revealed as indexes of the game board -> for AI
+    :arg previous_coordinate: position of the first symbol revealed in the turn, hidden again if the pair is missed
+    :arg board_index: hit-test index mapping mouse position to the element
+    :arg hovered_coordinate: element that is highlighted as focused at the moment
+    :arg marked_elements: elements that are not drawn as plain unrevealed elements at the moment
     :arg positions_of_symbols_unrevealed: stores the coordinates of symbols that are shown under the game board
-    :arg is_symbol_revealed: stores in a dictionary as keys symbols names and as values bool whether the symbol is
-    revealed or not
     :arg player_gamer: instance of a class Player for a real player
     :arg player_ai: instance of a class Player for a robot
     :arg num_of_boxes: how many boxes are on the board
     :arg robot: Epson robot class to send data and receive information
+    :arg moves: sends the next move to the robot as soon as the arm is back home
     :arg selected_coordinate: coordinate selected to be sent to a robot, also to check if player did not select the same
     coordinate twice in a row
     :arg turn_finished: used to synchronise info with main process
     :arg camera: camera class instance
+    :arg select_delay: time in ms the selection of an element is held, 0 in the headless simulation
+    :arg show_time: time in ms the first element of AI's turn is shown
+    :arg miss_time: time in ms a missed pair is shown before it is hidden
+    :arg camera_moves_saved: number of robot moves between camera points saved by adaptive capture, per reveal
+    :arg ROBOT_ERROR, CAMERA_ERROR, CONNECTION_ERROR: messages shown when a reveal fails
+    :arg error: message shown above the board, None if nothing is shown
+    :arg error_rect: area of the message
 
     Parameters
     ----------
@@ -47,37 +63,52 @@ class GameBoard(Windows):
     :param screen_w: the width of the game
     :param screen_h: the height of the game
     :param player: the name of the player
+    :param moves: move scheduler of the robot, a new one by default
+    :param travel: arm travel model the AI uses to choose between equally good elements, None chooses at random
     """
 
-    def __init__(self, robot: Epson, camera: CameraProcess, screen, screen_w, screen_h, player: str, difficulty=Difficulties.EASY):
+    ROBOT_ERROR = "ROBOT NIE ODPOWIADA"
+    CAMERA_ERROR = "BŁĄD KAMERY"
+    CONNECTION_ERROR = "SPRAWDŹ POŁĄCZENIE Z ROBOTEM"
+
+    def __init__(self, robot: Epson, camera: CameraProcess, screen, screen_w, screen_h, player: str, difficulty=Difficulties.EASY,
+                 moves: MoveScheduler = None, travel: TravelModel = None):
         super().__init__(screen, screen_w, screen_h)
         self.background_colors = Colors.LIGHT_BLUE.value
         self.game_board_back_colors = Colors.BLACK.value
         self.game_board_front_colors = Colors.WHITE.value
-        self.coordinates = SymbolsGenerator.generate_symbols_dict()
+        self.state = BoardState(SymbolsGenerator.generate_symbols_dict().keys())
         self.player = player
         self.game_board_size = .5 * self.screen_h
         self.symbol_size = .6 * self.game_board_size / 6.0
         self.game_board_x = self.screen_w / 2 - self.game_board_size / 2
         self.game_board_y = .1 * self.screen_h
         self.elements_coordinates = []
-        self.coordinates_revealed = []
-        self.num_of_symbols_revealed = SymbolsGenerator.generate_symbols_dict()
+        self.previous_coordinate = -1
+        self.board_index = None
+        self.hovered_coordinate = None
+        self.marked_elements = set()
         self.positions_of_symbols_unrevealed = SymbolsGenerator.generate_symbols_dict()
-        self.is_symbol_revealed = SymbolsGenerator.generate_symbols_revealed()
         self.player_gamer = PlayerGenerator(self.screen, (0, .1 * self.screen_h), (.2 * self.screen_w,
-                                                                                   self.game_board_size), player, self.coordinates, self.symbol_size, difficulty)
+                                                                                   self.game_board_size), player, self.state, self.symbol_size, difficulty)
         self.player_ai = AIGenerator(self.screen, (self.game_board_x + self.game_board_size, .1 * self.screen_h),
-                                         (.2 * self.screen_w, self.game_board_size), "AI", self.coordinates,
-                                     self.symbol_size, difficulty)
+                                         (.2 * self.screen_w, self.game_board_size), "AI", self.state,
+                                     self.symbol_size, difficulty, travel=travel)
         self.previous_symbol = ''
         self.num_of_boxes = 28
         self.robot = robot
+        self.moves = moves if moves is not None else MoveScheduler(robot)
         self.selected_coordinate = -1
         self.player_turn = True
         self.turn_finished = True
         self.camera = camera
         self.confirm_buttons = []
+        self.select_delay = 10
+        self.show_time = 500
+        self.miss_time = 2000
+        self.camera_moves_saved = []
+        self.error = None
+        self.error_rect = pygame.Rect(0, .02 * self.screen_h, self.screen_w, .06 * self.screen_h)
 
     def set_name(self, name: str):
         """Sets the name of the main player to the one given in the start"""
@@ -86,7 +117,8 @@ class GameBoard(Windows):
     def check_game_over(self) -> bool:
         """Checks if there are symbols unrevealed to end the game"""
         max_points = max(self.player_gamer.get_points(), self.player_ai.get_points())
-        if max_points > self.num_of_boxes / 2:
+        all_points = self.player_gamer.get_points() + self.player_ai.get_points()
+        if max_points > self.num_of_boxes / 2 or all_points == self.num_of_boxes / 2:
             return True
         else:
             return False
@@ -117,6 +149,7 @@ class GameBoard(Windows):
             and creates a list containing white elements coordinates"""
 
         self.screen.fill(self.background_colors)
+        SymbolsCache.preload((self.symbol_size,))
 
         # draw the main square
         pygame.draw.rect(self.screen, self.game_board_back_colors,
@@ -140,6 +173,8 @@ class GameBoard(Windows):
                                 [cube_x + 5 * (7 / 50) * self.game_board_size,
                                  cube_y + 5 * (7 / 50) * self.game_board_size]
                                 ]
+        self.board_index = BoardIndex((cube_x, cube_y), (7/50) * self.game_board_size, self.symbol_size, 6, 6,
+                                      pass_coordinates)
         element = 0
         for i in range(6):
             for j in range(6):
@@ -151,38 +186,51 @@ class GameBoard(Windows):
                                   self.symbol_size, self.symbol_size])
                 element += 1
         self.show_elements()
-        pygame.display.flip()
+        FrameCompositor.mark_all()
         self.player_gamer.set_name(self.player)
         self.player_gamer.stats_initialize()
         self.player_ai.stats_initialize()
 
     def element_focus_update(self, mouse_xy):
-        """This method shows focus on game board elements by changing their color when mouse is focused on them"""
-        for i in range(self.num_of_boxes):
-            if mouse_detection((self.elements_coordinates[i][0], self.elements_coordinates[i][1]),
-                               (self.symbol_size, None), mouse_xy) and i not in self.coordinates_revealed:
-                pygame.draw.rect(self.screen, Colors.GRAY.value,
-                                 [self.elements_coordinates[i][0],
-                                  self.elements_coordinates[i][1],
-                                  self.symbol_size, self.symbol_size])
-
-            else:
-                if i not in self.coordinates_revealed:
-                    pygame.draw.rect(self.screen, self.game_board_front_colors,
-                                     [self.elements_coordinates[i][0],
-                                      self.elements_coordinates[i][1],
-                                      self.symbol_size, self.symbol_size])
-
-        pygame.display.flip()
+        """This method shows focus on game board elements by changing their color when mouse is focused on them,
+        only the previously and the newly focused elements are redrawn"""
+        focused = self.board_index.cell_at(mouse_xy)
+        if focused is not None and self.state.is_revealed(focused):
+            focused = None
+        if focused == self.hovered_coordinate:
+            return
+
+        if self.hovered_coordinate is not None and not self.state.is_revealed(self.hovered_coordinate):
+            self.draw_element(self.hovered_coordinate, self.game_board_front_colors)
+        if focused is not None:
+            self.draw_element(focused, Colors.GRAY.value)
+        self.hovered_coordinate = focused
+
+    def refresh_elements(self):
+        """Redraws all unrevealed elements without focus, only the ones that were marked or revealed are drawn"""
+        for i in list(self.marked_elements):
+            if not self.state.is_revealed(i):
+                self.draw_element(i, self.game_board_front_colors)
+        self.hovered_coordinate = None
+
+    def draw_element(self, index: int, color: tuple):
+        """Fills the element of the game board with the color"""
+        if color == self.game_board_front_colors:
+            self.marked_elements.discard(index)
+        else:
+            self.marked_elements.add(index)
+        FrameCompositor.mark(pygame.draw.rect(self.screen, color,
+                                              [self.elements_coordinates[index][0],
+                                               self.elements_coordinates[index][1],
+                                               self.symbol_size, self.symbol_size]))
 
     def shuffle_board(self):
         """Randomly selects a place for symbols on board - for non robot case"""
         coordinates = [x for x in range(self.num_of_boxes)]
-        print(self.coordinates)
         shuffle(coordinates)
-        for key in self.coordinates.keys():
-            self.coordinates[key].append(coordinates.pop())
-            self.coordinates[key].append(coordinates.pop())
+        for symbol in range(len(self.state.symbols)):
+            self.state.learn(coordinates.pop(), symbol)
+            self.state.learn(coordinates.pop(), symbol)
 
     def show_elements(self):
         """Shows elements that are still not found under the game board
@@ -192,9 +240,8 @@ class GameBoard(Windows):
         img_col = 0
         img_row = 0
         first_coordinate = self.screen_w / 2 - 2 * (7/50) * self.game_board_size - self.symbol_size / 2
-        for key in self.coordinates.keys():
-            imp = pygame.image.load(r'images/' + key + '.png')
-            imp = pygame.transform.scale(imp, (self.symbol_size, self.symbol_size))
+        for key in self.state.symbols:
+            imp = SymbolsCache.get(key, self.symbol_size)
 
             self.screen.blit(imp, (first_coordinate + img_col * self.game_board_size * 7 / 50,
                                    self.game_board_y + 1.1 * self.game_board_size + 7 / 50 * self.game_board_size * img_row))
@@ -207,6 +254,7 @@ class GameBoard(Windows):
                 img_col = 0
                 img_row += 1
 
+    @Tracer.traced('board.get_coordinate')
     def get_coordinate(self, is_player_turn, mouse=None) -> bool:
         """Checks if the symbol can be revealed, if it has not been revealed yet, it adds the index of symbol
         to dicts and updates scores
@@ -220,15 +268,12 @@ class GameBoard(Windows):
 
         # ai choice
         if not is_player_turn:
-            player_selected_symbol = self.player_ai.what_to_reveal(self.num_of_symbols_revealed, self.is_symbol_revealed)
+            player_selected_symbol = self.player_ai.what_to_reveal(self.state)
         # player's turn
         else:
 
             # stage of checking the place where player clicked on
-            for i in range(self.num_of_boxes):
-                if mouse_detection((self.elements_coordinates[i][0], self.elements_coordinates[i][1]),
-                                   (self.symbol_size, None), mouse):
-                    player_selected_symbol = i
+            player_selected_symbol = self.board_index.cell_at(mouse)
 
         # player did not click on the element or selected the same element twice
         if (player_selected_symbol is None or self.selected_coordinate == player_selected_symbol) and is_player_turn:
@@ -236,84 +281,142 @@ class GameBoard(Windows):
             return False
 
         self.selected_coordinate = player_selected_symbol
-        self.element_focus_update((0, 0))
+        self.refresh_elements()
         # displays orange rectangle in a place of AI choice
-        pygame.time.delay(10)
-        pygame.draw.rect(self.screen, Colors.ORANGE.value,
-                         [self.elements_coordinates[self.selected_coordinate][0],
-                          self.elements_coordinates[self.selected_coordinate][1],
-                          self.symbol_size, self.symbol_size])
-        pygame.time.delay(10)
-        pygame.display.flip()
+        pygame.time.delay(self.select_delay)
+        self.draw_element(self.selected_coordinate, Colors.ORANGE.value)
+        pygame.time.delay(self.select_delay)
         return True
 
+    @Tracer.traced('board.get_symbol')
     def get_symbol(self) -> bool:
         """
         Communication with epson robot to go to the specific coordinates and if the first time symbol is revealed
         from that coordinate - goes to camera
+        :return: False if the robot did not respond or did not reach a position in time or the camera failed
         """
 
-        is_element = False
-
         # check if the element is in the memory
-        for key, val in self.coordinates.items():
-            if self.selected_coordinate in val:
-                is_element = True
+        is_element = self.state.symbol_at(self.selected_coordinate) != BoardState.UNKNOWN
+        # the move is sent the moment the arm is back home from the previous one
+        try:
+            response = self.moves.submit(self.selected_coordinate, go_camera=not is_element)
+        except RobotTimeoutError:
+            self.show_error(self.ROBOT_ERROR)
+            return False
+        if not response:
+            self.show_error(self.CONNECTION_ERROR)
+            return False
+        self.show_error(None)
         # if element is in the memory - robot just shows it
         if is_element:
-            response = self.robot.write_coordinates(self.selected_coordinate)
-            if not response:
+            try:
+                self.robot.wait_for(Instructions.CAMERA_POINT)
+            except RobotTimeoutError:
+                self.show_error(self.ROBOT_ERROR)
+                self.robot.reset_all()
+                self.moves.arm_returning()
                 return False
-            while not self.robot.get_response(instruction=Instructions.CAMERA_POINT):
-                pygame.time.delay(10)
             self.robot.reset_all()
+            self.moves.arm_returning()
             return True
         # if element is not in the memory - robot goes to the camera
         else:
-            response = self.robot.write_coordinates(self.selected_coordinate, go_camera=True)
-            if not response:
+            # every captured image is classified on the camera's worker while the robot goes to the next camera point
+            self.camera.clear_images()
+            moves_saved = 0
+            try:
+                for i in range(3):
+                    self.robot.wait_for(Instructions.CAMERA_POINT)
+                    # only a frame read after the robot reached the camera point shows the element
+                    self.camera.capture_image(after=time.monotonic())
+                    # with adaptive capture the robot goes on only if the images so far do not decide the symbol
+                    if i < 2 and self.camera.is_confident():
+                        moves_saved = 2 - i
+                        break
+                    self.robot.next_camera()
+                    # instead of a fixed sleep wait until the robot leaves the camera point, at most 100 ms as before
+                    try:
+                        self.robot.wait_for(Instructions.CAMERA_POINT, timeout=0.1, state=False)
+                    except RobotTimeoutError:
+                        pass
+            except RobotTimeoutError:
+                self.show_error(self.ROBOT_ERROR)
+                self.camera.clear_images()
+                self.robot.reset_all()
+                self.moves.arm_returning()
                 return False
-            for i in range(3):
-                while not self.robot.get_response(instruction=Instructions.CAMERA_POINT):
-                    pygame.time.delay(10)
-                self.camera.capture_image()
-                self.robot.next_camera()
-                pygame.time.delay(100)
-            self.robot.reset_all()
-            response = self.robot.place_back()
-
-            if not response:
+            except (RuntimeError, TimeoutError):
+                # the camera or the CNN model could not be loaded or the camera stalled, the element goes back
+                self.show_error(self.CAMERA_ERROR)
+                self.camera.clear_images()
+                self.place_back()
+                return False
+            if not self.place_back():
+                self.show_error(self.CONNECTION_ERROR)
                 return False
+            self.camera_moves_saved.append(moves_saved)
 
-            symbol_name = self.camera.predict()
-            self.coordinates[symbol_name].append(self.selected_coordinate)
+            try:
+                symbol_name = self.camera.predict()
+            except RuntimeError:
+                self.show_error(self.CAMERA_ERROR)
+                return False
+            self.state.learn(self.selected_coordinate, self.state.symbol_id(symbol_name))
             return True
 
+    def show_error(self, message):
+        """
+        Shows why the last reveal failed above the game board, the same way the menu shows the connection state
+        :param message: text to show, None hides the message
+        """
+        if message == self.error:
+            return
+        self.error = message
+        pygame.draw.rect(self.screen, self.background_colors, self.error_rect)
+        if message is not None:
+            surface_info = TextCache.render(message, 'consolas', int(self.screen_h / 25), Colors.RED.value)
+            text_rect_info = surface_info.get_rect()
+            text_rect_info.center = self.error_rect.center
+            self.screen.blit(surface_info, text_rect_info)
+        FrameCompositor.mark(self.error_rect)
+
+    def place_back(self) -> bool:
+        """
+        Sends the robot to put the element from the camera back on the board
+        :return: False if the robot did not respond
+        """
+        # reset and place back go to the robot as one coil transaction
+        self.robot.begin()
+        self.robot.reset_all()
+        self.robot.place_back()
+        if not self.robot.commit():
+            return False
+        self.moves.arm_returning()
+        return True
+
+    @Tracer.traced('board.reveal_symbol')
     def reveal_symbol(self):
         """
         Shows symbol on board and checks if a point was scored
         """
-        for key, val in self.coordinates.items():
-            if self.selected_coordinate in val:
-                symbol = key
-
-        if self.selected_coordinate not in self.num_of_symbols_revealed[symbol]:
-            self.num_of_symbols_revealed[symbol].append(self.selected_coordinate)
+        symbol_id = self.state.symbol_at(self.selected_coordinate)
+        symbol = self.state.symbols[symbol_id]
+        self.state.see(self.selected_coordinate)
 
         # shows the image of selected symbol
         pygame.draw.rect(self.screen, Colors.WHITE.value,
                          [self.elements_coordinates[self.selected_coordinate][0],
                           self.elements_coordinates[self.selected_coordinate][1],
                           self.symbol_size, self.symbol_size])
-        imp = pygame.image.load(r'images/' + symbol + '.png')
-        imp = pygame.transform.scale(imp, (self.symbol_size, self.symbol_size))
-        self.screen.blit(imp, (self.elements_coordinates[self.selected_coordinate][0],
-                               self.elements_coordinates[self.selected_coordinate][1]))
-        pygame.display.flip()
+        imp = SymbolsCache.get(symbol, self.symbol_size)
+        self.marked_elements.add(self.selected_coordinate)
+        FrameCompositor.mark(self.screen.blit(imp, (self.elements_coordinates[self.selected_coordinate][0],
+                                                    self.elements_coordinates[self.selected_coordinate][1])))
 
         # player or AI scored a point
-        if self.previous_symbol == symbol and not self.is_symbol_revealed[symbol]:
-            self.is_symbol_revealed[symbol] = True
+        if self.previous_symbol == symbol and not self.state.is_matched(symbol_id):
+            self.state.match(symbol_id)
 
             if self.player_turn:
                 self.player_gamer.score_symbol(symbol)
@@ -323,28 +426,46 @@ class GameBoard(Windows):
                 self.player_ai.update_points()
 
             # clears the scored symbol from the unrevealed symbols
-            pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value,
-                             [self.positions_of_symbols_unrevealed[symbol][0],
-                              self.positions_of_symbols_unrevealed[symbol][1],
-                              self.symbol_size, self.symbol_size])
+            FrameCompositor.mark(pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value,
+                                                  [self.positions_of_symbols_unrevealed[symbol][0],
+                                                   self.positions_of_symbols_unrevealed[symbol][1],
+                                                   self.symbol_size, self.symbol_size]))
 
-            self.coordinates_revealed.append(self.selected_coordinate)
+            self.state.reveal(self.selected_coordinate)
             self.previous_symbol = ''
 
         # the first turn of a player
         elif self.previous_symbol == '':
-            self.coordinates_revealed.append(self.selected_coordinate)
+            self.state.reveal(self.selected_coordinate)
+            self.previous_coordinate = self.selected_coordinate
             self.previous_symbol = symbol
-            if not self.player_turn:
-                pygame.time.wait(500)
+            if not self.player_turn and self.show_time:
+                with Tracer.span('board.show_wait'):
+                    pygame.time.wait(self.show_time)
 
         # second turn and player/AI did not score a point
         else:
-            self.coordinates_revealed.pop()
+            self.state.hide(self.previous_coordinate)
             self.previous_symbol = ''
             self.selected_coordinate = -1
-            pygame.time.wait(2000)
-        while not self.robot.get_response(instruction=Instructions.HOME_POSITION):
-            pygame.time.delay(10)
-        self.element_focus_update((0, 0))
+            if self.miss_time:
+                with Tracer.span('board.show_wait'):
+                    pygame.time.wait(self.miss_time)
+        # the arm is still returning home, the next move is queued by the move scheduler
+        self.refresh_elements()
+        self.turn_finished = True
+
+    def cancel_selection(self):
+        """Forgets the element that could not be revealed, so the player can select it again"""
+        self.selected_coordinate = self.previous_coordinate if self.previous_symbol else -1
+        self.refresh_elements()
+        self.turn_finished = True
+
+    def abort_turn(self):
+        """Hides the first element of an unfinished pair, used when the robot fails in the middle of AI's turn"""
+        if self.previous_symbol:
+            self.state.hide(self.previous_coordinate)
+            self.previous_symbol = ''
+        self.selected_coordinate = -1
+        self.refresh_elements()
         self.turn_finished = True
@@ -1,8 +1,14 @@
 import pygame.font
 from enums.colors import Colors
 import pygame
-from random import randint
+from random import Random
 from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.expectimaxSolver import ExpectimaxSolver, SearchTimeout
+from memoryGame.gameboard_structures.travelModel import TravelModel
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.symbolsCache import SymbolsCache
+from memoryGame.render_structures.textCache import TextCache
 
 
 class PlayerGenerator:
@@ -19,13 +25,13 @@ class PlayerGenerator:
     :arg symbols_scored: table of symbols that are scored by player
     :arg screen: screen where stats are displayed
     :arg: state_of_turn: firs or second turn of a player
-    :arg symbols_seen: which symbols have been already seen
+    :arg symbols_seen: BoardState of the game, which symbols have been already seen
     :arg symbol_size: size of symbol
     :arg x_coord: x coordinate of symbol that is scored to be displayed in stats
     :arg y_coord: y coordinate of symbol that is scored to be displayed in stats
     :arg point_disp_coord: coordinates of points
     :arg point_disp_size: size of points
-    :arg previous_symbol: previous symbol selected - for ai
+    :arg previous_symbol: previous symbol selected - for ai, None before the first reveal of a turn
     :arg text_rect_name: rectangle that is displayed around name of player whose turn is at the moment
     :arg surface_name: surface of players name
     :arg difficulty: difficulty of game - for AI level
@@ -37,11 +43,11 @@ class PlayerGenerator:
     :param location: location of stats on the screen
     :param size: size of stats
     :param name: name of player
-    :param symbols: symbols that are in the game
+    :param symbols: BoardState of the game
     :param symbol_size: size of symbol to be displayed when player scores a point
     :param difficulty: difficulty of a game
     """
-    def __init__(self, screen, location: tuple, size: tuple, name: str, symbols: dict, symbol_size: float, difficulty):
+    def __init__(self, screen, location: tuple, size: tuple, name: str, symbols, symbol_size: float, difficulty):
         self.location_x, self.location_y = location
         self.size_w, self.size_h = size
         self.name = name
@@ -55,7 +61,7 @@ class PlayerGenerator:
         self.y_coord = self.x_coord
         self.point_disp_xy = ()
         self.point_disp_size = ()
-        self.previous_symbol = 0
+        self.previous_symbol = None
         self.text_rect_name = None
         self.surface_name = None
         self.difficulty = difficulty
@@ -66,15 +72,15 @@ class PlayerGenerator:
         Updates points scored by a player
         """
         self.points += 1
-        pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value, [self.point_disp_xy[0], self.point_disp_xy[1],
-                                                                self.size_w, self.point_disp_size[1]])
-        font = pygame.font.SysFont('arial', int(0.08 * self.size_h))
-        surface_points = font.render(f"PUNKTY: {self.points}", True, Colors.DARK_GREEN.value)
+        FrameCompositor.mark(pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value,
+                                              [self.point_disp_xy[0], self.point_disp_xy[1],
+                                               self.size_w, self.point_disp_size[1]]))
+        surface_points = TextCache.render(f"PUNKTY: {self.points}", 'arial', int(0.08 * self.size_h),
+                                          Colors.DARK_GREEN.value)
         text_rect_point = surface_points.get_rect()
         text_rect_point.x, text_rect_point.y = self.point_disp_xy
         text_rect_point.size = self.point_disp_size
-        self.screen.blit(surface_points, text_rect_point)
-        pygame.display.update()
+        FrameCompositor.mark(self.screen.blit(surface_points, text_rect_point))
 
     def set_name(self, name: str):
         """Sets player name"""
@@ -90,23 +96,23 @@ class PlayerGenerator:
     def update_turn(self, is_turn=False):
         """Updates turn by displaying red rectangle around player name"""
         if is_turn:
-            pygame.draw.rect(self.screen, Colors.RED.value, [self.text_rect_name.x-2,
+            rect = pygame.draw.rect(self.screen, Colors.RED.value, [self.text_rect_name.x-2,
                                                              self.text_rect_name.y-2,
                                                              self.text_rect_name.width+4,
                                                              self.text_rect_name.height+4], 3)
         else:
-            pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value, [self.text_rect_name.x-2,
+            rect = pygame.draw.rect(self.screen, Colors.LIGHT_BLUE.value, [self.text_rect_name.x-2,
                                                                     self.text_rect_name.y-2,
                                                                     self.text_rect_name.width+4,
                                                                     self.text_rect_name.height+4], 3)
-        pygame.display.flip()
+        FrameCompositor.mark(rect)
 
     def stats_initialize(self):
         """Initializes stats"""
-        font = pygame.font.SysFont('arial', int(0.08 * self.size_h))
+        font_size = int(0.08 * self.size_h)
 
-        self.surface_name = font.render(self.name, True, Colors.DARK_GREEN.value)
-        surface_points = font.render(f"PUNKTY: {self.points}", True, Colors.DARK_GREEN.value)
+        self.surface_name = TextCache.render(self.name, 'arial', font_size, Colors.DARK_GREEN.value)
+        surface_points = TextCache.render(f"PUNKTY: {self.points}", 'arial', font_size, Colors.DARK_GREEN.value)
 
         self.text_rect_name = self.surface_name.get_rect()
 
@@ -123,22 +129,19 @@ class PlayerGenerator:
 
         self.y_coord = text_rect_point.y + self.text_rect_name.height
 
-        self.screen.blit(self.surface_name, self.text_rect_name)
-        self.screen.blit(surface_points, text_rect_point)
-        pygame.display.update()
+        FrameCompositor.mark(self.screen.blit(self.surface_name, self.text_rect_name))
+        FrameCompositor.mark(self.screen.blit(surface_points, text_rect_point))
 
     def add_symbol(self, symbol: str, coordinates: int):
         """Adds symbol for symbols seen by player"""
-        self.symbols_seen[symbol].append(coordinates)
+        self.symbols_seen.learn(coordinates, self.symbols_seen.symbol_id(symbol))
 
     def score_symbol(self, symbol: str):
         """Adds symbol that is scored by a player to stats"""
         self.symbols_scored.append(symbol)
 
-        imp = pygame.image.load(r'images/' + symbol + '.png')
-        imp = pygame.transform.scale(imp, (self.symbol_size, self.symbol_size))
-        self.screen.blit(imp, (self.x_coord, self.y_coord))
-        pygame.display.flip()
+        imp = SymbolsCache.get(symbol, self.symbol_size)
+        FrameCompositor.mark(self.screen.blit(imp, (self.x_coord, self.y_coord)))
 
         if self.points % 3 == 2:
             self.x_coord = self.location_x + self.size_w / 2 - 2 * self.symbol_size
@@ -147,95 +150,268 @@ class PlayerGenerator:
             self.x_coord += self.symbol_size * 3 / 2
 
 
+class CellPool:
+    """
+    Set of elements that supports adding, removing and a uniform random choice in constant time
+
+    Attributes
+    ----------
+    :arg cells: elements of the pool in no particular order
+    :arg positions: element -> index in cells
+    """
+    __slots__ = ('cells', 'positions')
+
+    def __init__(self, cells=()):
+        self.cells = list(cells)
+        self.positions = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.positions
+
+    def discard(self, cell: int):
+        """Removes the element by moving the last one to its place"""
+        position = self.positions.pop(cell, None)
+        if position is None:
+            return
+        last = self.cells.pop()
+        if position < len(self.cells):
+            self.cells[position] = last
+            self.positions[last] = position
+
+    def choice(self, rng: Random, exclude: int = None) -> int:
+        """
+        Draws an element uniformly
+        :param rng: random generator
+        :param exclude: element that must not be drawn
+        :return: element, None if there is nothing to draw
+        """
+        count = len(self.cells)
+        excluded = self.positions.get(exclude)
+        if excluded is None:
+            return self.cells[rng.randrange(count)] if count else None
+        if count == 1:
+            return None
+        # the excluded element swaps places with the last one for this draw
+        position = rng.randrange(count - 1)
+        return self.cells[count - 1 if position == excluded else position]
+
+    def cheapest(self, costs, exclude: int = None) -> int:
+        """
+        Finds the element with the lowest cost
+        :param costs: element -> cost
+        :param exclude: element that must not be chosen
+        :return: element, None if there is nothing to choose
+        """
+        return min((cell for cell in self.cells if cell != exclude), key=costs.__getitem__, default=None)
+
+
 class AIGenerator(PlayerGenerator):
+    """
+    AI player. It follows the board state incrementally: elements that are still hidden, elements it has never
+    seen and symbols whose both elements it has seen are kept up to date from the changes of the state's bitmasks,
+    so a decision takes constant time through the whole game
+
+    Attributes
+    ----------
+    :arg rng: random generator of the decisions, seeded for reproducible games
+    :arg hidden: elements whose pair was not found yet
+    :arg unknown: elements that were never shown
+    :arg seen_symbols: bitmask of not found symbols with at least one shown element
+    :arg pair_symbols: bitmask of not found symbols with both elements shown
+    :arg synced_seen: state's seen bitmask at the last decision
+    :arg synced_matched: state's matched bitmask at the last decision
+    :arg travel: arm travel model, equally good elements are chosen by the shortest travel, None chooses at random
+
+    Parameters
+    ----------
+    :param rng: random generator, a new unseeded one by default
+    :param travel: arm travel model
+    """
+    def __init__(self, screen, location: tuple, size: tuple, name: str, symbols, symbol_size: float, difficulty,
+                 rng: Random = None, travel: TravelModel = None):
+        super().__init__(screen, location, size, name, symbols, symbol_size, difficulty)
+        self.rng = rng if rng is not None else Random()
+        self.hidden = CellPool(range(self.num_of_boxes))
+        self.unknown = CellPool(range(self.num_of_boxes))
+        self.seen_symbols = 0
+        self.pair_symbols = 0
+        self.synced_seen = 0
+        self.synced_matched = 0
+        self.travel = travel
+        self.warm_up()
+
     def change_difficulty(self, difficulty):
         """Changes the difficulty"""
         self.difficulty = difficulty
+        self.warm_up()
 
-    def what_to_reveal(self, symbols_seen: dict, symbols_revealed: dict) -> int:
-        """Decides what place should be revealed"""
-        possible_choices = []
-        not_choices = []
-        choice = 0
-        # iterate through symbols that were revealed and get n possible choices
-        for symbol, was_revealed in symbols_revealed.items():
-            if not was_revealed and len(symbols_seen[symbol]):
-                possible_choices.append(symbols_seen[symbol])
-            elif was_revealed:
-                not_choices.append(symbols_seen[symbol])
-        # check if there is symbol that has two revealed coordinates
-        if self.difficulty == Difficulties.EASY:
-            # EASY
-            count_2 = 0
-            for i in range(len(possible_choices)):
-                if len(possible_choices[i]) == 2:
-                    count_2 += 1
-
-            for i in range(len(possible_choices)):
-                if len(possible_choices[i]) == 2 and count_2 > 2:
-                    choice = possible_choices[i][0] if self.state_of_turn == 0 else possible_choices[i][1]
-                    if choice == self.previous_symbol:
-                        choice = possible_choices[i][0]
-                    break
-
-            find_other_choice = True
-            while find_other_choice:
-                choice = randint(0, self.num_of_boxes-1)
-                find_other_choice = False
-                for i in not_choices:
-                    if choice in i:
-                        find_other_choice = True
-                    if choice == self.previous_symbol:
-                        find_other_choice = True
+    def warm_up(self):
+        """Fills the ExpectimaxSolver table before an EXPERT game, the first search would run out of time"""
+        if self.difficulty == Difficulties.EXPERT:
+            ExpectimaxSolver.warm(self.num_of_boxes)
 
+    def what_to_reveal(self, state: BoardState) -> int:
+        """
+        Decides what place should be revealed
+        EASY reveals any hidden element, MEDIUM remembers pairs among the first three symbols it has seen,
+        HARD remembers all pairs and otherwise reveals an element it has never seen,
+        EXPERT chooses the reveal with the best expected score and plays as HARD if the search runs out of time or
+        the board is inconsistent after a misclassification
+        :param state: state of the game board
+        :return: element to reveal
+        """
+        self.sync(state)
+        choice = None
+        if self.difficulty == Difficulties.EXPERT:
+            try:
+                choice = self._expert_choice(state)
+            except SearchTimeout:
+                choice = None
         elif self.difficulty == Difficulties.MEDIUM:
-            # MEDIUM
-            if len(possible_choices) > 3:
-                possible_choices = possible_choices[:3]
-            for i in range(len(possible_choices)):
-                if len(possible_choices[i]) == 2:
-                    choice = possible_choices[i][0] if self.state_of_turn == 0 else possible_choices[i][1]
-                    if choice == self.previous_symbol:
-                        choice = possible_choices[i][0]
-
-                    break
-
-            if choice == 0:
-                find_other_choice = True
-                while find_other_choice:
-                    choice = randint(0, self.num_of_boxes-1)
-                    find_other_choice = False
-                    for i in not_choices:
-                        if choice in i:
-                            find_other_choice = True
-                    if choice == self.previous_symbol:
-                        find_other_choice = True
-        else:
-            # HARD
-            for i in range(len(possible_choices)):
-                if len(possible_choices[i]) == 2:
-                    choice = possible_choices[i][0] if self.state_of_turn == 0 else possible_choices[i][1]
-                    if choice == self.previous_symbol:
-
-                        choice = possible_choices[i][0]
-
-                    break
-
-            # if nothing was found
-            if choice == 0:
-                # the hard level
-                find_other_choice = True
-                while find_other_choice:
-                    choice = randint(0, self.num_of_boxes-1)
-                    find_other_choice = False
-                    for i in possible_choices + not_choices:
-                        if choice in i:
-                            find_other_choice = True
+            remembered = self._lowest_bits(self.seen_symbols, 3) & self.pair_symbols
+            if remembered:
+                choice = self._pair_choice(state, remembered)
+        elif self.difficulty != Difficulties.EASY and self.pair_symbols:
+            choice = self._pair_choice(state, self.pair_symbols)
+        if choice is None and self.difficulty == Difficulties.EXPERT and self.pair_symbols:
+            choice = self._pair_choice(state, self.pair_symbols)
+
+        if choice is None and self.difficulty in (Difficulties.HARD, Difficulties.EXPERT):
+            choice = self._unknown_choice(exclude=self.previous_symbol)
+        if choice is None:
+            choice = self.hidden.choice(self.rng, exclude=self.previous_symbol)
 
         if self.state_of_turn == 0:
             self.previous_symbol = choice
             self.state_of_turn = 1
         else:
             self.state_of_turn = 0
-            self.previous_symbol = 0
+            self.previous_symbol = None
+        return choice
+
+    def sync(self, state: BoardState):
+        """Applies the changes of the board state since the last decision"""
+        new_seen = state.seen & ~self.synced_seen
+        while new_seen:
+            bit = new_seen & -new_seen
+            new_seen ^= bit
+            cell = bit.bit_length() - 1
+            self.unknown.discard(cell)
+            symbol = state.symbol_at(cell)
+            if symbol == BoardState.UNKNOWN or state.is_matched(symbol):
+                continue
+            self.seen_symbols |= 1 << symbol
+            cells = state.cells_of(symbol)
+            if len(cells) == 2 and state.is_seen(cells[0]) and state.is_seen(cells[1]):
+                self.pair_symbols |= 1 << symbol
+        self.synced_seen = state.seen
+
+        new_matched = state.matched & ~self.synced_matched
+        while new_matched:
+            bit = new_matched & -new_matched
+            new_matched ^= bit
+            self.seen_symbols &= ~bit
+            self.pair_symbols &= ~bit
+            for cell in state.cells_of(bit.bit_length() - 1):
+                self.hidden.discard(cell)
+                self.unknown.discard(cell)
+        self.synced_matched = state.matched
+
+    def _expert_choice(self, state: BoardState):
+        """
+        Reveal chosen by ExpectimaxSolver from the numbers of never shown elements, single symbols and known pairs
+        :raises SearchTimeout: if the search takes longer than its budget
+        :return: element to reveal, None to play as HARD
+        """
+        unseen = len(self.unknown)
+        pairs = bin(self.pair_symbols).count('1')
+        singles = bin(self.seen_symbols).count('1') - pairs
+        if not ExpectimaxSolver.is_consistent(unseen, singles, pairs):
+            return None
+        if self.state_of_turn == 0:
+            action = ExpectimaxSolver.first_action(unseen, singles, pairs)
+            if action == ExpectimaxSolver.SINGLE or action == ExpectimaxSolver.PASS:
+                return self._shown_choice(state)
+            if action == ExpectimaxSolver.UNSEEN:
+                return self._unknown_choice()
+            return self._pair_choice(state, self.pair_symbols)
+
+        symbol = state.symbol_at(self.previous_symbol)
+        if symbol == BoardState.UNKNOWN:
+            return None
+        if self.pair_symbols >> symbol & 1:
+            first, second = state.cells_of(symbol)
+            return second if first == self.previous_symbol else first
+        if ExpectimaxSolver.second_action(unseen, singles, pairs) == ExpectimaxSolver.PASS:
+            return self._shown_choice(state, exclude=symbol)
+        return self._unknown_choice()
+
+    def _unknown_choice(self, exclude: int = None):
+        """Reveals an element that was never shown, the one with the shortest travel to the camera with a model"""
+        if self.travel is not None:
+            return self.unknown.cheapest(self.travel.camera_costs, exclude)
+        return self.unknown.choice(self.rng, exclude=exclude)
+
+    def _shown_choice(self, state: BoardState, exclude: int = None):
+        """
+        Reveals a shown element of a single symbol, or of a known pair if there is none, other than exclude, the
+        one with the lowest symbol id or with the shortest travel with a model
+        """
+        for symbols in (self.seen_symbols & ~self.pair_symbols, self.pair_symbols):
+            if exclude is not None:
+                symbols &= ~(1 << exclude)
+            cells = []
+            while symbols:
+                bit = symbols & -symbols
+                symbols ^= bit
+                cells.extend(cell for cell in state.cells_of(bit.bit_length() - 1) if state.is_seen(cell))
+                if cells and self.travel is None:
+                    return cells[0]
+            if cells:
+                return min(cells, key=self.travel.known_costs.__getitem__)
+        return None
+
+    def _pair_choice(self, state: BoardState, symbols: int) -> int:
+        """Reveals an element of the known pair with the lowest symbol id, the second one in the second turn"""
+        if self.travel is not None:
+            return self._nearest_pair_choice(state, symbols)
+        first, second = state.cells_of((symbols & -symbols).bit_length() - 1)
+        choice = first if self.state_of_turn == 0 else second
+        if choice == self.previous_symbol:
+            choice = first
         return choice
+
+    def _nearest_pair_choice(self, state: BoardState, symbols: int) -> int:
+        """
+        Reveals the nearer element of the known pair with the shortest travel, in the second turn the other element
+        of the first one if it is one of the pairs
+        """
+        if self.state_of_turn == 1:
+            symbol = state.symbol_at(self.previous_symbol)
+            if symbol != BoardState.UNKNOWN and symbols >> symbol & 1:
+                first, second = state.cells_of(symbol)
+                return second if first == self.previous_symbol else first
+        costs = self.travel.known_costs
+        best = None
+        while symbols:
+            bit = symbols & -symbols
+            symbols ^= bit
+            first, second = state.cells_of(bit.bit_length() - 1)
+            if best is None or costs[first] + costs[second] < costs[best[0]] + costs[best[1]]:
+                best = (first, second)
+        return min(best, key=costs.__getitem__)
+
+    @staticmethod
+    def _lowest_bits(mask: int, count: int) -> int:
+        """Keeps only the lowest count set bits of the mask"""
+        lowest = 0
+        for _ in range(count):
+            if not mask:
+                break
+            bit = mask & -mask
+            lowest |= bit
+            mask ^= bit
+        return lowest
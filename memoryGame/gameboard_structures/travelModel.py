@@ -0,0 +1,62 @@
+import json
+import math
+
+
+class TravelModel:
+    """
+    Cost model of the robot arm travel. Every element of the board, the home position and the camera points have
+    a physical position in mm in the plane of the robot. The arm starts every reveal at home, so the travel of a
+    reveal only depends on the element: home -> element -> home for an element that is already known and
+    home -> element -> camera points -> element -> home for one that goes to the camera
+
+    Attributes
+    ----------
+    :arg PASS_COORDINATES: [column, row] places of the 6x6 grid without an element, as in GameBoard
+    :arg cells: element -> (x, y) position
+    :arg home: (x, y) position of the arm between reveals
+    :arg camera: (x, y) positions of the camera points in the order the arm visits them
+    :arg known_costs: element -> travel in mm of a reveal without the camera
+    :arg camera_costs: element -> travel in mm of a reveal with the camera
+
+    Parameters
+    ----------
+    :param cells: positions of the elements
+    :param home: position of the arm between reveals
+    :param camera: positions of the camera points
+    """
+    PASS_COORDINATES = [[0, 4], [0, 5], [5, 4], [5, 5], [1, 5], [2, 5], [3, 5], [4, 5]]
+
+    def __init__(self, cells, home: tuple, camera):
+        self.cells = [tuple(cell) for cell in cells]
+        self.home = tuple(home)
+        self.camera = [tuple(point) for point in camera]
+        camera_path = sum(math.dist(a, b) for a, b in zip(self.camera, self.camera[1:]))
+        self.known_costs = tuple(2 * math.dist(self.home, cell) for cell in self.cells)
+        self.camera_costs = tuple(2 * math.dist(self.home, cell) + math.dist(cell, self.camera[0]) + camera_path +
+                                  math.dist(self.camera[-1], cell) for cell in self.cells)
+
+    @classmethod
+    def grid(cls, origin: tuple = (-105.0, 180.0), pitch: float = 42.0, home: tuple = (0.0, 120.0),
+             camera=((200.0, 60.0), (200.0, 90.0), (200.0, 120.0))):
+        """
+        Creates the model of the 6x6 board numbered column by column like GameBoard, the default positions are
+        estimates of the stand and should be replaced by measured ones with from_file()
+        :param origin: position of the element in the first column and row
+        :param pitch: distance between neighbouring elements
+        :param home: position of the arm between reveals
+        :param camera: positions of the camera points
+        """
+        cells = [(origin[0] + i * pitch, origin[1] + j * pitch) for i in range(6) for j in range(6)
+                 if [i, j] not in cls.PASS_COORDINATES]
+        return cls(cells, home, camera)
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Loads the model from a JSON file {"cells": [[x, y], ...], "home": [x, y], "camera": [[x, y], ...]}"""
+        with open(path) as file:
+            positions = json.load(file)
+        return cls(positions['cells'], positions['home'], positions['camera'])
+
+    def cost(self, cell: int, go_camera: bool) -> float:
+        """Returns the travel in mm of revealing the element"""
+        return self.camera_costs[cell] if go_camera else self.known_costs[cell]
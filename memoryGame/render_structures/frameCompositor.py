@@ -0,0 +1,69 @@
+from threading import Lock, current_thread, main_thread
+
+import pygame
+
+
+class FrameCompositor:
+    """
+    Collects the rectangles of the screen that were changed by widgets and board cells and pushes them to the
+    display with one pygame.display.update call per frame
+
+    Attributes
+    ----------
+    :arg max_rects: above this number of dirty rectangles the whole screen is updated at once
+    :arg _rects: rectangles changed since the last flush
+    :arg _full: True if the whole screen has to be updated, e.g. after screen.fill
+    :arg _lock: guards the dirty list, the turn thread draws while the main loop flushes
+    :arg DIRTY_EVENT: event posted when another thread draws, wakes up the main loop waiting for events
+    :arg enabled: False makes marking and flushing no-ops, for headless runs without a display
+    """
+    DIRTY_EVENT = pygame.event.custom_type()
+    max_rects = 64
+    enabled = True
+    _rects = []
+    _full = False
+    _lock = Lock()
+
+    @classmethod
+    def mark(cls, rect):
+        """
+        Marks a part of the screen as changed
+        :param rect: pygame.Rect or [x, y, w, h] of the changed area, e.g. the value returned by blit or draw.rect
+        :return: the given rect, so the call can wrap the drawing function
+        """
+        if not cls.enabled:
+            return rect
+        with cls._lock:
+            was_dirty = cls._full or len(cls._rects) > 0
+            if not cls._full:
+                cls._rects.append(pygame.Rect(rect))
+        if not was_dirty and current_thread() is not main_thread():
+            pygame.event.post(pygame.event.Event(cls.DIRTY_EVENT))
+        return rect
+
+    @classmethod
+    def mark_all(cls):
+        """Marks the whole screen as changed"""
+        if not cls.enabled:
+            return
+        with cls._lock:
+            cls._full = True
+            cls._rects = []
+
+    @classmethod
+    def is_dirty(cls) -> bool:
+        """Returns True if something was drawn since the last flush"""
+        return cls._full or len(cls._rects) > 0
+
+    @classmethod
+    def flush(cls):
+        """Sends all changed rectangles to the display, should be called once per frame"""
+        if not cls.enabled:
+            return
+        with cls._lock:
+            rects, full = cls._rects, cls._full
+            cls._rects, cls._full = [], False
+        if full or len(rects) > cls.max_rects:
+            pygame.display.update()
+        elif rects:
+            pygame.display.update(rects)
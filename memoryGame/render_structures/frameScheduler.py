@@ -0,0 +1,58 @@
+import pygame
+
+
+class FrameScheduler:
+    """
+    Paces the main loop. When nothing is animating the loop blocks on pygame.event.wait, otherwise it runs at most
+    at the given number of frames per second
+
+    Attributes
+    ----------
+    :arg fps: frame cap used while something is animating
+    :arg idle_timeout: maximal time in ms to block waiting for an event when nothing is animating
+    :arg event_driven: False to always run at the frame cap instead of blocking on events
+    :arg clock: pygame clock used for the frame cap
+
+    Parameters
+    ----------
+    :param fps: frame cap
+    :param idle_timeout: time in ms after which an idle loop wakes up anyway
+    :param event_driven: whether the loop should block on events when idle
+    """
+    def __init__(self, fps: int = 30, idle_timeout: int = 250, event_driven: bool = True):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.event_driven = event_driven
+        self.clock = pygame.time.Clock()
+
+    def wait_events(self, is_animating: bool) -> list:
+        """
+        Waits for the next frame and returns events that came in the meantime
+        :param is_animating: True if the screen is changing without user input, e.g. during robot's turn
+        :return: list of events with bursts of mouse motion merged
+        """
+        if self.event_driven and not is_animating:
+            event = pygame.event.wait(self.idle_timeout)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+            # keeps the clock from counting the idle time into the next frame
+            self.clock.tick()
+        else:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        return self.merge_motion(events)
+
+    @staticmethod
+    def merge_motion(events: list) -> list:
+        """
+        Merges consecutive MOUSEMOTION events into the last one, only the latest mouse position matters
+        :param events: events in order of arrival
+        :return: events without the outdated motions
+        """
+        merged = []
+        for event in events:
+            if event.type == pygame.MOUSEMOTION and merged and merged[-1].type == pygame.MOUSEMOTION:
+                merged[-1] = event
+            else:
+                merged.append(event)
+        return merged
@@ -0,0 +1,68 @@
+import os
+
+import pygame
+
+
+class SymbolsCache:
+    """
+    Process-wide cache of symbol textures shared by the game board, the players' stats and the reveal path.
+    Every image from the images directory is loaded and converted to the display pixel format once, scaled copies
+    are kept per requested size
+
+    Attributes
+    ----------
+    :arg directory: directory that symbol images are loaded from
+    :arg _originals: symbol name -> converted full size surface
+    :arg _scaled: (symbol name, width, height) -> scaled surface
+    """
+    directory = 'images'
+    _originals = {}
+    _scaled = {}
+
+    @classmethod
+    def preload(cls, sizes: tuple = ()):
+        """
+        Loads all symbols from the images directory and prepares scaled copies
+        :param sizes: sizes (as one float or a (w, h) tuple) that should be scaled in advance
+        """
+        for filename in os.listdir(cls.directory):
+            symbol, extension = os.path.splitext(filename)
+            if extension.lower() == '.png':
+                cls._load(symbol)
+        for size in sizes:
+            for symbol in cls._originals.keys():
+                cls.get(symbol, size)
+
+    @classmethod
+    def get(cls, symbol: str, size) -> pygame.Surface:
+        """
+        Returns the symbol texture scaled to the given size
+        :param symbol: name of the symbol
+        :param size: size of a square symbol or (width, height) tuple
+        :return: scaled surface, must not be modified by the caller
+        """
+        if not isinstance(size, tuple):
+            size = (size, size)
+        key = (symbol, int(size[0]), int(size[1]))
+        surface = cls._scaled.get(key)
+        if surface is None:
+            surface = pygame.transform.scale(cls._load(symbol), key[1:])
+            cls._scaled[key] = surface
+        return surface
+
+    @classmethod
+    def invalidate(cls):
+        """Drops all loaded textures, for example after the window was resized or the display mode changed"""
+        cls._originals.clear()
+        cls._scaled.clear()
+
+    @classmethod
+    def _load(cls, symbol: str) -> pygame.Surface:
+        """Loads a single symbol image and converts it to the display pixel format if the display is set"""
+        surface = cls._originals.get(symbol)
+        if surface is None:
+            surface = pygame.image.load(os.path.join(cls.directory, symbol + '.png'))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            cls._originals[symbol] = surface
+        return surface
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from threading import Lock
+
+import pygame
+
+
+class FontRegistry:
+    """
+    Process-wide registry of fonts, pygame.font.SysFont scans system font directories so every (family, size) pair is
+    created only once
+
+    Attributes
+    ----------
+    :arg _fonts: (family, size) -> pygame font
+    :arg _lock: guards the registry, fonts are requested from the main loop and from the turn thread
+    """
+    _fonts = {}
+    _lock = Lock()
+
+    @classmethod
+    def get(cls, family: str, size: int) -> pygame.font.Font:
+        """
+        Returns the font of the given family and size
+        :param family: system font name, e.g. 'consolas'
+        :param size: size of the font
+        """
+        key = (family, int(size))
+        font = cls._fonts.get(key)
+        if font is None:
+            with cls._lock:
+                font = cls._fonts.get(key)
+                if font is None:
+                    font = pygame.font.SysFont(family, key[1])
+                    cls._fonts[key] = font
+        return font
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by text, font and colour, so labels that are drawn again and again
+    (button highlighting, scores) never reach the font system after the first render
+
+    Attributes
+    ----------
+    :arg capacity: maximal number of surfaces kept in the cache
+    :arg _surfaces: (text, family, size, color) -> rendered surface, in order of use
+    :arg _lock: guards the cache
+    """
+    capacity = 256
+    _surfaces = OrderedDict()
+    _lock = Lock()
+
+    @classmethod
+    def render(cls, text: str, family: str, size: int, color: tuple) -> pygame.Surface:
+        """
+        Returns antialiased text rendered with the font from FontRegistry
+        :param text: text to be rendered
+        :param family: system font name
+        :param size: size of the font
+        :param color: colour of the text
+        :return: rendered surface, must not be modified by the caller
+        """
+        key = (text, family, int(size), tuple(color))
+        with cls._lock:
+            surface = cls._surfaces.get(key)
+            if surface is not None:
+                cls._surfaces.move_to_end(key)
+                return surface
+        surface = FontRegistry.get(family, size).render(text, True, color)
+        with cls._lock:
+            cls._surfaces[key] = surface
+            if len(cls._surfaces) > cls.capacity:
+                cls._surfaces.popitem(last=False)
+        return surface
+
+    @classmethod
+    def clear(cls):
+        """Drops all rendered surfaces"""
+        with cls._lock:
+            cls._surfaces.clear()
@@ -2,6 +2,8 @@ import pygame.font
 from enums.colors import Colors
 from memoryGame.windows.Windows import Windows
 from memoryGame.gameboard_structures.buttonGenerator import ButtonGenerator
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.textCache import FontRegistry, TextCache
 
 
 class InputWindow(Windows):
@@ -24,7 +26,7 @@ class InputWindow(Windows):
     def __init__(self, screen, screen_w, screen_h):
         super().__init__(screen, screen_w, screen_h)
         self.user_input = ''
-        self.font = pygame.font.SysFont('consolas', int(self.screen_w / 15))
+        self.font = FontRegistry.get('consolas', int(self.screen_w / 15))
         self.button_ok = ButtonGenerator(screen, (self.screen_w / 2, self.screen_h * .75), Colors.DARK_GREEN.value,
                                              Colors.GRAY.value, "OK", "consolas", int(self.screen_w / 15))
 
@@ -34,12 +36,11 @@ class InputWindow(Windows):
         """
         self.screen.fill(Colors.BLACK.value)
         self.button_ok.draw_button()
-        self.screen.fill(Colors.BLACK.value)
-        surface_info = self.font.render("PODAJ NAZWĘ", True, Colors.DARK_GREEN.value)
+        surface_info = TextCache.render("PODAJ NAZWĘ", 'consolas', int(self.screen_w / 15), Colors.DARK_GREEN.value)
         text_rect_info = surface_info.get_rect()
         text_rect_info.center = (self.screen_w / 2, self.screen_h * .25)
         self.screen.blit(surface_info, text_rect_info)
-        pygame.display.update()
+        FrameCompositor.mark_all()
 
     def text_update(self, to_append: bool, letter=''):
         """
@@ -55,8 +56,7 @@ class InputWindow(Windows):
         surface_input = self.font.render(self.user_input, True, Colors.DARK_GREEN.value)
         text_rect_input = surface_input.get_rect()
         text_rect_input.center = (self.screen_w / 2, self.screen_h * .5)
-        self.screen.blit(surface_input, text_rect_input)
-        pygame.display.update()
+        FrameCompositor.mark(self.screen.blit(surface_input, text_rect_input))
 
     def update(self, mouse):
         """
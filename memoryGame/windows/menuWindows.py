@@ -1,5 +1,8 @@
+import pygame.draw
 import pygame.font
 from memoryGame.gameboard_structures.buttonGenerator import ButtonGenerator
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.textCache import TextCache
 from enums.colors import Colors
 from memoryGame.windows.Windows import Windows
 
@@ -13,6 +16,11 @@ class MenuWindows(Windows):
     :arg button_start: Start button instance
     :arg button_options: options button instance
     :arg background_color: the color of the background, defined as Black
+    :arg progress: progress of loading shown under the buttons, None if nothing is shown
+    :arg progress_rect: area of the progress indicator
+    :arg load_error: message shown in place of the progress indicator when loading failed, None if nothing is shown
+    :arg connection: message about the connection with the robot, None if nothing is shown
+    :arg connection_rect: area of the connection message
 
     Parameters
     ----------
@@ -27,6 +35,11 @@ class MenuWindows(Windows):
         self.button_options = ButtonGenerator(screen, (screen_w / 2, screen_h * .5), Colors.DARK_GREEN.value,
                                               Colors.GRAY.value, "OPCJE", "consolas", 72)
         self.background_color = Colors.BLACK.value
+        self.progress = None
+        self.progress_rect = pygame.Rect(screen_w * .25, screen_h * .8, screen_w * .5, screen_h * .1)
+        self.load_error = None
+        self.connection = None
+        self.connection_rect = pygame.Rect(0, screen_h * .68, screen_w, screen_h * .08)
 
     def menu_init(self):
         """
@@ -35,6 +48,65 @@ class MenuWindows(Windows):
         self.screen.fill(self.background_color)
         self.button_start.draw_button()
         self.button_options.draw_button()
+        self.progress = None
+        self.load_error = None
+        self.connection = None
+        FrameCompositor.mark_all()
+
+    def update_progress(self, progress):
+        """
+        Shows progress of loading the camera and the CNN model under the buttons
+        :param progress: progress from 0 to 1, None hides the indicator
+        """
+        if progress == self.progress:
+            return
+        self.progress = progress
+        pygame.draw.rect(self.screen, self.background_color, self.progress_rect)
+        if progress is not None:
+            surface_info = TextCache.render("ŁADOWANIE KAMERY", 'consolas', int(self.screen_h / 30),
+                                            Colors.GRAY.value)
+            text_rect_info = surface_info.get_rect()
+            text_rect_info.midtop = self.progress_rect.midtop
+            self.screen.blit(surface_info, text_rect_info)
+            bar = pygame.Rect(self.progress_rect.x, self.progress_rect.centery,
+                              self.progress_rect.width, self.progress_rect.height / 3)
+            pygame.draw.rect(self.screen, Colors.DARK_GREEN.value,
+                             [bar.x, bar.y, bar.width * progress, bar.height])
+            pygame.draw.rect(self.screen, Colors.GRAY.value, bar, 2)
+        FrameCompositor.mark(self.progress_rect)
+
+    def update_load_error(self, message):
+        """
+        Shows that loading of the camera or the CNN model failed, in place of the progress indicator
+        :param message: text to show, None hides the message
+        """
+        if message == self.load_error:
+            return
+        self.load_error = message
+        pygame.draw.rect(self.screen, self.background_color, self.progress_rect)
+        if message is not None:
+            surface_info = TextCache.render(message, 'consolas', int(self.screen_h / 30), Colors.RED.value)
+            text_rect_info = surface_info.get_rect()
+            text_rect_info.center = self.progress_rect.center
+            self.screen.blit(surface_info, text_rect_info)
+        FrameCompositor.mark(self.progress_rect)
+
+    def update_connection(self, message, color=Colors.GRAY.value):
+        """
+        Shows the state of the connection with the robot under the buttons
+        :param message: text to show, None hides the message
+        :param color: color of the text
+        """
+        if message == self.connection:
+            return
+        self.connection = message
+        pygame.draw.rect(self.screen, self.background_color, self.connection_rect)
+        if message is not None:
+            surface_info = TextCache.render(message, 'consolas', int(self.screen_h / 25), color)
+            text_rect_info = surface_info.get_rect()
+            text_rect_info.center = self.connection_rect.center
+            self.screen.blit(surface_info, text_rect_info)
+        FrameCompositor.mark(self.connection_rect)
 
     def update_buttons(self, mouse):
         """
@@ -2,6 +2,7 @@ import pygame.draw
 
 from memoryGame.windows.Windows import Windows
 from memoryGame.gameboard_structures.buttonGenerator import ButtonGenerator
+from memoryGame.render_structures.frameCompositor import FrameCompositor
 from enums.colors import Colors
 
 
@@ -14,6 +15,7 @@ class SettingsWindow(Windows):
     :arg button_easy: easy difficulty button
     :arg button_medium: medium difficulty button
     :arg button_hard: hard difficulty button
+    :arg button_expert: expert difficulty button
     :arg button_camera_position: button for camera calibration
     :arg background_color: the color of the background
 
@@ -25,16 +27,19 @@ class SettingsWindow(Windows):
     """
     def __init__(self, screen, screen_w, screen_h):
         super().__init__(screen, screen_w, screen_h)
-        self.button_easy = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.2),
+        self.button_easy = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.17),
                                            Colors.DARK_GREEN.value, Colors.GRAY.value,
                                            'ŁATWY', 'consolas', 72)
-        self.button_medium = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.4),
+        self.button_medium = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.32),
                                            Colors.DARK_GREEN.value, Colors.GRAY.value,
                                            'ŚREDNI', 'consolas', 72)
-        self.button_hard = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.6),
+        self.button_hard = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.47),
                                              Colors.DARK_GREEN.value, Colors.GRAY.value,
                                              'TRUDNY', 'consolas', 72)
-        self. button_camera_position = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.8),
+        self.button_expert = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.62),
+                                             Colors.DARK_GREEN.value, Colors.GRAY.value,
+                                             'EKSPERT', 'consolas', 72)
+        self. button_camera_position = ButtonGenerator(self.screen, (screen_w / 2, screen_h * 0.82),
                                              Colors.DARK_GREEN.value, Colors.GRAY.value,
                                              'KAMERA', 'consolas', 72)
         self.background_color = Colors.BLACK.value
@@ -44,13 +49,16 @@ class SettingsWindow(Windows):
         self.button_easy.draw_button()
         self.button_medium.draw_button()
         self.button_hard.draw_button()
+        self.button_expert.draw_button()
         pygame.draw.rect(self.screen, Colors.ORANGE.value, pygame.Rect(self.screen_w * .1, self.screen_h * .1,
                                                                        self.screen_w * .8, self.screen_h * .6), 3)
         self.button_camera_position.draw_button()
+        FrameCompositor.mark_all()
 
     def update_buttons(self, mouse):
         self.button_easy.update_button(mouse)
         self.button_medium.update_button(mouse)
         self.button_hard.update_button(mouse)
+        self.button_expert.update_button(mouse)
         self.button_camera_position.update_button(mouse)
 
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardIndex import BoardIndex
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from tools.headlessGame import headless_screen, new_board
+from utils.mouseDetection import mouse_detection
+
+PASS_COORDINATES = [[0, 4], [0, 5], [5, 4], [5, 5], [1, 5], [2, 5], [3, 5], [4, 5]]
+
+
+@pytest.fixture(scope='module')
+def screen():
+    yield headless_screen()
+    FrameCompositor.enabled = True
+
+
+def detected(board, mouse):
+    """Elements under the mouse found by checking every element, as before BoardIndex"""
+    return [element for element, position in enumerate(board.elements_coordinates)
+            if mouse_detection(position, (board.symbol_size, 0), mouse)]
+
+
+@pytest.mark.parametrize('size', [600, 777, 1020])
+def test_cell_at_agrees_with_mouse_detection(screen, size):
+    board = new_board(screen, size, 0, Difficulties.EASY)
+    # pygame reports the mouse in whole pixels
+    for x in range(0, size, 3):
+        for y in range(0, size, 3):
+            mouse = (x, y)
+            cell = board.board_index.cell_at(mouse)
+            assert detected(board, mouse) == ([] if cell is None else [cell]), mouse
+
+
+@pytest.mark.parametrize('size', [600, 777, 1020])
+def test_cell_at_element_edges(screen, size):
+    board = new_board(screen, size, 0, Difficulties.EASY)
+    for element, (x, y) in enumerate(board.elements_coordinates):
+        for d_x in (0, board.symbol_size / 2, board.symbol_size):
+            for d_y in (0, board.symbol_size / 2, board.symbol_size):
+                assert board.board_index.cell_at((x + d_x, y + d_y)) == element
+        assert board.board_index.cell_at((x - 1, y)) is None
+        assert board.board_index.cell_at((x + board.symbol_size + 1, y + 1)) is None
+
+
+def test_holes_of_the_grid():
+    index = BoardIndex((0, 0), 10, 8, 6, 6, PASS_COORDINATES)
+    assert index.num_of_cells == 28
+    assert index.cell_at((1, 1)) == 0
+    assert index.cell_at((1, 41)) is None
+    assert index.cell_at((11, 51)) is None
+    assert index.cell_at((11, 41)) == 8
+    assert index.cell_at((59, 1)) is None
+    assert index.cell_at((-1, 1)) is None
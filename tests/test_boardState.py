@@ -0,0 +1,97 @@
+from memoryGame.gameboard_structures.boardState import BoardState
+
+SYMBOLS = [f'symbol{i}' for i in range(14)]
+
+
+def test_new_state_knows_nothing():
+    state = BoardState(SYMBOLS)
+    assert state.num_of_boxes == 28
+    assert all(state.symbol_at(cell) == BoardState.UNKNOWN for cell in range(28))
+    assert all(state.cells_of(symbol) == () for symbol in range(14))
+    assert state.hidden_cells() == list(range(28))
+    assert not state.is_seen(0)
+    assert not state.is_matched(0)
+
+
+def test_learn_maps_both_ways():
+    state = BoardState(SYMBOLS)
+    symbol = state.symbol_id('symbol3')
+    assert symbol == 3
+    state.learn(27, symbol)
+    assert state.symbol_at(27) == symbol
+    assert state.cells_of(symbol) == (27,)
+    state.learn(0, symbol)
+    assert state.cells_of(symbol) == (27, 0)
+
+
+def test_learning_again_does_not_add_an_element():
+    state = BoardState(SYMBOLS)
+    state.learn(5, 1)
+    state.learn(5, 1)
+    assert state.cells_of(1) == (5,)
+
+
+def test_learning_under_another_symbol_moves_the_element():
+    state = BoardState(SYMBOLS)
+    state.learn(5, 1)
+    state.learn(6, 1)
+    assert state.learn(5, 2)
+    assert state.symbol_at(5) == 2
+    assert state.cells_of(1) == (6,)
+    assert state.cells_of(2) == (5,)
+    assert state.learn(6, 2)
+    assert state.cells_of(1) == ()
+    assert state.cells_of(2) == (5, 6)
+
+
+def test_third_element_of_a_symbol_is_ignored():
+    state = BoardState(SYMBOLS)
+    assert state.learn(3, 4)
+    assert state.learn(9, 4)
+    assert not state.learn(20, 4)
+    assert state.cells_of(4) == (3, 9)
+    # the element shows what the camera saw, but is not one of the symbol's elements
+    assert state.symbol_at(20) == 4
+    assert not state.learn(20, 4)
+    assert state.learn(20, 5)
+    assert state.cells_of(4) == (3, 9)
+    assert state.cells_of(5) == (20,)
+
+
+def test_revealed_and_hidden_elements():
+    state = BoardState(SYMBOLS)
+    state.see(0)
+    state.reveal(0)
+    state.reveal(27)
+    assert state.is_seen(0) and not state.is_seen(27)
+    assert state.is_revealed(0) and state.is_revealed(27)
+    assert state.hidden_cells() == list(range(1, 27))
+    state.hide(0)
+    assert not state.is_revealed(0)
+    assert state.is_seen(0)
+    assert state.hidden_cells() == list(range(27))
+
+
+def test_match():
+    state = BoardState(SYMBOLS)
+    state.match(0)
+    state.match(13)
+    assert state.is_matched(0) and state.is_matched(13)
+    assert not state.is_matched(1)
+    assert state.matched == 1 | 1 << 13
+
+
+def test_copy_is_independent():
+    state = BoardState(SYMBOLS)
+    state.learn(2, 4)
+    state.see(2)
+    copy = state.copy()
+    copy.learn(9, 4)
+    copy.see(9)
+    copy.reveal(9)
+    copy.match(4)
+    assert state.cells_of(4) == (2,)
+    assert state.symbol_at(9) == BoardState.UNKNOWN
+    assert not state.is_seen(9) and not state.is_revealed(9) and not state.is_matched(4)
+    assert copy.cells_of(4) == (2, 9)
+    assert copy.symbols is state.symbols
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from memoryGame.camera_structures.cameraProcess import CameraProcess
+from memoryGame.camera_structures.frameSources import SyntheticSource
+from memoryGame.camera_structures.inferenceBackends import InferenceBackend
+
+
+class StubBackend(InferenceBackend):
+    """Backend answering with the same outputs for every image, or failing like a broken runtime"""
+    name = 'stub'
+
+    def __init__(self, outputs):
+        self.outputs = np.asarray(outputs, dtype='float32')
+        self.fail = False
+
+    def load(self, model_path: str):
+        pass
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self.fail:
+            raise ValueError('broken runtime')
+        return np.tile(self.outputs, (len(batch), 1))
+
+
+@pytest.fixture(params=[True, False], ids=['pipelined', 'batched'])
+def camera(request):
+    camera = CameraProcess(pipelined=request.param, frame_source=SyntheticSource(fps=200.0),
+                           adaptive_confidence=.5)
+    outputs = np.zeros(len(camera.classes))
+    outputs[3] = 10.0
+    camera.model = StubBackend(outputs)
+    camera.load()
+    yield camera
+    camera.stop_camera()
+
+
+def test_predict(camera):
+    for _ in range(3):
+        camera.capture_image()
+    assert camera.predict() == 'duck'
+
+
+def test_backend_failure_in_predict_is_a_runtime_error(camera):
+    camera.model.fail = True
+    for _ in range(3):
+        camera.capture_image()
+    with pytest.raises(RuntimeError) as error:
+        camera.predict()
+    assert isinstance(error.value.__cause__, ValueError)
+    assert camera.pending == [] and camera.image == []
+    # the next reveal classifies again
+    camera.model.fail = False
+    camera.capture_image()
+    assert camera.predict() == 'duck'
+
+
+def test_backend_failure_in_is_confident_is_a_runtime_error(camera):
+    if not camera.pipelined:
+        pytest.skip('adaptive capture needs the pipelined mode')
+    camera.capture_image()
+    assert not camera.is_confident()
+    camera.capture_image()
+    assert camera.is_confident()
+    camera.clear_images()
+    camera.model.fail = True
+    camera.capture_image()
+    with pytest.raises(RuntimeError):
+        camera.is_confident()
+
+
+def test_incomplete_backend_cannot_be_created():
+    class NoPredict(InferenceBackend):
+        def load(self, model_path: str):
+            pass
+
+    with pytest.raises(TypeError):
+        NoPredict()
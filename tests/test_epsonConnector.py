@@ -0,0 +1,115 @@
+from threading import Thread
+
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.epsonConnector import Epson
+
+
+class CoilLog:
+    """Modbus client that logs coil writes as ('s', address, value) and ('m', address, values)"""
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+
+    def write_single_coil(self, address, value):
+        self.writes.append(('s', address, value))
+        return not self.fail
+
+    def write_multiple_coils(self, address, values):
+        self.writes.append(('m', address, list(values)))
+        return not self.fail
+
+
+def connected_robot():
+    robot = Epson()
+    robot.c = CoilLog()
+    robot.online = True
+    return robot
+
+
+def test_only_changed_coils_are_sent():
+    robot = connected_robot()
+    assert robot.write_coils({540: 1, 600: 1})
+    assert robot.write_coils({540: 1, 600: 0})
+    assert robot.c.writes == [('s', 540, True), ('s', 600, True), ('s', 600, False)]
+    assert robot.coils == {540: True, 600: False}
+
+
+def test_forced_coils_are_sent_again():
+    robot = connected_robot()
+    robot.write_coils({540: 1})
+    robot.write_coils({540: 1}, force=True)
+    assert robot.c.writes == [('s', 540, True), ('s', 540, True)]
+
+
+def test_neighbouring_coils_go_as_one_request():
+    robot = connected_robot()
+    robot.write_coils({541: 1, 539: 1, 540: 0, 600: 1})
+    assert robot.c.writes == [('m', 539, [True, False, True]), ('s', 600, True)]
+
+
+def test_offline_write_fails_at_once():
+    robot = connected_robot()
+    robot.online = False
+    assert not robot.write_coils({540: 1})
+    assert robot.c.writes == []
+
+
+def test_transaction_is_sent_on_commit():
+    robot = connected_robot()
+    robot.begin()
+    assert robot.write_coils({540: 1})
+    assert robot.write_coordinates(3)
+    assert robot.c.writes == []
+    assert robot.commit()
+    assert robot.c.writes == [('s', 540, True), ('s', 539, False), ('s', 541, True), ('s', 514, True)]
+
+
+def test_transaction_keeps_write_order():
+    robot = connected_robot()
+    robot.reset_all()
+    robot.write_coils({Instructions.PLACE_BACK.value: 1})
+    robot.c.writes.clear()
+    robot.begin()
+    robot.reset_all()
+    robot.write_coils({Instructions.PLACE_BACK.value: 1})
+    assert robot.commit()
+    # the reset reaches the robot before the command that follows it
+    assert robot.c.writes == [('s', 539, False), ('s', 539, True)]
+    assert robot.coils[539] is True
+
+
+def test_failed_write_ends_commit():
+    robot = connected_robot()
+    robot.begin()
+    robot.write_coils({540: 1})
+    robot.write_coils({600: 1})
+    robot.c.fail = True
+    assert not robot.commit()
+    assert robot.c.writes == [('s', 540, True)]
+    # the transaction is closed, the next write is sent at once
+    robot.c.fail = False
+    assert robot.write_coils({601: 1})
+    assert robot.c.writes[-1] == ('s', 601, True)
+
+
+def test_transactions_are_per_thread():
+    robot = connected_robot()
+    robot.begin()
+    robot.write_coils({540: 1})
+    results = []
+    thread = Thread(target=lambda: results.append(robot.write_coils({600: 1})))
+    thread.start()
+    thread.join()
+    # the other thread is not part of the transaction and writes at once
+    assert results == [True]
+    assert robot.c.writes == [('s', 600, True)]
+    assert robot.commit()
+    assert robot.c.writes == [('s', 600, True), ('s', 540, True)]
+
+
+def test_empty_commit():
+    robot = connected_robot()
+    assert robot.commit()
+    robot.begin()
+    assert robot.commit()
+    assert robot.c.writes == []
@@ -0,0 +1,110 @@
+from random import Random
+
+import pytest
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.expectimaxSolver import ExpectimaxSolver, SearchTimeout
+from memoryGame.gameboard_structures.playerGenerator import AIGenerator
+
+
+@pytest.fixture(autouse=True)
+def cold_table():
+    ExpectimaxSolver.clear()
+    yield
+    ExpectimaxSolver.clear()
+
+
+def test_values_of_small_states():
+    ExpectimaxSolver.warm(2)
+    assert ExpectimaxSolver.value(0, 0, 0) == 0.0
+    assert ExpectimaxSolver.value(0, 0, 1) == 1.0
+    assert ExpectimaxSolver.value(0, 0, 3) == 1.0
+    # two hidden elements of one symbol are found by the player on turn
+    assert ExpectimaxSolver.value(2, 0, 0) == 1.0
+
+
+def test_values_are_point_differences():
+    ExpectimaxSolver.warm(28)
+    for unseen in range(0, 29, 2):
+        value = ExpectimaxSolver.value(unseen, 0, 0)
+        assert -unseen / 2 <= value <= unseen / 2
+
+
+def test_known_pair_is_taken():
+    ExpectimaxSolver.budget = 1.0
+    try:
+        assert ExpectimaxSolver.first_action(20, 2, 1) == ExpectimaxSolver.PAIR
+        assert ExpectimaxSolver.first_action(0, 0, 2) == ExpectimaxSolver.PAIR
+    finally:
+        ExpectimaxSolver.budget = 0.005
+
+
+def test_second_reveal_of_the_last_unseen_element():
+    ExpectimaxSolver.warm(28)
+    # one unseen element is the other element of the first one
+    assert ExpectimaxSolver.second_action(1, 1, 0) == ExpectimaxSolver.UNSEEN
+
+
+def test_cold_search_runs_out_of_time():
+    ExpectimaxSolver.budget = 0.0
+    try:
+        with pytest.raises(SearchTimeout):
+            ExpectimaxSolver.first_action(28, 0, 0)
+    finally:
+        ExpectimaxSolver.budget = 0.005
+
+
+def test_warm_table_answers_without_budget():
+    ExpectimaxSolver.warm(28)
+    ExpectimaxSolver.budget = 0.0
+    try:
+        assert ExpectimaxSolver.first_action(28, 0, 0) == ExpectimaxSolver.UNSEEN
+        assert ExpectimaxSolver.first_action(10, 4, 3) == ExpectimaxSolver.PAIR
+    finally:
+        ExpectimaxSolver.budget = 0.005
+
+
+def test_table_is_bounded():
+    capacity = ExpectimaxSolver.capacity
+    ExpectimaxSolver.capacity = 10
+    try:
+        ExpectimaxSolver.warm(10)
+        assert len(ExpectimaxSolver._table) == 10
+    finally:
+        ExpectimaxSolver.capacity = capacity
+
+
+def test_expert_ai_warms_the_table():
+    state = BoardState([f'symbol{i}' for i in range(14)])
+    AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, Difficulties.EXPERT, Random(0))
+    ExpectimaxSolver.budget = 0.0
+    try:
+        ExpectimaxSolver.first_action(28, 0, 0)
+    finally:
+        ExpectimaxSolver.budget = 0.005
+
+
+def test_consistent_counts():
+    assert ExpectimaxSolver.is_consistent(28, 0, 0)
+    assert ExpectimaxSolver.is_consistent(5, 3, 2)
+    assert ExpectimaxSolver.is_consistent(0, 0, 1)
+    assert not ExpectimaxSolver.is_consistent(0, 1, 0)
+    assert not ExpectimaxSolver.is_consistent(4, 1, 0)
+    assert not ExpectimaxSolver.is_consistent(2, 3, 0)
+
+
+def test_expert_ai_plays_as_hard_after_a_misclassification():
+    state = BoardState([f'symbol{i}' for i in range(14)])
+    ai = AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, Difficulties.EXPERT, Random(0))
+    for cell in range(26):
+        state.learn(cell, cell // 2)
+        state.see(cell)
+    state.learn(26, 13)
+    state.see(26)
+    # the last element is classified as symbol 12 instead of 13, no element of symbol 13 is left unseen
+    state.learn(27, 12)
+    state.see(27)
+    first = ai.what_to_reveal(state)
+    second = ai.what_to_reveal(state)
+    assert state.symbol_at(first) == state.symbol_at(second)
@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from memoryGame.camera_structures.frameSources import FrameSource, SyntheticSource
+
+
+def test_source_without_read_frame_cannot_be_created():
+    with pytest.raises(TypeError):
+        FrameSource()
+
+
+def test_frame_after_skips_older_frames():
+    source = SyntheticSource(width=8, height=4, fps=200.0)
+    source.start()
+    try:
+        _, first = source.latest()
+        after = time.monotonic()
+        frame, timestamp = source.frame_after(after)
+        assert timestamp > after >= first
+        assert frame.shape == (4, 8, 3)
+    finally:
+        source.stop()
+
+
+def test_frame_after_times_out_without_frames():
+    source = SyntheticSource(width=8, height=4)
+    with pytest.raises(TimeoutError):
+        source.frame_after(0.0, timeout=0.05)
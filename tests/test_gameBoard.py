@@ -0,0 +1,81 @@
+import os
+
+import pygame
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from enums.colors import Colors
+from enums.difficulties import Difficulties
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.fakeEpson import FakeEpson
+from memoryGame.epson_structures.statusPoller import RobotTimeoutError
+from memoryGame.gameboard_structures.boardState import BoardState
+from tools.headlessGame import new_board, reveal
+
+SIZE = 1020
+
+
+class StallingEpson(FakeEpson):
+    """FakeEpson that logs every wait and lets the awaited status bits time out on request"""
+    def __init__(self):
+        super().__init__()
+        self.waits = []
+        self.stalled = set()
+
+    def wait_for(self, instruction, timeout: float = None, state: bool = True, since: float = 0.0) -> float:
+        self.waits.append(instruction)
+        if instruction in self.stalled:
+            raise RobotTimeoutError(f'{instruction.name} not reached')
+        return 0.0
+
+
+@pytest.fixture
+def board():
+    pygame.init()
+    return new_board(pygame.Surface((SIZE, SIZE)), SIZE, 0, Difficulties.EASY, StallingEpson())
+
+
+def shows_error(board) -> bool:
+    """Checks if red text is drawn above the board"""
+    pixels = pygame.surfarray.array3d(board.screen.subsurface(board.error_rect)).reshape(-1, 3)
+    return any(tuple(int(value) for value in pixel) == Colors.RED.value for pixel in pixels)
+
+
+def test_robot_timeout_is_shown_above_the_board(board):
+    board.robot.stalled.add(Instructions.CAMERA_POINT)
+    assert not reveal(board, 0)
+    assert board.error == board.ROBOT_ERROR
+    assert shows_error(board)
+    assert not board.state.is_seen(0)
+    # the next successful move hides the message
+    board.robot.stalled.clear()
+    assert reveal(board, 0)
+    assert board.error is None
+    assert not shows_error(board)
+
+
+def test_camera_failure_is_shown_above_the_board(board):
+    def broken_predict():
+        raise RuntimeError('camera stalled')
+
+    board.camera.predict = broken_predict
+    assert not reveal(board, 5)
+    assert board.error == board.CAMERA_ERROR
+    assert shows_error(board)
+    assert board.state.symbol_at(5) == BoardState.UNKNOWN
+
+
+def test_reveal_does_not_wait_for_home(board):
+    for cell in (0, 1):
+        board.get_coordinate(True, (board.elements_coordinates[cell][0] + 1, board.elements_coordinates[cell][1] + 1))
+        assert board.get_symbol()
+        board.robot.waits.clear()
+        board.robot.stalled.add(Instructions.HOME_POSITION)
+        board.reveal_symbol()
+        board.robot.stalled.clear()
+        assert board.robot.waits == []
+        # the arm returns home while the turn goes on, the next move is queued by the move scheduler
+        assert board.moves.returning_since is not None
+        assert board.turn_finished
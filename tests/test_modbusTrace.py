@@ -0,0 +1,137 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.modbusTrace import RecordingClient, ReplayClient
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from tools.replayModbus import record, recorded_moves, replay
+
+
+class RobotStub:
+    """Modbus client answering every request at once, reads return the given inputs"""
+    def __init__(self, inputs=(False, True, False)):
+        self.inputs = list(inputs)
+        self.timeout = 3.0
+
+    def close(self):
+        pass
+
+    def write_single_coil(self, address, value):
+        return True
+
+    def write_multiple_coils(self, address, values):
+        return True
+
+    def read_discrete_inputs(self, address, count=1):
+        return self.inputs[:count]
+
+
+def recording_client(path):
+    client = RecordingClient('localhost', 502, str(path))
+    client.client = RobotStub()
+    return client
+
+
+def read_records(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+def write_records(path, records):
+    with open(path, 'w') as file:
+        for record in records:
+            file.write(json.dumps(record) + '\n')
+
+
+def test_records_reach_the_file_before_close(tmp_path):
+    path = tmp_path / 'session.jsonl'
+    client = recording_client(path)
+    client.write_single_coil(540, 1)
+    client.write_multiple_coils(511, [0, 1])
+    client.read_discrete_inputs(511, 3)
+    records = read_records(path)
+    assert [(r['op'], r['address'], r['values'], r['result']) for r in records] == [
+        ('write', 540, [True], True), ('write', 511, [False, True], True), ('read', 511, 3, [False, True, False])]
+    assert records[0]['t'] <= records[1]['t'] <= records[2]['t']
+    client.close()
+    client.file.close()
+
+
+def test_appended_session_continues_times(tmp_path):
+    path = tmp_path / 'session.jsonl'
+    write_records(path, [{'t': 12.5, 'op': 'write', 'address': 540, 'values': [True], 'result': True}])
+    client = recording_client(path)
+    client.write_single_coil(540, 0)
+    client.close()
+    client.file.close()
+    records = read_records(path)
+    assert len(records) == 2
+    assert records[1]['t'] >= 12.5
+
+
+def test_last_time_skips_an_incomplete_line(tmp_path):
+    path = tmp_path / 'session.jsonl'
+    write_records(path, [{'t': 3.0, 'op': 'read', 'address': 511, 'values': 3, 'result': None}])
+    with open(path, 'a') as file:
+        file.write('{"t": 4.0, "op": "wri')
+    assert RecordingClient.last_time(str(path)) == 3.0
+    assert RecordingClient.last_time(str(tmp_path / 'missing.jsonl')) == 0.0
+
+
+def test_timeout_goes_to_the_client(tmp_path):
+    client = recording_client(tmp_path / 'session.jsonl')
+    client.timeout = 0.3
+    assert client.client.timeout == 0.3
+    client.close()
+    client.file.close()
+
+
+def test_replay_serves_reads_after_matching_writes(tmp_path):
+    path = tmp_path / 'session.jsonl'
+    write_records(path, [
+        {'t': 0.0, 'op': 'read', 'address': 511, 'values': 3, 'result': [False, True, False]},
+        {'t': 0.1, 'op': 'write', 'address': 540, 'values': [True], 'result': True},
+        {'t': 0.2, 'op': 'read', 'address': 511, 'values': 3, 'result': [False, False, False]},
+        {'t': 0.3, 'op': 'read', 'address': 511, 'values': 3, 'result': [False, False, False]},
+        {'t': 0.4, 'op': 'read', 'address': 511, 'values': 3, 'result': [True, False, False]},
+        {'t': 0.5, 'op': 'write', 'address': 511, 'values': [False, True], 'result': True},
+    ])
+    client = ReplayClient(str(path), realtime=False)
+    assert client.read_discrete_inputs(511, 3) == [False, True, False]
+    assert client.write_single_coil(540, True)
+    # unchanged reads are dropped in fast mode, the last one is served until the next write
+    assert client.read_discrete_inputs(511, 3) == [False, False, False]
+    assert client.read_discrete_inputs(511, 3) == [True, False, False]
+    assert client.read_discrete_inputs(511, 3) == [True, False, False]
+    assert not client.finished()
+    assert client.write_multiple_coils(600, [True])
+    assert client.divergences == 1
+    assert client.write_multiple_coils(511, [False, True])
+    assert client.finished()
+
+
+@pytest.fixture
+def headless():
+    yield
+    FrameCompositor.enabled = True
+
+
+def test_recorded_session_replays_without_divergences(tmp_path, headless):
+    path = str(tmp_path / 'session.jsonl')
+    record(path, 3, seed=1)
+    moves = recorded_moves(path)
+    assert len(moves) == 3
+    robot = Epson(poll_rate=2000.0, response_timeout=10.0, client_factory=ReplayClient.factory(path, realtime=False))
+    assert robot.start_connection()
+    latencies, camera_changes = replay(robot, moves, lookahead=True, seed=1)
+    client = robot.c
+    robot.close_connection()
+    assert None not in latencies
+    assert camera_changes == 0
+    assert client.divergences == 0
+    assert client.finished()
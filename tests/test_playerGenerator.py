@@ -0,0 +1,93 @@
+from collections import Counter
+from random import Random
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.playerGenerator import AIGenerator, CellPool
+from memoryGame.gameboard_structures.travelModel import TravelModel
+
+SYMBOLS = [f'symbol{i}' for i in range(14)]
+
+
+def new_ai(difficulty, seed=0, travel=None):
+    state = BoardState(SYMBOLS)
+    return state, AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, difficulty, Random(seed), travel)
+
+
+def test_cell_pool_choice_is_uniform():
+    pool = CellPool(range(5))
+    rng = Random(1)
+    counts = Counter(pool.choice(rng) for _ in range(10000))
+    assert set(counts) == set(range(5))
+    assert all(1800 < count < 2200 for count in counts.values())
+
+
+def test_cell_pool_choice_never_draws_excluded():
+    pool = CellPool(range(5))
+    rng = Random(2)
+    counts = Counter(pool.choice(rng, exclude=3) for _ in range(8000))
+    assert set(counts) == {0, 1, 2, 4}
+    assert all(1800 < count < 2200 for count in counts.values())
+
+
+def test_cell_pool_choice_excluding_element_zero():
+    pool = CellPool(range(3))
+    rng = Random(3)
+    assert {pool.choice(rng, exclude=0) for _ in range(200)} == {1, 2}
+
+
+def test_cell_pool_choice_after_discard():
+    pool = CellPool(range(4))
+    pool.discard(0)
+    pool.discard(2)
+    pool.discard(7)
+    rng = Random(4)
+    assert len(pool) == 2
+    assert 0 not in pool
+    assert {pool.choice(rng) for _ in range(200)} == {1, 3}
+    assert pool.choice(rng, exclude=1) == 3
+
+
+def test_cell_pool_choice_of_nothing():
+    rng = Random(5)
+    assert CellPool().choice(rng) is None
+    assert CellPool([6]).choice(rng, exclude=6) is None
+    assert CellPool([6]).choice(rng, exclude=0) == 6
+
+
+def test_cell_pool_cheapest():
+    pool = CellPool(range(4))
+    costs = [1.0, 3.0, 0.5, 2.0]
+    assert pool.cheapest(costs) == 2
+    assert pool.cheapest(costs, exclude=2) == 0
+    pool.discard(2)
+    assert pool.cheapest(costs, exclude=0) == 3
+    assert CellPool().cheapest(costs) is None
+
+
+def test_first_reveal_can_be_element_zero():
+    for difficulty in (Difficulties.EASY, Difficulties.HARD):
+        firsts = set()
+        for seed in range(200):
+            state, ai = new_ai(difficulty, seed)
+            ai.what_to_reveal(state)
+            ai.what_to_reveal(state)
+            firsts.add(ai.what_to_reveal(state))
+        assert 0 in firsts
+
+
+def test_second_reveal_differs_from_first():
+    state, ai = new_ai(Difficulties.HARD, 6)
+    for _ in range(100):
+        first = ai.what_to_reveal(state)
+        assert ai.what_to_reveal(state) != first
+        assert ai.previous_symbol is None
+
+
+def test_cheapest_first_reveal_can_be_element_zero():
+    # element 0 lies next to home, the others further away the higher their number
+    travel = TravelModel([(10.0 * cell, 0.0) for cell in range(28)], (0.0, 0.0), [(0.0, -50.0)])
+    state, ai = new_ai(Difficulties.HARD, travel=travel)
+    assert ai.what_to_reveal(state) == 0
+    assert ai.what_to_reveal(state) == 1
+    assert ai.what_to_reveal(state) == 0
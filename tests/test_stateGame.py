@@ -0,0 +1,48 @@
+from random import Random
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.playerGenerator import AIGenerator
+from tools.stateGame import play_state_game
+
+SYMBOLS = [f'symbol{i}' for i in range(14)]
+
+
+def test_ai_against_ai_finds_all_pairs():
+    state = BoardState(SYMBOLS)
+    ais = [AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, Difficulties.HARD, Random(seed)) for seed in (1, 2)]
+    reveals = []
+
+    def choose(state, player, first):
+        return ais[player].what_to_reveal(state)
+
+    def on_reveal(state, cell, symbol, first):
+        assert state.symbol_at(cell) == symbol
+        assert first != cell
+        reveals.append(cell)
+
+    first_points, second_points, turns = play_state_game(state, 0, choose, on_reveal)
+    assert first_points + second_points == len(SYMBOLS)
+    assert state.matched == (1 << len(SYMBOLS)) - 1
+    assert state.hidden_cells() == []
+    assert len(reveals) == 2 * turns
+
+
+def test_same_seed_same_layout():
+    layouts = []
+    for _ in range(2):
+        state = BoardState(SYMBOLS)
+        cells = iter(range(28))
+        play_state_game(state, 7, lambda state, player, first: next(cells), max_turns=14)
+        layouts.append([state.symbol_at(cell) for cell in range(28)])
+    assert layouts[0] == layouts[1]
+    assert sorted(layouts[0]) == sorted(list(range(14)) * 2)
+
+
+def test_game_stops_after_max_turns():
+    state = BoardState(SYMBOLS)
+    # always reveals elements 0 and 1 which are not a pair for this seed
+    seed = next(seed for seed in range(100) if not play_state_game(BoardState(SYMBOLS), seed,
+                                                                   lambda state, player, first: int(first == 0),
+                                                                   max_turns=1)[0])
+    assert play_state_game(state, seed, lambda state, player, first: int(first == 0), max_turns=5) == (0, 0, 5)
@@ -0,0 +1,84 @@
+import os
+
+import pygame
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from enums.colors import Colors
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.windows.inputWindow import InputWindow
+from memoryGame.windows.menuWindows import MenuWindows
+from memoryGame.windows.settingsWindow import SettingsWindow
+
+SIZE = 1020
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.Surface((SIZE, SIZE))
+    FrameCompositor.mark_all()
+
+
+def colors_in(screen, rect) -> set:
+    """Returns the colors of the pixels inside the rect"""
+    pixels = pygame.surfarray.array3d(screen.subsurface(rect)).reshape(-1, 3)
+    return {tuple(int(value) for value in pixel) for pixel in pixels}
+
+
+def painted(screen, rect) -> bool:
+    """Checks if something other than the black background is drawn inside the rect"""
+    return colors_in(screen, rect) != {Colors.BLACK.value}
+
+
+def test_input_window_shows_ok_button(screen):
+    window = InputWindow(screen, SIZE, SIZE)
+    window.input_init()
+    assert painted(screen, window.button_ok.text_rect)
+    # the mouse elsewhere does not change anything
+    window.update((0, 0))
+    assert painted(screen, window.button_ok.text_rect)
+
+
+def test_input_window_keeps_ok_button_after_typing(screen):
+    window = InputWindow(screen, SIZE, SIZE)
+    window.input_init()
+    window.update((0, 0))
+    # the game initializes the window again on every key
+    for letter in 'abc':
+        window.input_init()
+        window.text_update(True, letter)
+        window.update((0, 0))
+        assert painted(screen, window.button_ok.text_rect)
+    assert window.user_input == 'abc'
+
+
+def test_menu_and_settings_show_buttons(screen):
+    menu = MenuWindows(screen, SIZE, SIZE)
+    menu.menu_init()
+    menu.update_buttons((0, 0))
+    assert painted(screen, menu.button_start.text_rect)
+    assert painted(screen, menu.button_options.text_rect)
+
+    settings = SettingsWindow(screen, SIZE, SIZE)
+    settings.settings_init()
+    settings.update_buttons((0, 0))
+    for button in (settings.button_easy, settings.button_medium, settings.button_hard, settings.button_expert,
+                   settings.button_camera_position):
+        assert painted(screen, button.text_rect)
+
+
+def test_button_changes_color_with_focus(screen):
+    window = InputWindow(screen, SIZE, SIZE)
+    window.input_init()
+    button = window.button_ok
+    assert Colors.DARK_GREEN.value in colors_in(screen, button.text_rect)
+    window.update(button.text_rect.center)
+    assert button.is_focused
+    assert Colors.GRAY.value in colors_in(screen, button.text_rect)
+    assert Colors.DARK_GREEN.value not in colors_in(screen, button.text_rect)
+    window.update((0, 0))
+    assert not button.is_focused
+    assert Colors.DARK_GREEN.value in colors_in(screen, button.text_rect)
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark of AIGenerator.what_to_reveal. The AI plays both sides of whole games in tools.stateGame on
+a BoardState with a seeded layout, no pygame or robot is involved. The decision time is reported per number of found
+pairs and should stay flat from the start to the end of the game.
+
+    python -m tools.benchmarkAI --games 2000 --difficulty HARD
+"""
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.playerGenerator import AIGenerator
+from memoryGame.gameboard_structures.symbolsGenerator import SymbolsGenerator
+from tools.stateGame import play_state_game
+
+
+def play(symbols: list, seed: int, difficulty: Difficulties, timings: list):
+    """Plays one game, appends the time of every decision to timings[number of found pairs]"""
+    state = BoardState(symbols)
+    ai = AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, difficulty, random.Random(seed))
+
+    def choose(state: BoardState, player: int, first: int) -> int:
+        start = time.perf_counter_ns()
+        cell = ai.what_to_reveal(state)
+        timings[bin(state.matched).count('1')].append(time.perf_counter_ns() - start)
+        return cell
+
+    play_state_game(state, seed, choose, max_turns=math.inf)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmark of the AI decision')
+    parser.add_argument('--games', type=int, default=1000, help='number of games')
+    parser.add_argument('--difficulty', choices=[difficulty.name for difficulty in Difficulties], default='HARD')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, the next ones add one')
+    args = parser.parse_args()
+
+    names = list(SymbolsGenerator.generate_symbols_dict().keys())
+    pairs = [[] for _ in names]
+    for game in range(args.games):
+        play(names, args.seed + game, Difficulties[args.difficulty], pairs)
+
+    print(f'{"pairs found":>11} {"decisions":>10} {"p50 us":>8} {"p95 us":>8}')
+    for found, values in enumerate(pairs):
+        values = np.array(values) / 1000
+        print(f'{found:>11} {len(values):>10} {np.percentile(values, 50):>8.2f} {np.percentile(values, 95):>8.2f}')
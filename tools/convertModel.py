@@ -0,0 +1,123 @@
+"""
+Converts the Keras CNN model to TFLite and ONNX, checks that the converted models give the same top-1 class
+and reports per call latency and resident memory of every inference backend.
+
+Run from the repository root:
+    python -m tools.convertModel --model CNN/model_mobilenet_v7.h5 --samples captured_images
+"""
+import argparse
+import os
+import resource
+import time
+from multiprocessing import get_context
+
+import numpy as np
+
+from memoryGame.camera_structures.inferenceBackends import create_backend
+
+
+def convert_tflite(model_path: str) -> str:
+    """Converts the .h5 model to .tflite next to the original, returns path of the converted model"""
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    output_path = os.path.splitext(model_path)[0] + '.tflite'
+    with open(output_path, 'wb') as file:
+        file.write(converter.convert())
+    return output_path
+
+
+def convert_onnx(model_path: str) -> str:
+    """Converts the .h5 model to .onnx next to the original, returns path of the converted model"""
+    import tensorflow as tf
+    import tf2onnx
+    model = tf.keras.models.load_model(model_path)
+    output_path = os.path.splitext(model_path)[0] + '.onnx'
+    signature = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, output_path=output_path)
+    return output_path
+
+
+def load_samples(directory: str, size: int, count: int) -> np.ndarray:
+    """
+    Loads images to classify, the same way CameraProcess feeds them to the model
+    :param directory: directory with captured ROI images, random images are generated if None
+    :param size: size of the model input
+    :param count: number of random images
+    """
+    if directory is None:
+        return np.random.default_rng(0).uniform(0, 255, (count, size, size, 3)).astype('float32')
+    import cv2
+    images = []
+    for filename in sorted(os.listdir(directory)):
+        image = cv2.imread(os.path.join(directory, filename))
+        if image is not None:
+            images.append(cv2.resize(image, (size, size)))
+    return np.array(images, dtype='float32')
+
+
+def run_backend(name: str, model_path: str, samples: np.ndarray, runs: int) -> dict:
+    """
+    Loads the backend, classifies the samples and measures latency of triple batches like in the game.
+    Runs in its own process so resident memory of the backends does not add up
+    """
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    backend = create_backend(name)
+    start = time.perf_counter()
+    backend.load(model_path)
+    load_time = time.perf_counter() - start
+
+    top1 = np.concatenate([np.argmax(backend.predict(samples[i:i + 3]), axis=-1)
+                           for i in range(0, len(samples), 3)])
+    batch = samples[:3]
+    backend.predict(batch)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(batch)
+        latencies.append(time.perf_counter() - start)
+    return {
+        'backend': name,
+        'top1': top1,
+        'load_s': load_time,
+        'p50_ms': 1000 * float(np.percentile(latencies, 50)),
+        'p95_ms': 1000 * float(np.percentile(latencies, 95)),
+        # ru_maxrss is given in kilobytes on Linux
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_model_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converts the CNN model and compares the inference backends')
+    parser.add_argument('--model', default='CNN/model_mobilenet_v7.h5', help='path of the Keras model')
+    parser.add_argument('--formats', nargs='*', choices=['tflite', 'onnx'], default=['tflite', 'onnx'],
+                        help='formats to convert the model to')
+    parser.add_argument('--samples', default=None, help='directory with captured ROI images used for the check')
+    parser.add_argument('--size', type=int, default=224, help='size of the model input')
+    parser.add_argument('--runs', type=int, default=100, help='number of timed calls per backend')
+    args = parser.parse_args()
+
+    models = {'keras': args.model}
+    converters = {'tflite': convert_tflite, 'onnx': convert_onnx}
+    for model_format in args.formats:
+        models[model_format] = converters[model_format](args.model)
+        print(f'converted {args.model} -> {models[model_format]}')
+
+    samples = load_samples(args.samples, args.size, 30)
+    # spawn gives every backend a clean process, forked children would share the parent's memory
+    context = get_context('spawn')
+    results = []
+    for name, path in models.items():
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_backend, (name, path, samples, args.runs)))
+
+    reference = results[0]['top1']
+    print(f'{"backend":<8} {"top-1 match":>12} {"load s":>8} {"p50 ms":>8} {"p95 ms":>8} {"RSS MB":>8} '
+          f'{"model MB":>9}')
+    for result in results:
+        match = np.mean(result['top1'] == reference) * 100
+        print(f'{result["backend"]:<8} {match:>11.1f}% {result["load_s"]:>8.2f} {result["p50_ms"]:>8.2f} '
+              f'{result["p95_ms"]:>8.2f} {result["rss_mb"]:>8.1f} {result["rss_model_mb"]:>9.1f}')
+    if any(np.any(result['top1'] != reference) for result in results):
+        raise SystemExit('converted model gives a different top-1 class than the Keras model')
@@ -0,0 +1,142 @@
+"""
+Plays complete games headless, with a fake robot and a fake camera answering at once from a seeded hidden layout.
+Rendering is a no-op: the board draws onto an empty off-screen surface, which clips every blit and draw call, and
+FrameCompositor is disabled, so no display is opened and no dirty rectangles are collected. Turns go through the
+real GameBoard.get_coordinate -> get_symbol -> reveal_symbol logic, the player picks random unrevealed elements by
+clicking their centre and the AI plays with the chosen difficulty.
+
+Throughput baseline:
+    python -m tools.headlessGame --games 500 --difficulty HARD
+Profile the game logic:
+    python -m tools.headlessGame --games 200 --profile
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+
+from enums.difficulties import Difficulties
+from memoryGame.camera_structures.fakeCamera import FakeCamera
+from memoryGame.epson_structures.fakeEpson import FakeEpson
+from memoryGame.epson_structures.moveScheduler import MoveScheduler
+from memoryGame.gameboard_structures.gameBoardGenerator import GameBoard
+from memoryGame.render_structures.frameCompositor import FrameCompositor
+from memoryGame.render_structures.symbolsCache import SymbolsCache
+
+
+def new_board(screen, size: int, seed: int, difficulty: Difficulties, robot=None, moves: MoveScheduler = None) \
+        -> GameBoard:
+    """
+    Creates a board with a fake camera and no waits
+    :param screen: surface to draw on, the one of headless_screen() to skip rendering
+    :param size: width and height of the board layout, independent of the surface
+    :param robot: connected Epson, e.g. with the simulator or a ReplayClient, a FakeEpson by default
+    :param moves: move scheduler of the robot, a new one by default
+    """
+    robot = robot if robot is not None else FakeEpson()
+    camera = FakeCamera(robot, seed)
+    board = GameBoard(robot, camera, screen, size, size, 'Gracz', difficulty, moves=moves)
+    board.select_delay = board.show_time = board.miss_time = 0
+    board.draw_game_board()
+    return board
+
+
+def headless_screen():
+    """
+    Initializes pygame without a display and returns an empty surface, drawing onto it is clipped to nothing and
+    FrameCompositor is disabled, so the game logic runs without rendering
+    """
+    pygame.init()
+    FrameCompositor.enabled = False
+    SymbolsCache.invalidate()
+    return pygame.Surface((0, 0))
+
+
+def reveal(board: GameBoard, cell: int) -> bool:
+    """
+    Reveals the element like the player clicking on it, through GameBoard.get_coordinate, get_symbol and
+    reveal_symbol
+    :return: False if the element could not be selected or the robot or the camera failed
+    """
+    x, y = board.elements_coordinates[cell]
+    mouse = (x + board.symbol_size / 2, y + board.symbol_size / 2)
+    if not board.get_coordinate(True, mouse):
+        return False
+    if not board.get_symbol():
+        board.cancel_selection()
+        return False
+    board.reveal_symbol()
+    return True
+
+
+def player_turn(board: GameBoard, rng: random.Random):
+    """Reveals two elements like the player clicking on them"""
+    for _ in range(2):
+        if board.check_game_over():
+            return
+        hidden = [i for i in board.state.hidden_cells() if i != board.selected_coordinate]
+        reveal(board, rng.choice(hidden))
+
+
+def ai_turn(board: GameBoard):
+    """Reveals two elements chosen by the AI, as MemoryGame.ai_turn"""
+    for _ in range(2):
+        if board.check_game_over():
+            return
+        board.get_coordinate(is_player_turn=False)
+        if board.get_symbol():
+            board.reveal_symbol()
+
+
+def play_game(screen, size: int, seed: int, difficulty: Difficulties, max_turns: int = 500) -> tuple:
+    """
+    Plays one game
+    :return: (winner as in GameBoard.check_winner, number of turns)
+    """
+    rng = random.Random(seed)
+    board = new_board(screen, size, seed, difficulty)
+    board.player_ai.rng = random.Random(seed + 1)
+    board.player_ai.change_difficulty(difficulty)
+    turns = 0
+    while not board.check_game_over() and turns < max_turns:
+        player_turn(board, rng)
+        ai_turn(board)
+        turns += 1
+    return board.check_winner(), turns
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Headless game simulation with a fake robot and camera')
+    parser.add_argument('--games', type=int, default=200, help='number of games')
+    parser.add_argument('--difficulty', choices=[difficulty.name for difficulty in Difficulties], default='MEDIUM')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, the next ones add one')
+    parser.add_argument('--size', type=int, default=1020, help='size of the board layout')
+    parser.add_argument('--profile', action='store_true', help='print the functions taking the most time')
+    args = parser.parse_args()
+
+    surface = headless_screen()
+    profiler = cProfile.Profile() if args.profile else None
+    wins = {1: 0, 2: 0, 3: 0}
+    all_turns = 0
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    for game in range(args.games):
+        winner, game_turns = play_game(surface, args.size, args.seed + game, Difficulties[args.difficulty])
+        wins[winner] += 1
+        all_turns += game_turns
+    if profiler is not None:
+        profiler.disable()
+    duration = time.perf_counter() - start
+
+    print(f'{args.games} games in {duration:.2f} s, {60 * args.games / duration:.0f} games/min, '
+          f'{all_turns / args.games:.1f} turns per game')
+    print(f'player won {wins[1]}, AI won {wins[2]}, draws {wins[3]}')
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
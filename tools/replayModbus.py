@@ -0,0 +1,135 @@
+"""
+Replays a Modbus session recorded with main.py --record-modbus against the connector, without a robot. The moves of
+the session are taken from the recorded coil writes and revealed again by a headless GameBoard with a fake camera, so
+a change of the get_symbol/reveal_symbol sequencing can be measured on real timings.
+
+Record a session, with the robot or the simulator:
+    python main.py --record-modbus session.jsonl
+Replay it at the recorded pace, or as fast as possible, optionally queueing moves while the arm returns home:
+    python -m tools.replayModbus session.jsonl
+    python -m tools.replayModbus session.jsonl --fast --lookahead
+To record a session with the simulator only:
+    python -m tools.replayModbus session.jsonl --record 20
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from enums.difficulties import Difficulties
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.epsonSimulator import EpsonSimulator
+from memoryGame.epson_structures.modbusTrace import RecordingClient, ReplayClient
+from memoryGame.epson_structures.statusPoller import RobotTimeoutError
+from memoryGame.gameboard_structures.boardState import BoardState
+from tools.headlessGame import headless_screen, new_board, reveal
+
+
+def recorded_moves(path: str) -> list:
+    """
+    Finds the moves of a recorded session
+    :return: list of (coordinate, go_camera)
+    """
+    coils = {}
+    moves = []
+    moving = False
+    with open(path) as file:
+        for line in file:
+            record = json.loads(line)
+            if record['op'] != 'write':
+                continue
+            for i, value in enumerate(record['values']):
+                coils[record['address'] + i] = value
+            # write_coordinates sets the command and the coordinate, possibly with two requests
+            go_camera = coils.get(Instructions.NEW_COMMAND.value, False)
+            command = go_camera or coils.get(Instructions.WITHOUT_CAMERA.value, False)
+            coordinate = next((i for i in range(28) if coils.get(511 + i)), None)
+            if command and coordinate is not None and not moving:
+                moves.append((coordinate, go_camera))
+            moving = command and coordinate is not None
+    return moves
+
+
+def replay(robot: Epson, moves: list, lookahead: bool, seed: int = 0) -> tuple:
+    """
+    Reveals the moves again through a headless GameBoard with a fake camera, so the game's own get_symbol and
+    reveal_symbol sequencing is what is measured
+    :param lookahead: queue the next move while the arm returns home as the game does, otherwise wait for the arm
+    after every reveal
+    :return: (time of every reveal in seconds, None for the reveals that failed, number of reveals where the board
+    went to the camera or not differently than the recording)
+    """
+    board = new_board(headless_screen(), 1020, seed, Difficulties.HARD, robot)
+    latencies = []
+    camera_changes = 0
+    for coordinate, go_camera in moves:
+        camera_changes += (board.state.symbol_at(coordinate) == BoardState.UNKNOWN) != go_camera
+        start = time.perf_counter()
+        if not reveal(board, coordinate):
+            latencies.append(None)
+            continue
+        if not lookahead:
+            try:
+                robot.wait_for(Instructions.HOME_POSITION, since=board.moves.returning_since or 0.0)
+            except RobotTimeoutError:
+                pass
+        latencies.append(time.perf_counter() - start)
+    if board.moves.returning_since is not None:
+        try:
+            robot.wait_for(Instructions.HOME_POSITION, since=board.moves.returning_since)
+        except RobotTimeoutError:
+            pass
+    return latencies, camera_changes
+
+
+def record(path: str, turns: int, seed: int):
+    """Records a session of random reveals of a headless GameBoard with the simulated robot"""
+    simulator = EpsonSimulator(port=5021, motion_time=0.3, camera_time=0.1, seed=seed)
+    simulator.start()
+    robot = Epson('localhost', 5021, client_factory=RecordingClient.factory(path))
+    if not robot.start_connection():
+        raise SystemExit('could not connect to the simulator')
+    board = new_board(headless_screen(), 1020, seed, Difficulties.HARD, robot)
+    rng = random.Random(seed)
+    for _ in range(turns):
+        reveal(board, rng.choice([cell for cell in range(28) if cell != board.selected_coordinate]))
+    if board.moves.returning_since is not None:
+        robot.wait_for(Instructions.HOME_POSITION, since=board.moves.returning_since)
+    robot.close_connection()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replays a recorded Modbus session without a robot')
+    parser.add_argument('session', help='JSON lines file recorded with --record-modbus')
+    parser.add_argument('--fast', action='store_true', help='replay as fast as possible instead of at recorded pace')
+    parser.add_argument('--lookahead', action='store_true',
+                        help='queue moves with the move scheduler while the arm returns home, as the game does')
+    parser.add_argument('--record', type=int, default=0, metavar='TURNS',
+                        help='record a session of random reveals with the simulator into the file first')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the recorded session')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.session, args.record, args.seed)
+    session_moves = recorded_moves(args.session)
+    # in fast mode the status is read as often as the replay can serve it
+    replay_robot = Epson(poll_rate=100.0 if not args.fast else 2000.0, response_timeout=10.0,
+                         client_factory=ReplayClient.factory(args.session, realtime=not args.fast))
+    replay_robot.start_connection()
+    begin = time.perf_counter()
+    times, changed = replay(replay_robot, session_moves, args.lookahead, args.seed)
+    total = time.perf_counter() - begin
+    client = replay_robot.c
+    replay_robot.close_connection()
+
+    done = [value for value in times if value is not None]
+    print(f'replayed {len(done)}/{len(session_moves)} moves in {total:.2f} s, '
+          f'{client.divergences} writes not in the recording, all writes replayed: {client.finished()}, '
+          f'{changed} reveals decided the camera differently')
+    if done:
+        values = np.array(done) * 1000
+        print(f'reveal p50={np.percentile(values, 50):.1f} ms p95={np.percentile(values, 95):.1f} ms')
@@ -0,0 +1,246 @@
+"""
+Self-play of AIGenerator against scripted human-like players, spread over all cores with a process pool. The game
+logic runs in tools.stateGame on a bare BoardState with seeded layouts, no pygame, robot or camera is involved. The
+human starts and a found pair does not give another turn, as in MemoryGame.
+
+The human remembers the last shown elements up to its memory capacity and every time it relies on a remembered
+element it may slip and not recall it. The presets below can be overridden with --capacity and --slip.
+
+Balance of all difficulties against a casual player:
+    python -m tools.selfPlay --games 1000000 --human casual
+One difficulty against a custom player:
+    python -m tools.selfPlay --games 200000 --difficulty HARD --capacity 10 --slip 0.2
+Arm travel saved by choosing between equally good elements by travel, every layout is played with and without it:
+    python -m tools.selfPlay --games 100000 --difficulty HARD EXPERT --travel-model
+"""
+import argparse
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from multiprocessing import Pool
+
+from enums.difficulties import Difficulties
+from memoryGame.gameboard_structures.boardState import BoardState
+from memoryGame.gameboard_structures.playerGenerator import AIGenerator
+from memoryGame.gameboard_structures.symbolsGenerator import SymbolsGenerator
+from memoryGame.gameboard_structures.travelModel import TravelModel
+from tools.stateGame import play_state_game
+
+# name -> (memory capacity in elements, probability of not recalling a remembered element)
+HUMANS = {
+    'child': (4, 0.3),
+    'casual': (8, 0.15),
+    'sharp': (16, 0.05),
+    'perfect': (28, 0.0),
+}
+
+
+class ScriptedPlayer:
+    """
+    Human-like player with a limited and unreliable memory
+
+    Attributes
+    ----------
+    :arg capacity: number of the last shown elements that are remembered
+    :arg slip: probability of not recalling a remembered element when it is needed
+    :arg rng: random generator of the decisions and slips
+    :arg memory: element -> symbol id of the remembered elements, the oldest first
+
+    Parameters
+    ----------
+    :param capacity: memory capacity in elements
+    :param slip: probability of a memory slip
+    :param rng: random generator
+    """
+    __slots__ = ('capacity', 'slip', 'rng', 'memory')
+
+    def __init__(self, capacity: int, slip: float, rng: random.Random):
+        self.capacity = capacity
+        self.slip = slip
+        self.rng = rng
+        self.memory = OrderedDict()
+
+    def observe(self, cell: int, symbol: int):
+        """Remembers a shown element, the oldest one is forgotten when the memory is full"""
+        self.memory[cell] = symbol
+        self.memory.move_to_end(cell)
+        if len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def forget(self, cell: int):
+        """Forgets an element that left the game"""
+        self.memory.pop(cell, None)
+
+    def recalls(self) -> bool:
+        """Checks if a remembered element comes to mind this time"""
+        return self.rng.random() >= self.slip
+
+    def first(self, state: BoardState) -> int:
+        """Reveals an element of a remembered pair, otherwise a hidden element it does not remember"""
+        cells = {}
+        for cell, symbol in self.memory.items():
+            if symbol in cells and self.recalls():
+                return cells[symbol]
+            cells[symbol] = cell
+        return self._unknown(state)
+
+    def second(self, state: BoardState, first: int) -> int:
+        """Reveals the remembered other element of the first one, otherwise a hidden element it does not remember"""
+        symbol = state.symbol_at(first)
+        for cell, remembered in self.memory.items():
+            if remembered == symbol and cell != first and self.recalls():
+                return cell
+        return self._unknown(state, first)
+
+    def _unknown(self, state: BoardState, exclude: int = None) -> int:
+        """Reveals a random hidden element, preferring the ones it does not remember"""
+        hidden = [cell for cell in state.hidden_cells() if cell != exclude]
+        unknown = [cell for cell in hidden if cell not in self.memory]
+        return self.rng.choice(unknown or hidden)
+
+
+def play(names: list, seed: int, difficulty: Difficulties, capacity: int, slip: float, max_turns: int,
+         travel: TravelModel = None, travel_aware: bool = False) -> tuple:
+    """
+    Plays one game of the scripted human against the AI
+    :param travel: model measuring the arm travel of all reveals
+    :param travel_aware: the AI chooses between equally good elements with the travel model
+    :return: (human points, AI points, number of turns, arm travel in mm, 0 without a travel model)
+    """
+    state = BoardState(names)
+    ai = AIGenerator(None, (0, 0), (0, 0), 'AI', state, 0, difficulty, random.Random(f'{seed}-ai'),
+                     travel if travel_aware else None)
+    human = ScriptedPlayer(capacity, slip, random.Random(f'{seed}-human'))
+    distance = 0.0
+
+    def choose(state: BoardState, player: int, first: int) -> int:
+        nonlocal distance
+        if player:
+            cell = ai.what_to_reveal(state)
+        elif first is None:
+            cell = human.first(state)
+        else:
+            cell = human.second(state, first)
+        if travel is not None:
+            distance += travel.cost(cell, go_camera=state.symbol_at(cell) == BoardState.UNKNOWN)
+        return cell
+
+    def on_reveal(state: BoardState, cell: int, symbol: int, first: int):
+        human.observe(cell, symbol)
+        if first is not None and state.is_matched(symbol):
+            human.forget(first)
+            human.forget(cell)
+
+    human_points, ai_points, turns = play_state_game(state, seed, choose, on_reveal, max_turns)
+    return human_points, ai_points, turns, distance
+
+
+def new_totals(difficulty: str) -> dict:
+    """Returns empty totals of a difficulty"""
+    return {'difficulty': difficulty, 'games': 0, 'wins': 0, 'losses': 0, 'draws': 0, 'turns': 0, 'unfinished': 0,
+            'margins': {}, 'travel': 0.0, 'random_travel': 0.0}
+
+
+def play_chunk(task: tuple) -> dict:
+    """
+    Plays games with consecutive seeds in a worker process
+    :param task: (difficulty name, first seed, number of games, capacity, slip, max turns, travel model), the travel
+    model is None, 'grid' or a JSON file, with a model every game is played once more with the AI choosing at random
+    :return: totals of the chunk as merged by merge()
+    """
+    difficulty, first_seed, games, capacity, slip, max_turns, travel_model = task
+    names = list(SymbolsGenerator.generate_symbols_dict().keys())
+    totals = new_totals(difficulty)
+    travel = None
+    if travel_model == 'grid':
+        travel = TravelModel.grid()
+    elif travel_model:
+        travel = TravelModel.from_file(travel_model)
+    for seed in range(first_seed, first_seed + games):
+        human_points, ai_points, turns, distance = play(names, seed, Difficulties[difficulty], capacity, slip,
+                                                        max_turns, travel, travel_aware=True)
+        if travel is not None:
+            totals['travel'] += distance
+            totals['random_travel'] += play(names, seed, Difficulties[difficulty], capacity, slip, max_turns,
+                                            travel)[3]
+        margin = ai_points - human_points
+        totals['games'] += 1
+        totals['turns'] += turns
+        totals['unfinished'] += turns >= max_turns
+        if margin > 0:
+            totals['wins'] += 1
+        elif margin < 0:
+            totals['losses'] += 1
+        else:
+            totals['draws'] += 1
+        totals['margins'][margin] = totals['margins'].get(margin, 0) + 1
+    return totals
+
+
+def merge(totals: dict, chunk: dict):
+    """Adds the totals of a chunk to the totals of its difficulty"""
+    for key in ('games', 'wins', 'losses', 'draws', 'turns', 'unfinished', 'travel', 'random_travel'):
+        totals[key] += chunk[key]
+    for margin, count in chunk['margins'].items():
+        totals['margins'][margin] = totals['margins'].get(margin, 0) + count
+
+
+def report(totals: dict, width: int = 50):
+    """Prints the win rate with its 95% interval, turns per game and the histogram of the AI's point margin"""
+    games = totals['games']
+    win_rate = totals['wins'] / games
+    interval = 1.96 * math.sqrt(win_rate * (1 - win_rate) / games)
+    print(f'{totals["difficulty"]}: {games} games, AI won {100 * win_rate:.2f}% +- {100 * interval:.2f}%, '
+          f'lost {100 * totals["losses"] / games:.2f}%, draws {100 * totals["draws"] / games:.2f}%, '
+          f'{totals["turns"] / games:.2f} turns per game, {totals["unfinished"]} unfinished')
+    if totals['random_travel']:
+        travel, random_travel = totals['travel'] / games, totals['random_travel'] / games
+        print(f'arm travel per game {travel / 1000:.2f} m, {random_travel / 1000:.2f} m choosing at random, '
+              f'saved {(random_travel - travel) / 1000:.2f} m ({100 * (1 - travel / random_travel):.1f}%)')
+    print(f'{"AI - human":>12} {"games":>9}')
+    most = max(totals['margins'].values())
+    for margin in sorted(totals['margins']):
+        count = totals['margins'][margin]
+        print(f'{margin:>12} {count:>9} {"#" * max(1, round(width * count / most))}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Multi-process self-play of the AI against scripted players')
+    parser.add_argument('--games', type=int, default=100000, help='number of games per difficulty')
+    parser.add_argument('--difficulty', nargs='+', choices=[difficulty.name for difficulty in Difficulties],
+                        default=[difficulty.name for difficulty in Difficulties], help='difficulties to play')
+    parser.add_argument('--human', choices=list(HUMANS), default='casual', help='preset of the scripted player')
+    parser.add_argument('--capacity', type=int, default=None, help='memory capacity of the player in elements')
+    parser.add_argument('--slip', type=float, default=None, help='probability of a memory slip of the player')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, the next ones add one')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--chunk', type=int, default=2000, help='games per task sent to a worker')
+    parser.add_argument('--max-turns', type=int, default=500, help='turns after which a game is stopped')
+    parser.add_argument('--travel-model', metavar='FILE', nargs='?', const='grid', default=None,
+                        help='let the AI choose by arm travel and report the travel saved, with positions from the '
+                             'JSON file or the default board positions without FILE')
+    args = parser.parse_args()
+
+    capacity, slip = HUMANS[args.human]
+    capacity = args.capacity if args.capacity is not None else capacity
+    slip = args.slip if args.slip is not None else slip
+
+    tasks = [(difficulty, first, min(args.chunk, args.seed + args.games - first), capacity, slip, args.max_turns,
+              args.travel_model)
+             for difficulty in args.difficulty
+             for first in range(args.seed, args.seed + args.games, args.chunk)]
+    results = {difficulty: new_totals(difficulty) for difficulty in args.difficulty}
+    start = time.perf_counter()
+    with Pool(args.processes) as pool:
+        for chunk in pool.imap_unordered(play_chunk, tasks):
+            merge(results[chunk['difficulty']], chunk)
+    duration = time.perf_counter() - start
+
+    all_games = args.games * len(args.difficulty)
+    print(f'{all_games} games on {args.processes} processes in {duration:.1f} s, '
+          f'{60 * all_games / duration:.0f} games/min, player memory {capacity} elements, slip {slip}')
+    for difficulty in args.difficulty:
+        print()
+        report(results[difficulty])
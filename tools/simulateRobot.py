@@ -0,0 +1,148 @@
+"""
+Runs the local Epson Scara simulator, either as a server for the game or as a benchmark of the robot I/O path.
+
+Serve for the game (then start main.py --robot-host localhost --robot-port 5020):
+    python -m tools.simulateRobot --port 5020 --motion-time 1.0
+Benchmark turn latency of the game's reveal sequence on a headless board, the gain of queueing moves while the arm
+returns home and the throughput of the threaded and the asyncio connector:
+    python -m tools.simulateRobot --bench 50 --motion-time 0.05 --camera-time 0.02 --think-time 0.05
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from enums.difficulties import Difficulties
+from enums.epsonInstructions import Instructions
+from memoryGame.epson_structures.asyncEpson import AsyncEpson
+from memoryGame.epson_structures.epsonConnector import Epson
+from memoryGame.epson_structures.epsonSimulator import EpsonSimulator
+from memoryGame.epson_structures.moveScheduler import MoveScheduler
+from memoryGame.epson_structures.statusPoller import RobotTimeoutError
+from memoryGame.gameboard_structures.boardState import BoardState
+from tools.headlessGame import headless_screen, new_board, reveal
+
+
+def benchmark(robot: Epson, turns: int, seed: int, think_time: float = 0.0):
+    """
+    Measures turn latency with the simulated robot through a headless GameBoard, once waiting for the arm to get home
+    after every reveal as the game did before the move scheduler and once queueing the next move, and throughput of
+    the connector
+    :param think_time: time in seconds the game spends after a reveal before it sends the next move
+    """
+    screen = headless_screen()
+    moves = MoveScheduler(robot)
+    for lookahead in (False, True):
+        board = new_board(screen, 1020, seed, Difficulties.HARD, robot, moves)
+        rng = random.Random(seed)
+        latencies = {True: [], False: []}
+        failures = 0
+        begin = time.perf_counter()
+        for _ in range(turns):
+            coordinate = rng.choice([cell for cell in range(28) if cell != board.selected_coordinate])
+            go_camera = board.state.symbol_at(coordinate) == BoardState.UNKNOWN
+            start = time.perf_counter()
+            if not reveal(board, coordinate):
+                failures += 1
+                continue
+            if not lookahead:
+                try:
+                    robot.wait_for(Instructions.HOME_POSITION, since=moves.returning_since or 0.0)
+                except RobotTimeoutError:
+                    pass
+            latencies[go_camera].append(time.perf_counter() - start)
+            time.sleep(think_time)
+        robot.wait_for(Instructions.HOME_POSITION, since=moves.returning_since or 0.0)
+        total = time.perf_counter() - begin
+
+        print('lookahead' if lookahead else 'blocking', f'total={total:.2f} s')
+        for go_camera, name in ((True, 'camera reveal'), (False, 'known reveal')):
+            if latencies[go_camera]:
+                values = np.array(latencies[go_camera]) * 1000
+                print(f'  {name:<14} n={len(values):<4} p50={np.percentile(values, 50):8.1f} ms '
+                      f'p95={np.percentile(values, 95):8.1f} ms')
+        print(f'  failed reveals: {failures}')
+    count, mean, longest = moves.stats()
+    print(f'queued moves sent n={count} mean={mean:.2f} ms max={longest:.2f} ms after the arm got home')
+
+    # coil 600 is not used by the robot program
+    count = 200
+    start = time.perf_counter()
+    for i in range(count):
+        robot.write_coils({600: i % 2})
+    writes = count / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(count):
+        robot.read_status()
+    reads = count / (time.perf_counter() - start)
+    print(f'connector throughput: {writes:.0f} coil writes/s, {reads:.0f} status reads/s')
+    for name, (calls, mean, longest) in robot.poller.stats().items():
+        print(f'{name:<14} n={calls:<6} mean={mean:7.2f} ms max={longest:7.2f} ms')
+
+
+async def async_benchmark(robot: Epson, count: int, seed: int):
+    """
+    Measures the asyncio connector on the connected robot: throughput of coil writes through its command queue and
+    the status waits of reveals without the camera
+    """
+    connector = AsyncEpson(robot)
+    await connector.start_connection()
+    # coil 600 is not used by the robot program
+    start = time.perf_counter()
+    await asyncio.gather(*(connector.write_coils({600: i % 2}) for i in range(count)))
+    writes = count / (time.perf_counter() - start)
+    rng = random.Random(seed)
+    waits = {Instructions.CAMERA_POINT: [], Instructions.HOME_POSITION: []}
+    for _ in range(min(count, 10)):
+        await connector.write_coordinates(rng.randrange(28))
+        waits[Instructions.CAMERA_POINT].append(await connector.wait_for(Instructions.CAMERA_POINT))
+        since = time.monotonic()
+        await connector.reset_all()
+        waits[Instructions.HOME_POSITION].append(await connector.wait_for(Instructions.HOME_POSITION, since=since))
+    connector.worker.cancel()
+    print(f'asyncio connector: {writes:.0f} coil writes/s through the command queue')
+    for instruction, values in waits.items():
+        values = np.array(values) * 1000
+        print(f'  wait {instruction.name:<14} n={len(values):<4} mean={values.mean():8.1f} ms '
+              f'max={values.max():8.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local Epson Scara Modbus simulator')
+    parser.add_argument('--host', default='localhost', help='address to listen on')
+    parser.add_argument('--port', type=int, default=5020, help='port to listen on')
+    parser.add_argument('--motion-time', type=float, default=1.5, help='mean move time to the board or home in s')
+    parser.add_argument('--camera-time', type=float, default=0.4, help='mean move time between camera points in s')
+    parser.add_argument('--jitter', type=float, default=0.2, help='relative spread of move times')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the layout, jitter and faults')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='probability of a move that never finishes')
+    parser.add_argument('--disconnect-rate', type=float, default=0.0,
+                        help='probability of a dropped connection per command')
+    parser.add_argument('--disconnect-time', type=float, default=2.0, help='time in s the server stays down')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help='time in s the benchmark spends between reveals, like the game showing the element')
+    parser.add_argument('--bench', type=int, default=0, metavar='TURNS',
+                        help='run the benchmark with the given number of reveals instead of serving')
+    args = parser.parse_args()
+
+    simulator = EpsonSimulator(args.host, args.port, args.motion_time, args.camera_time, args.jitter, args.seed,
+                               args.stall_rate, args.disconnect_rate, args.disconnect_time)
+    simulator.start()
+    print(f'simulated robot listening on {args.host}:{args.port}, layout: {" ".join(simulator.layout)}')
+    try:
+        if args.bench:
+            bench_robot = Epson(args.host, args.port, response_timeout=10 * args.motion_time + 1)
+            if not bench_robot.start_connection():
+                raise SystemExit('could not connect to the simulator')
+            benchmark(bench_robot, args.bench, args.seed, args.think_time)
+            asyncio.run(async_benchmark(bench_robot, 200, args.seed))
+            bench_robot.close_connection()
+        else:
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
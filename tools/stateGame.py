@@ -0,0 +1,48 @@
+"""
+Game loop on a bare BoardState with a seeded layout, no pygame, robot or camera is involved. Shared by the tools that
+play many games against the AI, e.g. tools.selfPlay and tools.benchmarkAI.
+"""
+import random
+
+from memoryGame.gameboard_structures.boardState import BoardState
+
+
+def play_state_game(state: BoardState, seed: int, choose, on_reveal=None, max_turns: int = 500) -> tuple:
+    """
+    Plays one game. Two players take turns of two reveals, as in MemoryGame the first player starts and a found pair
+    does not give another turn
+    :param state: new state of the game, every one of its symbols has two elements
+    :param seed: seed of the layout
+    :param choose: function (state, player, first) -> element to reveal, player is 0 or 1 and first is the element
+    revealed first in the turn or None, called before the element is shown
+    :param on_reveal: function (state, cell, symbol, first) called after the element was shown and the state updated
+    :param max_turns: turns after which the game is stopped
+    :return: (points of the first player, points of the second player, number of turns)
+    """
+    layout = list(state.symbols) * 2
+    random.Random(seed).shuffle(layout)
+    points = [0, 0]
+    found = 0
+    turns = 0
+    while found < len(state.symbols) and turns < max_turns:
+        player = turns % 2
+        first = None
+        for _ in range(2):
+            cell = choose(state, player, first)
+            symbol = state.symbol_id(layout[cell])
+            state.learn(cell, symbol)
+            state.see(cell)
+            if first is None:
+                state.reveal(cell)
+            elif state.symbol_at(first) == symbol and first != cell:
+                state.match(symbol)
+                state.reveal(cell)
+                points[player] += 1
+                found += 1
+            else:
+                state.hide(first)
+            if on_reveal is not None:
+                on_reveal(state, cell, symbol, first)
+            first = cell
+        turns += 1
+    return points[0], points[1], turns
@@ -0,0 +1,171 @@
+import functools
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+
+class _Span:
+    """Context manager recording one span, created by Tracer.span"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        ident = threading.get_ident()
+        if ident not in Tracer.threads:
+            Tracer.threads[ident] = threading.current_thread().name
+        Tracer.records.append((self.name, ident, self.start, end - self.start))
+        return False
+
+
+class Tracer:
+    """
+    Low overhead tracing of named spans across the game, the board, the camera and the robot code. Disabled tracing
+    costs one attribute check per span. Spans are kept in memory and written on exit as Chrome trace JSON
+    (chrome://tracing, Perfetto) or as a compact binary log; summary() prints p50/p95 of every phase.
+    Span names are 'category.phase', e.g. 'robot.write_coils'
+
+    Attributes
+    ----------
+    :arg enabled: True if spans are recorded
+    :arg records: ring of (name, thread ident, start in ns, duration in ns) of the finished spans
+    :arg threads: thread ident -> thread name
+    :arg origin: time.perf_counter_ns() when tracing was enabled, timestamps are written relative to it
+    """
+    MAGIC = b'MGTRACE1'
+    RECORD = struct.Struct('<HHqq')
+
+    enabled = False
+    records = deque()
+    threads = {}
+    origin = 0
+
+    @classmethod
+    def enable(cls, capacity: int = 1_000_000):
+        """
+        Starts recording spans
+        :param capacity: number of spans kept, the oldest are dropped first
+        """
+        cls.records = deque(maxlen=capacity)
+        cls.threads = {}
+        cls.origin = time.perf_counter_ns()
+        cls.enabled = True
+
+    @classmethod
+    def span(cls, name: str):
+        """
+        Returns a context manager timing the block as a span
+        :param name: 'category.phase'
+        """
+        if not cls.enabled:
+            return nullcontext()
+        return _Span(name)
+
+    @classmethod
+    def traced(cls, name: str):
+        """
+        Decorator recording every call of the function as a span
+        :param name: 'category.phase'
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return function(*args, **kwargs)
+                with _Span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def write(cls, path: str):
+        """Writes the spans as Chrome trace JSON if the path ends with .json, as the binary log otherwise"""
+        if path.endswith('.json'):
+            cls.write_chrome(path)
+        else:
+            cls.write_binary(path)
+
+    @classmethod
+    def write_chrome(cls, path: str):
+        """Writes the spans in the Chrome trace event format"""
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident, 'args': {'name': name}}
+                  for ident, name in cls.threads.items()]
+        for name, ident, start, duration in list(cls.records):
+            events.append({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': ident,
+                           'ts': (start - cls.origin) / 1000, 'dur': duration / 1000})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    @classmethod
+    def write_binary(cls, path: str):
+        """
+        Writes the spans as a binary log: magic, the table of span names and the table of thread names as
+        UTF-8 JSON preceded by its length, then fixed size records of name index, thread index, start and duration
+        """
+        records = list(cls.records)
+        names = {}
+        idents = {}
+        for name, ident, _, _ in records:
+            names.setdefault(name, len(names))
+            idents.setdefault(ident, len(idents))
+        header = json.dumps({'names': list(names),
+                             'threads': [cls.threads.get(ident, str(ident)) for ident in idents]}).encode()
+        with open(path, 'wb') as file:
+            file.write(cls.MAGIC)
+            file.write(struct.pack('<I', len(header)))
+            file.write(header)
+            for name, ident, start, duration in records:
+                file.write(cls.RECORD.pack(names[name], idents[ident], start - cls.origin, duration))
+
+    @classmethod
+    def read_binary(cls, path: str) -> list:
+        """
+        Reads a binary log
+        :return: list of (name, thread name, start in ns, duration in ns)
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if not data.startswith(cls.MAGIC):
+            raise ValueError(f'{path} is not a trace log')
+        offset = len(cls.MAGIC)
+        length, = struct.unpack_from('<I', data, offset)
+        offset += 4
+        header = json.loads(data[offset:offset + length].decode())
+        offset += length
+        return [(header['names'][name], header['threads'][thread], start, duration)
+                for name, thread, start, duration in cls.RECORD.iter_unpack(data[offset:])]
+
+    @classmethod
+    def summary(cls, records: list = None) -> dict:
+        """
+        Prints duration statistics of every span name, the longest total time first
+        :param records: spans as (name, thread, start, duration), the recorded spans by default
+        :return: name -> (count, p50 in ms, p95 in ms, total in ms)
+        """
+        if records is None:
+            records = list(cls.records)
+        durations = {}
+        for name, _, _, duration in records:
+            durations.setdefault(name, []).append(duration)
+        stats = {}
+        for name, values in durations.items():
+            values = np.array(values) / 1e6
+            stats[name] = (len(values), np.percentile(values, 50), np.percentile(values, 95), values.sum())
+        print(f'{"span":<28} {"n":>6} {"p50 ms":>10} {"p95 ms":>10} {"total s":>9}')
+        for name, (count, p50, p95, total) in sorted(stats.items(), key=lambda item: -item[1][3]):
+            print(f'{name:<28} {count:>6} {p50:>10.2f} {p95:>10.2f} {total / 1000:>9.2f}')
+        return stats